@@ -1,24 +1,155 @@
 #!/usr/bin/python3
 """Module for managing database connections and sessions"""
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import itertools
+from contextvars import ContextVar
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, with_loader_criteria
 
-from schemas import Base
+from schemas import Base, uuid7, sql_uuid7
 from schemas.comment import Comment
+from schemas.notification import Notification, NotificationCounter
 from schemas.post import Post
 from schemas.post_like import PostLike
 from schemas.user import User
 from schemas.user_following import UserFollowing
+from .utils.raw_json import RawJSON
+from .utils.rate_limit import SlidingWindowLimiter
+
+
+engine = None
+"""The process wide database engine and its connection pool"""
+
+replica_engines = None
+"""Engines of the read replicas, used in turn by GET requests"""
+
+replica_turn = itertools.count()
+"""Round robin counter over the replica engines"""
+
+read_from_replica = ContextVar('read_from_replica', default=False)
+"""Whether sessions opened by the current request may use a replica"""
+
+current_user_id = ContextVar('current_user_id', default='')
+"""Authenticated user of the current request, credited with its writes"""
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+"""Session factory bound to the engine on first use"""
+
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def hide_pending_deletes(execute_state):
+    """Filters users and posts awaiting the purge out of ORM reads"""
+    if not execute_state.is_select:
+        return
+    if execute_state.execution_options.get('include_pending_deletes'):
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(User, User.deleted_on.is_(None)),
+        with_loader_criteria(Post, Post.deleted_on.is_(None))
+    )
+
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def flag_statement_writes(execute_state):
+    """Flags sessions running INSERT, UPDATE or DELETE statements"""
+    if not execute_state.is_select:
+        execute_state.session.info['wrote'] = True
+
+
+@event.listens_for(SessionLocal, 'after_flush')
+def flag_flush_writes(session, flush_context):
+    """Flags sessions flushing ORM changes"""
+    session.info['wrote'] = True
+
+
+@event.listens_for(SessionLocal, 'after_commit')
+def track_committed_writes(session):
+    """Keeps the writing user's reads on the primary for a short while"""
+    if session.info.pop('wrote', False) and current_user_id.get():
+        get_write_tracker().hit(current_user_id.get())
+
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def forget_rolled_back_writes(session):
+    """Clears the write flag of a rolled back transaction"""
+    session.info.pop('wrote', None)
+
+
+@lru_cache(maxsize=None)
+def get_write_tracker() -> SlidingWindowLimiter:
+    """Gets the recent writers table, shared by workers in production mode"""
+    return SlidingWindowLimiter(
+        window=float(os.getenv('DB_REPLICA_STICKY_SECONDS', '3')),
+        slots=16384,
+        path=os.getenv('DB_REPLICA_STICKY_FILE')
+    )
+
+
+def route_reads_for(user_id: str):
+    """Pins the request's reads to the primary if the user just wrote"""
+    current_user_id.set(user_id)
+    if read_from_replica.get() and get_write_tracker().count(user_id) > 0:
+        read_from_replica.set(False)
+
+
+class SharedSession(SessionLocal.class_):
+    """Session reused by consecutive handlers, closed once by its owner"""
+
+    def close(self):
+        """Keeps the session open for the next handler"""
+
+    def release(self):
+        """Closes the session and returns its connection to the pool"""
+        super().close()
+
+
+shared_session = ContextVar('shared_session', default=None)
+"""Session handed out by get_session while a batch request runs"""
+
+
+def create_db_engine(db_url: str):
+    """Creates an engine with the app's pool settings"""
+    return create_engine(
+        db_url,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+        max_overflow=int(os.getenv('DB_POOL_OVERFLOW', '10')),
+        json_deserializer=RawJSON
+    )
 
 
 def get_engine():
-    """Creates and returns the database engine"""
-    db_url = os.getenv('DATABASE_URL')
-    engine = create_engine(db_url, pool_pre_ping=True)
+    """Creates (once per process) and returns the database engine"""
+    global engine
+    if engine is None:
+        engine = create_db_engine(os.getenv('DATABASE_URL'))
+        Base.metadata.create_all(engine)
+        SessionLocal.configure(bind=engine)
     return engine
 
 
+def get_replica_engines() -> list:
+    """Creates (once per process) and returns the read replica engines"""
+    global replica_engines
+    if replica_engines is None:
+        replica_urls = os.getenv('DATABASE_REPLICA_URLS', '').split(',')
+        replica_engines = [
+            create_db_engine(url.strip())
+            for url in replica_urls if url.strip()
+        ]
+    return replica_engines
+
+
+def read_engine():
+    """Picks the engine serving the current request's reads"""
+    engine = get_engine()
+    replicas = get_replica_engines()
+    if not replicas or not read_from_replica.get():
+        return engine
+    return replicas[next(replica_turn) % len(replicas)]
+
+
 def init_database():
     """Drops and creates database tables"""
     engine = get_engine()
@@ -26,10 +157,35 @@ def init_database():
     Base.metadata.create_all(engine)
 
 
-def get_session():
-    """Returns a new SQLAlchemy session"""
-    engine = get_engine()
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    Base.metadata.create_all(engine)
-    session = SessionLocal()
+def get_session(primary=False):
+    """Returns a new SQLAlchemy session, or the batch request's session
+
+    Sessions of GET requests read from a replica when replicas are set,
+    unless primary is asked for or the user wrote moments ago.
+    """
+    session = shared_session.get()
+    if session is not None and not primary:
+        return session
+    get_engine()
+    if primary:
+        return SessionLocal()
+    session = SessionLocal(bind=read_engine())
     return session
+
+
+def get_shared_session() -> SharedSession:
+    """Returns a session to share between handlers until released"""
+    return SharedSession(bind=read_engine())
+
+
+def warm_pool():
+    """Opens the pooled connections ahead of the first requests"""
+    engines = [get_engine(), *get_replica_engines()]
+    connections = []
+    try:
+        for engine in engines:
+            for _ in range(engine.pool.size()):
+                connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
@@ -1,9 +1,11 @@
 #!/usr/bin/python3
 """Module for handling API endpoints"""
-import os
 from fastapi import APIRouter
-from starlette.responses import FileResponse
-from imagekitio import ImageKit
+from starlette.responses import FileResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from ..utils.image_cdn import get_imagekit
+from ..utils.metrics import render_metrics
 
 
 home_endpoint = APIRouter()
@@ -35,14 +37,15 @@ async def serve_favicon():
     return favicon_content
 
 
+@home_endpoint.get('/metrics')
+async def get_metrics():
+    """Gets and returns the server metrics in Prometheus text format"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 @home_endpoint.get('/api/v1/profile-picture')
 async def get_profile_picture(img_id: str):
     """Gets and returns the profile picture for a user"""
-    imagekit = ImageKit(
-        private_key=os.getenv('IMG_CDN_PRIV_KEY'),
-        public_key=os.getenv('IMG_CDN_PUB_KEY'),
-        url_endpoint=os.getenv('IMG_CDN_URL_ENDPNT')
-    )
     api_response = {
         'success': False,
         'message': 'Image ID is required.'
@@ -50,6 +53,7 @@ async def get_profile_picture(img_id: str):
     if not img_id:
         return api_response
     try:
+        imagekit = get_imagekit()
         img_details = imagekit.get_file_details(img_id)
         img_url = ''
         if hasattr(img_details, 'response') and img_details.response:
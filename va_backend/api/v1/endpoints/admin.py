@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+"""Module for administrative diagnostics endpoints"""
+import os
+import hmac
+from fastapi import APIRouter, Header
+from typing import Optional
+
+from ..utils.slow_queries import SLOW_QUERY_MS, recorded_slow_queries
+
+
+endpoint = APIRouter(prefix='/api/v1/admin')
+
+
+def is_admin(admin_key: Optional[str]) -> bool:
+    """Checks a request's admin key against the configured one"""
+    app_admin_key = os.getenv('APP_ADMIN_KEY', '')
+    if not app_admin_key or not admin_key:
+        return False
+    return hmac.compare_digest(admin_key.encode(), app_admin_key.encode())
+
+
+@endpoint.get('/slow-queries')
+async def get_slow_queries(x_admin_key: Optional[str] = Header(None)):
+    """Gets and returns the recently recorded slow SQL statements"""
+    api_response = {
+        'success': False,
+        'message': 'Invalid admin key.'
+    }
+    if not is_admin(x_admin_key):
+        return api_response
+    api_response = {
+        'success': True,
+        'data': {
+            'enabled': bool(SLOW_QUERY_MS),
+            'thresholdMs': float(SLOW_QUERY_MS) if SLOW_QUERY_MS else None,
+            'queries': recorded_slow_queries()
+        }
+    }
+    return api_response
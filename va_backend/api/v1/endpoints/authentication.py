@@ -2,11 +2,8 @@
 """Module for handling user authentication endpoints"""
 import os
 import email_validator
-import argon2
-import uuid
-from fastapi import APIRouter
-from datetime import datetime
-from sqlalchemy import and_
+from fastapi import APIRouter, Request
+from sqlalchemy import and_, func
 
 from ..form_types import (
     SignInSchema,
@@ -14,39 +11,49 @@ from ..form_types import (
     PasswordResetSchema,
     PasswordResetRequestSchema
 )
-from ..database import get_session, User
+from ..database import get_session, uuid7, User
 from ..utils.token_mgt import AuthTokenMngr, ResetTokenMngr
 from ..utils.html_template_renderer import render_html_template
 from ..utils.mailing import deliver_message
+from ..utils.hashing import hash_password, verify_password
+from ..utils.rate_limit import get_signin_limiter
 
 
 endpoint = APIRouter(prefix='/api/v1')
 
 
 @endpoint.post('/sign-in')
-async def sign_in(body: SignInSchema):
+async def sign_in(body: SignInSchema, request: Request):
     """Authenticate user sign in and generate an auth token"""
     api_response = {
         'success': False,
         'message': 'User authentication failed.'
     }
+    limiter = get_signin_limiter()
+    max_attempts = int(os.getenv('APP_MAX_SIGNIN'))
+    email_key = f'email:{body.email.strip().lower()}'
+    ip_key = f'ip:{request.client.host if request.client else ""}'
+    if any([
+        limiter.count(email_key) >= max_attempts,
+        limiter.count(ip_key) >= int(os.getenv('APP_SIGNIN_IP_LIMIT', '100'))
+    ]):
+        api_response['message'] = 'Too many sign in attempts.'
+        return api_response
     db_session = get_session()
     try:
         email_validator.validate_email(body.email)
         user = db_session.query(User).filter(User.email == body.email).first()
         if user:
-            max_attempts = int(os.getenv('APP_MAX_SIGNIN'))
-            try:
-                if user.signin_trials >= max_attempts:
-                    return api_response
-                pwdhash = argon2.PasswordHasher()
-                pwdhash.verify(user.hashed_password, body.password)
+            if user.signin_trials >= max_attempts:
+                return api_response
+            if verify_password(user.hashed_password, body.password):
+                limiter.reset(email_key)
                 if user.signin_trials > 1:
                     db_session.query(User).filter(
                         User.email == body.email
                     ).update(
                         {
-                            User.updated_on: datetime.utcnow(),
+                            User.updated_on: func.now(),
                             User.signin_trials: 1
                         },
                         synchronize_session=False
@@ -65,20 +72,21 @@ async def sign_in(body: SignInSchema):
                         'authToken': AuthTokenMngr.deconvert_token(auth_token)
                     }
                 }
-            except argon2.exceptions.VerificationError:
-                account_active = user.user_active
-                if user.signin_trials + 1 == max_attempts:
-                    account_active = False
-                db_session.query(User).filter(User.email == body.email).update(
-                    {
-                        User.updated_on: datetime.utcnow(),
-                        User.signin_trials: user.signin_trials + 1,
-                        User.user_active: account_active
-                    },
-                    synchronize_session=False
-                )
-                db_session.commit()
-                if not account_active:
+            else:
+                limiter.hit(ip_key)
+                prev_failures, failures = limiter.hit(email_key)
+                if prev_failures < max_attempts <= failures:
+                    db_session.query(User).filter(
+                        User.email == body.email
+                    ).update(
+                        {
+                            User.updated_on: func.now(),
+                            User.signin_trials: max_attempts,
+                            User.user_active: False
+                        },
+                        synchronize_session=False
+                    )
+                    db_session.commit()
                     deliver_message(
                         body.email,
                         'Your account has been locked',
@@ -87,6 +95,9 @@ async def sign_in(body: SignInSchema):
                             name=user.name
                         )
                     )
+        else:
+            limiter.hit(ip_key)
+            limiter.hit(email_key)
     except Exception as ex:
         print(ex.args[0])
         db_session.rollback()
@@ -108,7 +119,6 @@ async def sign_up(body: SignUpSchema):
             api_response['message'] = 'User name is too long.'
             return api_response
         db_session = get_session()
-        pwdhash = argon2.PasswordHasher()
         try:
             deliver_message(
                 body.email,
@@ -118,13 +128,10 @@ async def sign_up(body: SignUpSchema):
                     name=body.name
                 )
             )
-            phash = pwdhash.hash(body.password)
-            gen_id = str(uuid.uuid4())
-            currtime = datetime.utcnow()
+            phash = hash_password(body.password)
+            gen_id = uuid7()
             new_user = User(
                 id=gen_id,
-                created_on=currtime,
-                updated_on=currtime,
                 name=body.name,
                 email=body.email,
                 hashed_password=phash
@@ -236,8 +243,7 @@ async def reset_password(body: PasswordResetSchema):
             reset_token.message == 'password_reset'
         ]
         if all(valid_conds):
-            pwdhash = argon2.PasswordHasher()
-            phash = pwdhash(body.password)
+            phash = hash_password(body.password)
             db_session.query(User).filter(
                 User.email == body.email
             ).update(
@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+"""Module for running several GET requests in a single round trip"""
+import asyncio
+from urllib.parse import urlencode
+from fastapi import APIRouter, Request
+from starlette.routing import Match
+
+from ..form_types import BatchSchema
+from ..database import (
+    get_shared_session, shared_session, read_from_replica)
+from ..utils.token_mgt import AuthTokenMngr, verified_tokens
+from ..utils.raw_json import RawJSON
+
+
+endpoint = APIRouter(prefix='/api/v1')
+
+MAX_BATCH_SIZE = 20
+"""Maximum number of sub-requests in one batch"""
+
+FORWARDED_HEADERS = (b'user-agent', b'x-forwarded-for', b'x-real-ip')
+"""Headers of the batch request passed on to its sub-requests"""
+
+
+def find_route(router, scope):
+    """Finds the GET route matching a sub-request scope"""
+    for route in router.routes:
+        if 'GET' not in getattr(route, 'methods', ()):
+            continue
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            scope.update(child_scope)
+            return route
+    return None
+
+
+def find_exception_handler(app, ex: Exception):
+    """Finds the app's handler for an exception raised by a sub-request"""
+    for ex_class in type(ex).__mro__:
+        if ex_class in app.exception_handlers:
+            return app.exception_handlers[ex_class]
+    return None
+
+
+async def run_sub_request(request: Request, path: str, params: dict):
+    """Runs a GET sub-request through the app's router and returns it"""
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': request.scope.get('scheme', 'http'),
+        'server': request.scope.get('server'),
+        'client': request.scope.get('client'),
+        'root_path': request.scope.get('root_path', ''),
+        'path': path,
+        'raw_path': path.encode('utf-8'),
+        'query_string': urlencode(params).encode('utf-8'),
+        'headers': [
+            (name, value) for name, value in request.scope['headers']
+            if name in FORWARDED_HEADERS
+        ],
+        'app': request.scope.get('app'),
+        'state': request.scope.get('state', {})
+    }
+    route = find_route(request.app.router, scope)
+    if route is None:
+        return {
+            'status': 404,
+            'body': {'success': False, 'message': 'Route not found.'}
+        }
+    status = 500
+    headers = {}
+    chunks = []
+    streamed = False
+    body_received = False
+    response_sent = asyncio.Event()
+
+    async def receive():
+        """Gives the sub-request an empty body, then waits for its end
+
+        Streaming responses keep listening for a disconnect, which is
+        reported once the whole response body is collected, or as soon
+        as the response turns out to stream.
+        """
+        nonlocal body_received
+        if not body_received:
+            body_received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await response_sent.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        """Collects the sub-response status, headers and body
+
+        A body sent in several parts is not buffered; the sub-request is
+        told the client went away, which stops the stream.
+        """
+        nonlocal status, streamed
+        if streamed:
+            return
+        if message['type'] == 'http.response.start':
+            status = message['status']
+            headers.update(
+                (name.decode('latin-1'), value.decode('latin-1'))
+                for name, value in message.get('headers', [])
+            )
+        elif message['type'] == 'http.response.body':
+            if message.get('more_body', False):
+                streamed = True
+                chunks.clear()
+                response_sent.set()
+                return
+            chunks.append(message.get('body', b''))
+            response_sent.set()
+
+    try:
+        await route.handle(scope, receive, send)
+    except Exception as ex:
+        handler = find_exception_handler(request.app, ex)
+        if handler is None:
+            raise
+        chunks.clear()
+        error_response = await handler(Request(scope, receive), ex)
+        await error_response(scope, receive, send)
+    if streamed:
+        return {
+            'status': 400,
+            'body': {
+                'success': False,
+                'message': 'Streamed responses cannot be batched.'
+            }
+        }
+    body = b''.join(chunks).decode('utf-8')
+    sub_response = {'status': status}
+    if 'etag' in headers:
+        sub_response['etag'] = headers['etag']
+    if headers.get('content-type', '').startswith('application/json'):
+        sub_response['body'] = RawJSON(body) if body else None
+    else:
+        sub_response['body'] = body
+    return sub_response
+
+
+@endpoint.post('/batch')
+async def run_batch(body: BatchSchema, request: Request):
+    """Runs GET sub-requests with one token check and one database session"""
+    api_response = {
+        'success': False,
+        'message': f'A batch holds 1 to {MAX_BATCH_SIZE} requests.'
+    }
+    if not 0 < len(body.requests) <= MAX_BATCH_SIZE:
+        return api_response
+    routing_token = read_from_replica.set(True)
+    tokens_token = verified_tokens.set({})
+    db_session = None
+    try:
+        if body.token and AuthTokenMngr.convert_token(body.token) is None:
+            api_response['message'] = 'Invalid authentication token.'
+            return api_response
+        db_session = get_shared_session()
+        session_token = shared_session.set(db_session)
+        responses = []
+        for item in body.requests:
+            params = dict(item.params)
+            if body.token:
+                params['token'] = body.token
+            responses.append(
+                await run_sub_request(request, item.path, params))
+        api_response = {
+            'success': True,
+            'data': {
+                'responses': responses
+            }
+        }
+    finally:
+        if db_session is not None:
+            shared_session.reset(session_token)
+            db_session.release()
+        verified_tokens.reset(tokens_token)
+        read_from_replica.reset(routing_token)
+    return api_response
@@ -1,22 +1,56 @@
 #!/usr/bin/python3
 """Module for managing endpoints for comments on posts"""
 import re
-import uuid
-from fastapi import APIRouter
-from sqlalchemy import and_
+from fastapi import APIRouter, Request, Response
+from sqlalchemy import and_, or_, func, select
 from datetime import datetime
 
-from ..database import get_session, User, Comment
+from ..database import get_session, uuid7, User, Comment, Post
 from ..utils.pagination import paginate_list
+from ..utils.multi_get import (
+    MAX_IDS, parse_ids, in_request_order, grouped_counts)
 from ..form_types import CommentAddSchema, CommentDeleteSchema
 from ..utils.token_mgt import AuthTokenMngr
+from ..utils.etag import version_etag, etag_matches, not_modified
+from ..utils.statements import (
+    fetch_user,
+    fetch_post,
+    fetch_comment,
+    count_replies,
+    PENDING_USERS,
+    PENDING_POSTS
+)
+from ..realtime import publish
+from ..utils.notifications import notify, retract, discard
+from ..utils.cards import user_card
+from ..utils.cache import cache
 
 
 endpoint = APIRouter(prefix='/api/v1')
 
 
+def comment_version(db_session, id):
+    """Gets the version details of a comment without hydrating it"""
+    replies = Comment.__table__.alias('replies')
+    replies_cnt = select(func.count(replies.c.id)).where(and_(
+        replies.c.comment_id == Comment.id,
+        replies.c.user_id.notin_(PENDING_USERS)
+    )).scalar_subquery()
+    last_reply = select(func.max(replies.c.created_on)).where(and_(
+        replies.c.comment_id == Comment.id,
+        replies.c.user_id.notin_(PENDING_USERS)
+    )).scalar_subquery()
+    version = db_session.query(
+        Comment.created_on.label('created_on'),
+        User.updated_on.label('user_updated_on'),
+        replies_cnt.label('replies_count'),
+        last_reply.label('last_reply')
+    ).join(User, User.id == Comment.user_id).filter(Comment.id == id).first()
+    return version
+
+
 @endpoint.get('/comment')
-async def get_comment(id=''):
+async def get_comment(request: Request, response: Response, id=''):
     """Gets and returns details of a specific comment"""
     api_response = {
         'success': False,
@@ -24,17 +58,19 @@ async def get_comment(id=''):
     }
     db_session = get_session()
     try:
-        comment = db_session.query(Comment).filter(Comment.id == id).first()
+        version = comment_version(db_session, id)
+        if version is None:
+            return api_response
+        etag = version_etag('comment', id, *version)
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return not_modified(etag)
+        comment = fetch_comment(db_session, id)
         if comment:
-            user = db_session.query(User).filter(
-                User.id == comment.user_id
-            ).first()
+            user = fetch_user(db_session, comment.user_id)
             if not user:
                 return api_response
-            cmt_rep = db_session.query(Comment).filter(
-                Comment.comment_id == comment.id
-            ).all()
-            replies_cnt = len(cmt_rep) if cmt_rep else 0
+            replies_cnt = version.replies_count
+            response.headers['ETag'] = etag
             api_response = {
                 'success': True,
                 'data': {
@@ -56,6 +92,50 @@ async def get_comment(id=''):
     return api_response
 
 
+@endpoint.get('/comments')
+async def get_comments(ids: str):
+    """Gets and returns the comments of a list of ids in request order"""
+    api_response = {
+        'success': False,
+        'message': f'Up to {MAX_IDS} comment ids are allowed.'
+    }
+    comment_ids = parse_ids(ids)
+    if comment_ids is None:
+        return api_response
+    db_session = get_session()
+    try:
+        rows = db_session.query(Comment, User).join(
+            User, User.id == Comment.user_id
+        ).filter(Comment.id.in_(comment_ids)).all() if comment_ids else []
+        replies_cnts = grouped_counts(
+            db_session, Comment.id, Comment.comment_id,
+            [comment.id for comment, _ in rows],
+            Comment.user_id.notin_(PENDING_USERS)
+        )
+        comments = {}
+        for comment, user in rows:
+            comments[comment.id] = {
+                'id': comment.id,
+                'user': {
+                    'id': user.id,
+                    'name': user.name,
+                    'profilePictureId': user.profile_picture_id
+                },
+                'createdOn': comment.created_on.isoformat(),
+                'text': comment.content,
+                'postId': comment.post_id,
+                'repliesCount': replies_cnts.get(comment.id, 0),
+                'replyTo': comment.comment_id if comment.comment_id else ''
+            }
+        api_response = {
+            'success': True,
+            'data': in_request_order(comment_ids, comments)
+        }
+    finally:
+        db_session.close()
+    return api_response
+
+
 @endpoint.get('/comments-of-post')
 async def get_post_comments(id='', span='', after='', before=''):
     """Gets and return all comments made under a post"""
@@ -78,28 +158,19 @@ async def get_post_comments(id='', span='', after='', before=''):
         span = int(span if span else '12')
         comments = db_session.query(Comment).filter(and_(
             Comment.post_id == id,
-            Comment.comment_id == None
+            Comment.comment_id == None,
+            Comment.post_id.notin_(PENDING_POSTS)
         )).all()
         comments_data = []
         if comments:
             for comment in comments:
-                user = db_session.query(User).filter(
-                    User.id == comment.user_id
-                ).first()
+                user = user_card(comment.user_id)
                 if not user:
                     continue
-                cmt_reps = db_session.query(Comment).filter(and_(
-                    Comment.post_id == id,
-                    Comment.comment_id == comment.id
-                )).all()
-                replies_cnt = len(cmt_reps) if cmt_reps else 0
+                replies_cnt = count_replies(db_session, comment.id)
                 comment_info = {
                     'id': comment.id,
-                    'user': {
-                        'id': user.id,
-                        'name': user.name,
-                        'profilePictureId': user.profile_picture_id
-                    },
+                    'user': user,
                     'createdOn': comment.created_on.isoformat(),
                     'text': comment.content,
                     'postId': comment.post_id,
@@ -146,29 +217,20 @@ async def get_comment_replies(id='', span='', after='', before=''):
             db_session.close()
             return api_response
         span = int(span if span else '12')
-        comments = db_session.query(Comment).filter(
-            Comment.comment_id == id
-        ).all()
+        comments = db_session.query(Comment).filter(and_(
+            Comment.comment_id == id,
+            Comment.post_id.notin_(PENDING_POSTS)
+        )).all()
         replies_data = []
         if comments:
             for comment in comments:
-                user = db_session.query(User).filter(
-                    User.id == comment.user_id
-                ).first()
+                user = user_card(comment.user_id)
                 if not user:
                     continue
-                cmt_reps = db_session.query(Comment).filter(and_(
-                    Comment.post_id == id,
-                    Comment.comment_id == comment.id
-                )).all()
-                replies_cnt = len(cmt_reps) if cmt_reps else 0
+                replies_cnt = count_replies(db_session, comment.id)
                 replies_info = {
                     'id': comment.id,
-                    'user': {
-                        'id': user.id,
-                        'name': user.name,
-                        'profilePictureId': user.profile_picture_id
-                    },
+                    'user': user,
                     'createdOn': comment.created_on.isoformat(),
                     'text': comment.content,
                     'postId': comment.post_id,
@@ -218,19 +280,17 @@ async def get_user_comments(id='', span='', after='', before=''):
             }
             return api_response
         span = int(span if span else '12')
-        user = db_session.query(User).filter(User.id == id).first()
+        user = fetch_user(db_session, id)
         if not user:
             return api_response
-        comments = db_session.query(Comment).filter(
-            Comment.user_id == id
-        ).all()
+        comments = db_session.query(Comment).filter(and_(
+            Comment.user_id == id,
+            Comment.post_id.notin_(PENDING_POSTS)
+        )).all()
         comments_data = []
         if comments:
             for comment in comments:
-                cmt_reps = db_session.query(Comment).filter(
-                    Comment.comment_id == comment.id
-                ).all()
-                replies_cnt = len(cmt_reps) if cmt_reps else 0
+                replies_cnt = count_replies(db_session, comment.id)
                 comments_info = {
                     'id': comment.id,
                     'user': {
@@ -280,6 +340,9 @@ async def create_comment(body: CommentAddSchema):
         return api_response
     db_session = get_session()
     try:
+        if not fetch_post(db_session, body.postId):
+            api_response['message'] = 'Post not found.'
+            return api_response
         reply_id = body.replyTo.strip() if body.replyTo else None
         if reply_id:
             qryres = db_session.query(Comment).filter(and_(
@@ -289,23 +352,40 @@ async def create_comment(body: CommentAddSchema):
             if not qryres or qryres.post_id != body.postId:
                 db_session.close()
                 return api_response
-        gen_id = str(uuid.uuid4())
-        currdt = datetime.utcnow()
+        gen_id = uuid7()
         comment = Comment(
             id=gen_id,
-            created_on=currdt,
             post_id=body.postId,
             user_id=body.userId,
             comment_id=reply_id,
             content=body.content
         )
         db_session.add(comment)
+        db_session.flush()
+        created_on = comment.created_on
+        if reply_id:
+            notify(
+                db_session, 'reply', reply_id, body.userId,
+                select(Comment.user_id).where(Comment.id == reply_id)
+            )
+        else:
+            notify(
+                db_session, 'comment', body.postId, body.userId,
+                select(Post.user_id).where(Post.id == body.postId)
+            )
         db_session.commit()
+        cache.invalidate(f'post:{body.postId}', f'user:{body.userId}')
+        await publish(f'post:{body.postId}', 'comment.create', {
+            'postId': body.postId,
+            'commentId': gen_id,
+            'userId': body.userId,
+            'replyTo': reply_id if reply_id else ''
+        })
         api_response = {
             'success': True,
             'data': {
                 'id': gen_id,
-                'createdOn': currdt.isoformat(),
+                'createdOn': created_on.isoformat(),
                 'replyTo': body.replyTo if body.replyTo else '',
                 'postId': body.postId,
                 'repliesCount': 0
@@ -319,6 +399,32 @@ async def create_comment(body: CommentAddSchema):
     return api_response
 
 
+def retract_comment(db_session, comment):
+    """Takes a deleted comment out of the notifications
+
+    The notifications of replies to it are deleted, and its author leaves
+    the group of the post or parent comment once they have no comment
+    left there.
+    """
+    discard(db_session, 'reply', comment.id)
+    if comment.comment_id:
+        kind, subject_id = 'reply', comment.comment_id
+        siblings = Comment.comment_id == comment.comment_id
+        recipients = select(Comment.user_id).where(
+            Comment.id == comment.comment_id)
+    else:
+        kind, subject_id = 'comment', comment.post_id
+        siblings = and_(
+            Comment.post_id == comment.post_id,
+            Comment.comment_id == None
+        )
+        recipients = select(Post.user_id).where(Post.id == comment.post_id)
+    still_commenting = db_session.query(Comment.id).filter(
+        siblings, Comment.user_id == comment.user_id).first()
+    if not still_commenting:
+        retract(db_session, kind, subject_id, comment.user_id, recipients)
+
+
 @endpoint.delete('/comment')
 async def delete_comment(body: CommentDeleteSchema):
     """Delete a specific comment from a post"""
@@ -332,6 +438,13 @@ async def delete_comment(body: CommentDeleteSchema):
         return api_response
     db_session = get_session()
     try:
+        target = fetch_comment(db_session, body.commentId)
+        deleted = db_session.query(Comment.post_id, Comment.user_id).filter(
+            or_(
+                Comment.id == body.commentId,
+                Comment.comment_id == body.commentId
+            )
+        ).all()
         db_session.query(Comment).filter(
             Comment.comment_id == body.commentId
         ).delete(
@@ -342,7 +455,14 @@ async def delete_comment(body: CommentDeleteSchema):
         ).delete(
             synchronize_session=False
         )
+        if target:
+            retract_comment(db_session, target)
         db_session.commit()
+        if deleted:
+            cache.invalidate(*{
+                tag for post_id, user_id in deleted
+                for tag in (f'post:{post_id}', f'user:{user_id}')
+            })
         api_response = {
             'success': True,
             'data': {}
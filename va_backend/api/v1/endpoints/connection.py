@@ -1,15 +1,19 @@
 #!/usr/bin/python3
 """Module for managing endpoints for user connections"""
 import re
-import uuid
 from fastapi import APIRouter
-from sqlalchemy import and_
-from datetime import datetime
+from sqlalchemy import and_, select
 
 from ..utils.token_mgt import AuthTokenMngr
-from ..database import get_session, User, UserFollowing
+from ..database import get_session, uuid7, User, UserFollowing
 from ..utils.pagination import paginate_list
+from ..utils.statements import fetch_user, is_following
 from ..form_types import ConnectionSchema
+from ..realtime import publish
+from ..utils.notifications import notify, retract
+from ..utils.follow_graph import follow_graph
+from ..utils.relationships import relationships
+from ..utils.cache import cache
 
 
 endpoint = APIRouter(prefix='/api/v1')
@@ -43,20 +47,16 @@ async def get_user_followers(id='', token='', span='12', after='', before=''):
         usrflwrs_data = []
         if usrflwrs:
             for usrflwr in usrflwrs:
-                user = db_session.query(User).filter(
-                    User.id == usrflwr.follower_id
-                ).first()
+                user = fetch_user(db_session, usrflwr.follower_id)
                 if not user:
                     continue
-                currusrctn = db_session.query(UserFollowing).filter(and_(
-                    UserFollowing.follower_id == curruser_id,
-                    UserFollowing.following_id == user.id
-                )).first()
+                currusrctn = relationships.is_following(
+                    db_session, curruser_id, user.id)
                 flwr_info = {
                     'id': user.id,
                     'name': user.name,
                     'profielPictureId': user.profile_picture_id,
-                    'isFollowing': currusrctn is not None
+                    'isFollowing': currusrctn
                 }
                 usrflwrs_data.append(flwr_info)
         api_response = {
@@ -103,20 +103,16 @@ async def get_user_followings(id='', token='', span='12', after='', before=''):
         usrflwngs_data = []
         if usrflwngs:
             for usrflwng in usrflwngs:
-                user = db_session.query(User).filter(
-                    User.id == usrflwng.following_id
-                ).first()
+                user = fetch_user(db_session, usrflwng.following_id)
                 if not user:
                     continue
-                currusrctn = db_session.query(UserFollowing).filter(and_(
-                    UserFollowing.follower_id == currusr_id,
-                    UserFollowing.following_id == user.id
-                )).first()
+                currusrctn = relationships.is_following(
+                    db_session, currusr_id, user.id)
                 flwng_info = {
                     'id': user.id,
                     'name': user.name,
                     'profilePictureId': user.profile_picture_id,
-                    'isFollowing': currusrctn is not None
+                    'isFollowing': currusrctn
                 }
                 usrflwngs_data.append(flwng_info)
         api_response = {
@@ -152,10 +148,8 @@ async def toggle_user_follow(body: ConnectionSchema):
         return api_response
     db_session = get_session()
     try:
-        currusrctn = db_session.query(UserFollowing).filter(and_(
-            UserFollowing.follower_id == auth_token.user_id,
-            UserFollowing.following_id == body.followId
-        )).first()
+        currusrctn = is_following(
+            db_session, auth_token.user_id, body.followId)
         if currusrctn:
             db_session.query(UserFollowing).filter(and_(
                 UserFollowing.follower_id == auth_token.user_id,
@@ -163,20 +157,43 @@ async def toggle_user_follow(body: ConnectionSchema):
             )).delete(
                 synchronize_session=False
             )
+            retract(
+                db_session, 'follow', '', body.userId,
+                select(User.id).where(User.id == body.followId)
+            )
             db_session.commit()
+            follow_graph.apply(body.userId, body.followId, False)
+            relationships.follow(body.userId, body.followId, False)
+            cache.invalidate(f'user:{body.userId}', f'user:{body.followId}')
+            await publish(f'user:{body.followId}', 'user.follow', {
+                'userId': body.followId,
+                'followerId': body.userId,
+                'following': False
+            })
             api_response = {
                 'success': True,
                 'data': {'status': False}
             }
         else:
             new_ctn = UserFollowing(
-                id=str(uuid.uuid4()),
-                created_on=datetime.utcnow(),
+                id=uuid7(),
                 follower_id=body.userId,
                 following_id=body.followId
             )
             db_session.add(new_ctn)
+            notify(
+                db_session, 'follow', '', body.userId,
+                select(User.id).where(User.id == body.followId)
+            )
             db_session.commit()
+            follow_graph.apply(body.userId, body.followId, True)
+            relationships.follow(body.userId, body.followId, True)
+            cache.invalidate(f'user:{body.userId}', f'user:{body.followId}')
+            await publish(f'user:{body.followId}', 'user.follow', {
+                'userId': body.followId,
+                'followerId': body.userId,
+                'following': True
+            })
             api_response = {
                 'success': True,
                 'data': {'status': True}
@@ -187,3 +204,53 @@ async def toggle_user_follow(body: ConnectionSchema):
     finally:
         db_session.close()
     return api_response
+
+
+@endpoint.get('/suggestions')
+async def get_follow_suggestions(token: str, span='12'):
+    """Gets and returns users followed by the user's followings"""
+    api_response = {
+        'success': False,
+        'message': 'Invalid authentication token.'
+    }
+    auth_token = AuthTokenMngr.convert_token(token)
+    if auth_token is None:
+        return api_response
+    span = span.strip()
+    if span and re.fullmatch(r'\d+', span) is None:
+        api_response['message'] = 'Invalid span type.'
+        return api_response
+    span = int(span if span else '12')
+    await follow_graph.ensure_loaded()
+    db_session = get_session()
+    try:
+        skip = set()
+        while True:
+            suggested = follow_graph.suggest(auth_token.user_id, span, skip)
+            users = {}
+            if suggested:
+                users = {
+                    user.id: user for user in db_session.query(User).filter(
+                        User.id.in_([user_id for user_id, _ in suggested])
+                    ).all()
+                }
+            gone = {
+                user_id for user_id, _ in suggested if user_id not in users}
+            if not gone:
+                break
+            skip |= gone
+        api_response = {
+            'success': True,
+            'data': [
+                {
+                    'id': user_id,
+                    'name': users[user_id].name,
+                    'profilePictureId': users[user_id].profile_picture_id,
+                    'mutualsCount': overlap
+                }
+                for user_id, overlap in suggested
+            ]
+        }
+    finally:
+        db_session.close()
+    return api_response
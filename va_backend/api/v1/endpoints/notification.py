@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""Module for handling the notifications inbox endpoints"""
+import re
+from fastapi import APIRouter
+
+from ..database import get_session, User, Notification
+from ..form_types import NotificationReadSchema
+from ..utils.token_mgt import AuthTokenMngr
+from ..utils.pagination import paginate_list
+from ..utils.notifications import mark_read, unread_count
+
+
+endpoint = APIRouter(prefix='/api/v1')
+
+INBOX_SIZE = 240
+"""Maximum number of most recent notifications an inbox lists"""
+
+
+@endpoint.get('/notifications')
+async def get_notifications(token, span='', after='', before=''):
+    """Gets and returns the notifications of the current user"""
+    api_response = {
+        'success': False,
+        'message': 'Unable to retrieve notifications.'
+    }
+    auth_token = AuthTokenMngr.convert_token(token)
+    if auth_token is None:
+        api_response['message'] = 'Invalid authentication token.'
+        return api_response
+    db_session = get_session()
+    try:
+        span = span.strip()
+        if span and re.fullmatch(r'\d+', span) is None:
+            api_response = {
+                'success': False,
+                'message': 'Invalid span type.'
+            }
+            return api_response
+        span = int(span if span else '12')
+        notifications = db_session.query(Notification).filter(
+            Notification.user_id == auth_token.user_id
+        ).order_by(
+            Notification.updated_on.desc()
+        ).limit(INBOX_SIZE).all()
+        actor_ids = {notification.actor_id for notification in notifications}
+        actors = {}
+        if actor_ids:
+            actors = {
+                user.id: user for user in db_session.query(User).filter(
+                    User.id.in_(actor_ids)
+                ).all()
+            }
+        notifications_data = []
+        for notification in notifications:
+            actor = actors.get(notification.actor_id)
+            if not actor:
+                continue
+            notifications_data.append({
+                'id': notification.id,
+                'kind': notification.kind,
+                'subjectId': notification.subject_id,
+                'actor': {
+                    'id': actor.id,
+                    'name': actor.name,
+                    'profilePictureId': actor.profile_picture_id
+                },
+                'othersCount': len(notification.actor_ids) - 1,
+                'updatedOn': notification.updated_on.isoformat(),
+                'isRead': notification.read_on is not None
+            })
+        api_response = {
+            'success': True,
+            'data': {
+                'unreadCount': unread_count(db_session, auth_token.user_id),
+                'notifications': paginate_list(
+                    notifications_data,
+                    span,
+                    after,
+                    before,
+                    True,
+                    lambda x: x['id']
+                )
+            }
+        }
+    finally:
+        db_session.close()
+    return api_response
+
+
+@endpoint.get('/notifications-unread')
+async def get_unread_count(token):
+    """Gets and returns the unread notifications count of the current user"""
+    api_response = {
+        'success': False,
+        'message': 'Invalid authentication token.'
+    }
+    auth_token = AuthTokenMngr.convert_token(token)
+    if auth_token is None:
+        return api_response
+    db_session = get_session()
+    try:
+        api_response = {
+            'success': True,
+            'data': {
+                'unreadCount': unread_count(db_session, auth_token.user_id)
+            }
+        }
+    finally:
+        db_session.close()
+    return api_response
+
+
+@endpoint.put('/notifications-read')
+async def read_notifications(body: NotificationReadSchema):
+    """Marks the given (or all) notifications of a user as read"""
+    api_response = {
+        'success': False,
+        'message': 'Unable to mark notifications as read.'
+    }
+    auth_token = AuthTokenMngr.convert_token(body.authToken)
+    if auth_token is None or auth_token.user_id != body.userId:
+        api_response['message'] = 'Invalid authentication token.'
+        return api_response
+    db_session = get_session()
+    try:
+        marked = mark_read(db_session, body.userId, body.notificationIds)
+        db_session.commit()
+        api_response = {
+            'success': True,
+            'data': {
+                'markedCount': marked,
+                'unreadCount': unread_count(db_session, body.userId)
+            }
+        }
+    except Exception as ex:
+        print(ex.args[0])
+        db_session.rollback()
+    finally:
+        db_session.close()
+    return api_response
@@ -1,25 +1,105 @@
 #!/usr/bin/python3
 """Module for handling post-related API endpoints"""
-import json
-import uuid
 import re
-from fastapi import APIRouter
-from sqlalchemy import and_
+from fastapi import APIRouter, Request, Response
+from sqlalchemy import and_, func, select, union
 from datetime import datetime
 
 from ..utils.token_mgt import AuthTokenMngr
 from ..database import (
-    get_session, User, Comment, Post, PostLike, UserFollowing)
+    get_session, uuid7, User, Comment, Post, PostLike, UserFollowing)
 from ..form_types import (
     PostAddSchema, PostUpdateSchema, PostLikeSchema, PostDeleteSchema)
 from ..utils.pagination import paginate_list
+from ..utils.multi_get import (
+    MAX_IDS, parse_ids, in_request_order, grouped_counts)
+from ..utils.etag import version_etag, etag_matches, not_modified
+from ..utils.fieldsets import (
+    parse_fields, post_columns, post_fields, select_fields)
+from ..utils.statements import fetch_user, fetch_post, PENDING_USERS
+from ..realtime import publish
+from ..utils.notifications import notify, retract
+from ..utils.relationships import relationships
+from ..utils.cache import cache
+from ..utils.single_flight import read_through
 
 
 endpoint = APIRouter(prefix='/api/v1')
 
 
+def post_version(db_session, post_id):
+    """Gets the version details of a post without hydrating it"""
+    likes_cnt = select(func.count(PostLike.id)).where(and_(
+        PostLike.post_id == Post.id,
+        PostLike.user_id.notin_(PENDING_USERS)
+    )).scalar_subquery()
+    last_like = select(func.max(PostLike.created_on)).where(and_(
+        PostLike.post_id == Post.id,
+        PostLike.user_id.notin_(PENDING_USERS)
+    )).scalar_subquery()
+    comments_cnt = select(func.count(Comment.id)).where(and_(
+        Comment.post_id == Post.id,
+        Comment.comment_id == None,
+        Comment.user_id.notin_(PENDING_USERS)
+    )).scalar_subquery()
+    last_comment = select(func.max(Comment.created_on)).where(and_(
+        Comment.post_id == Post.id,
+        Comment.comment_id == None,
+        Comment.user_id.notin_(PENDING_USERS)
+    )).scalar_subquery()
+    version = db_session.query(
+        Post.updated_on.label('post_updated_on'),
+        User.updated_on.label('user_updated_on'),
+        likes_cnt.label('likes_count'),
+        last_like.label('last_like'),
+        comments_cnt.label('comments_count'),
+        last_comment.label('last_comment')
+    ).join(User, User.id == Post.user_id).filter(Post.id == post_id).first()
+    return version
+
+
+def load_post_page(post_id):
+    """Loads the viewer independent page of a post with its version parts
+
+    Runs in the threadpool, so it works in its own session, on the
+    primary as the page is cached.
+    """
+    db_session = get_session(primary=True)
+    try:
+        version = post_version(db_session, post_id)
+        if version is None:
+            return None, ()
+        post = fetch_post(db_session, post_id)
+        if not post:
+            return None, ()
+        user = fetch_user(db_session, post.user_id)
+        if not user:
+            return None, ()
+        return {
+            'data': {
+                'id': post.id,
+                'user': {
+                    'id': user.id,
+                    'name': user.name,
+                    'profilePictureId': user.profile_picture_id
+                },
+                'title': post.title,
+                'publishedOn': post.created_on.isoformat(),
+                'quotes': post.content,
+                'commentsCount': version.comments_count,
+                'likesCount': version.likes_count
+            },
+            'version': [
+                part.isoformat() if hasattr(part, 'isoformat') else part
+                for part in version
+            ]
+        }, (f'post:{post_id}', f'user:{user.id}')
+    finally:
+        db_session.close()
+
+
 @endpoint.get('/post')
-async def get_post(id: str, token: str):
+async def get_post(id: str, token: str, request: Request, response: Response):
     """Gets and returns infomation about a given post"""
     api_response = {
         'success': False,
@@ -27,49 +107,80 @@ async def get_post(id: str, token: str):
     }
     auth_token = AuthTokenMngr.convert_token(token)
     user_id = auth_token.user_id if auth_token is not None else None
+    page = await read_through(f'post-page:{id}', lambda: load_post_page(id))
+    if page is None:
+        return api_response
     db_session = get_session()
     try:
-        post = db_session.query(Post).filter(Post.id == id).first()
-        if post:
-            user = db_session.query(User).filter(
-                User.id == post.user_id
-            ).first()
-            if not user:
-                return api_response
-            comments = db_session.query(Comment).filter(and_(
-                Comment.post_id == id,
-                Comment.comment_id == None
-            )).all()
-            comments_cnt = len(comments) if comments else 0
-            likes = db_session.query(PostLike).filter(
-                PostLike.post_id == id
-            ).all()
-            likes_cnt = len(likes) if likes else 0
-            is_liked_by_user = False
-            if user_id:
-                post_dits = db_session.query(PostLike).filter(and_(
-                    PostLike.post_id == id,
-                    PostLike.user_id == user_id
-                )).first()
-                if post_dits:
-                    is_liked_by_user = True
-            api_response = {
-                'success': True,
-                'data': {
-                    'id': post.id,
-                    'user': {
-                        'id': user.id,
-                        'name': user.name,
-                        'profilePictureId': user.profile_picture_id
-                    },
-                    'title': post.title,
-                    'publishedOn': post.created_on.isoformat(),
-                    'quotes': json.JSONDecoder().decode(post.content),
-                    'commentsCount': comments_cnt,
-                    'likesCount': likes_cnt,
-                    'isLiked': is_liked_by_user
-                }
+        is_liked = relationships.is_post_liked(db_session, id, user_id)
+    finally:
+        db_session.close()
+    etag = version_etag('post', id, user_id, *page['version'], is_liked)
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return not_modified(etag)
+    response.headers['ETag'] = etag
+    api_response = {
+        'success': True,
+        'data': {**page['data'], 'isLiked': is_liked}
+    }
+    return api_response
+
+
+@endpoint.get('/posts')
+async def get_posts(ids: str, token=''):
+    """Gets and returns the posts of a list of ids in request order"""
+    api_response = {
+        'success': False,
+        'message': f'Up to {MAX_IDS} post ids are allowed.'
+    }
+    post_ids = parse_ids(ids)
+    if post_ids is None:
+        return api_response
+    auth_token = AuthTokenMngr.convert_token(token)
+    user_id = auth_token.user_id if auth_token is not None else None
+    db_session = get_session()
+    try:
+        rows = db_session.query(Post, User).join(
+            User, User.id == Post.user_id
+        ).filter(Post.id.in_(post_ids)).all() if post_ids else []
+        found_ids = [post.id for post, _ in rows]
+        likes_cnts = grouped_counts(
+            db_session, PostLike.id, PostLike.post_id, found_ids,
+            PostLike.user_id.notin_(PENDING_USERS)
+        )
+        comments_cnts = grouped_counts(
+            db_session, Comment.id, Comment.post_id, found_ids,
+            Comment.comment_id == None,
+            Comment.user_id.notin_(PENDING_USERS)
+        )
+        liked_ids = set()
+        if user_id and found_ids:
+            liked_ids = set(db_session.scalars(
+                select(PostLike.post_id).where(and_(
+                    PostLike.user_id == user_id,
+                    PostLike.post_id.in_(found_ids)
+                ))
+            ))
+        posts = {}
+        for post, user in rows:
+            posts[post.id] = {
+                'id': post.id,
+                'user': {
+                    'id': user.id,
+                    'name': user.name,
+                    'profilePictureId': user.profile_picture_id
+                },
+                'title': post.title,
+                'publishedOn': post.created_on.isoformat(),
+                'quotes': post.content,
+                'commentsCount': comments_cnts.get(post.id, 0),
+                'likesCount': likes_cnts.get(post.id, 0),
+                'isLiked': post.id in liked_ids
             }
+        api_response = {
+            'success': True,
+            'data': in_request_order(post_ids, posts)
+        }
     finally:
         db_session.close()
     return api_response
@@ -97,24 +208,27 @@ async def create_post(body: PostAddSchema):
         return api_response
     db_session = get_session()
     try:
-        gen_id = str(uuid.uuid4())
-        currdt = datetime.utcnow()
-        quotes_txt = json.JSONEncoder().encode(body.quotes)
+        gen_id = uuid7()
         post = Post(
             id=gen_id,
-            created_on=currdt,
-            updated_on=currdt,
             user_id=body.userId,
             title=body.title,
-            content=quotes_txt
+            content=body.quotes
         )
         db_session.add(post)
+        db_session.flush()
+        created_on = post.created_on
         db_session.commit()
+        cache.invalidate(f'user:{body.userId}')
+        await publish(f'user:{body.userId}', 'post.create', {
+            'postId': gen_id,
+            'userId': body.userId
+        })
         api_response = {
             'success': True,
             'data': {
                 'id': gen_id,
-                'createdOn': currdt.isoformat(),
+                'createdOn': created_on.isoformat(),
                 'repliesCount': 0,
                 'likesCount': 0
             }
@@ -149,17 +263,16 @@ async def modify_post(body: PostUpdateSchema):
         return api_response
     db_session = get_session()
     try:
-        currdt = datetime.utcnow()
-        quotes_txt = json.JSONEncoder().encode(body.quotes)
         db_session.query(Post).filter(Post.id == body.postId).update(
             {
                 Post.title: body.title,
-                Post.updated_on: currdt,
-                Post.content: quotes_txt
+                Post.updated_on: func.now(),
+                Post.content: body.quotes
             },
             synchronize_session=False
         )
         db_session.commit()
+        cache.invalidate(f'post:{body.postId}', f'user:{body.userId}')
         api_response = {
             'success': True,
             'data': {}
@@ -174,7 +287,7 @@ async def modify_post(body: PostUpdateSchema):
 
 @endpoint.delete('/post')
 async def delete_post(body: PostDeleteSchema):
-    """Permanently removes a post"""
+    """Marks a post for deletion by the background purge"""
     api_response = {
         'success': False,
         'message': 'Post deletion failed.'
@@ -185,28 +298,29 @@ async def delete_post(body: PostDeleteSchema):
         return api_response
     db_session = get_session()
     try:
-        post = db_session.query(Post).filter(and_(
+        marked = db_session.query(Post).filter(and_(
             Post.id == body.postId,
-            Post.user_id == body.userId
-        )).first()
-        if post:
-            db_session.query(PostLike).filter(
-                PostLike.post_id == body.postId
-            ).delete(
-                synchronize_session=False
-            )
-            db_session.query(Comment).filter(
-                Comment.post_id == body.postId
-            ).delete(
-                synchronize_session=False
-            )
-            db_session.query(Post).filter(and_(
-                Post.id == body.postId,
-                Post.user_id == body.userId
-            )).delete(
-                synchronize_session=False
-            )
+            Post.user_id == body.userId,
+            Post.deleted_on == None
+        )).update(
+            {
+                Post.updated_on: func.now(),
+                Post.deleted_on: func.now()
+            },
+            synchronize_session=False
+        )
+        if marked:
             db_session.commit()
+            engaged = db_session.scalars(union(
+                select(PostLike.user_id).where(
+                    PostLike.post_id == body.postId),
+                select(Comment.user_id).where(
+                    Comment.post_id == body.postId)
+            )).all()
+            cache.invalidate(
+                f'post:{body.postId}', f'user:{body.userId}',
+                *(f'user:{user_id}' for user_id in engaged)
+            )
             api_response = {
                 'success': True,
                 'data': {}
@@ -229,6 +343,9 @@ async def like_post(body: PostLikeSchema):
         return api_response
     db_session = get_session()
     try:
+        if not fetch_post(db_session, body.postId):
+            api_response['message'] = 'Post not found.'
+            return api_response
         prevlike = db_session.query(PostLike).filter(and_(
             PostLike.user_id == auth_token.user_id,
             PostLike.post_id == body.postId
@@ -238,22 +355,43 @@ async def like_post(body: PostLikeSchema):
                 PostLike.user_id == auth_token.user_id,
                 PostLike.post_id == body.postId
             )).delete(
-                synchronize_sessio=False
+                synchronize_session=False
+            )
+            retract(
+                db_session, 'like', body.postId, body.userId,
+                select(Post.user_id).where(Post.id == body.postId)
             )
             db_session.commit()
+            relationships.like(body.userId, body.postId, False)
+            cache.invalidate(f'post:{body.postId}', f'user:{body.userId}')
+            await publish(f'post:{body.postId}', 'post.like', {
+                'postId': body.postId,
+                'userId': body.userId,
+                'liked': False
+            })
             api_response = {
                 'success': True,
                 'data': {'status': False}
             }
         else:
             newlike = PostLike(
-                id=str(uuid.uuid4()),
-                created_on=datetime.utcnow(),
+                id=uuid7(),
                 user_id=body.userId,
                 post_id=body.postId
             )
             db_session.add(newlike)
+            notify(
+                db_session, 'like', body.postId, body.userId,
+                select(Post.user_id).where(Post.id == body.postId)
+            )
             db_session.commit()
+            relationships.like(body.userId, body.postId, True)
+            cache.invalidate(f'post:{body.postId}', f'user:{body.userId}')
+            await publish(f'post:{body.postId}', 'post.like', {
+                'postId': body.postId,
+                'userId': body.userId,
+                'liked': True
+            })
             api_response = {
                 'success': True,
                 'data': {'status': True}
@@ -267,7 +405,8 @@ async def like_post(body: PostLikeSchema):
 
 
 @endpoint.get('/posts-user-made')
-async def get_users_posts(userId, token='', span='', after='', before=''):
+async def get_users_posts(userId, token='', span='', after='', before='',
+                          fields='', view=''):
     """Gets and returns posts made by the current user"""
     api_response = {
         'success': False,
@@ -288,48 +427,24 @@ async def get_users_posts(userId, token='', span='', after='', before=''):
             db_session.close()
             return api_response
         span = int(span if span else '12')
-        posts_made = db_session.query(Post).filter(
+        fieldset = parse_fields(fields, view)
+        if fieldset is None:
+            api_response = {
+                'success': False,
+                'message': 'Invalid fields.'
+            }
+            return api_response
+        posts_made = db_session.query(*post_columns(fieldset)).filter(
             Post.user_id == userId
         ).all()
         post_data = []
         if posts_made:
-            user = db_session.query(User).filter(
-                User.id == userId
-            ).first()
+            user = fetch_user(db_session, userId)
             if not user:
                 return api_response
             for post in posts_made:
-                comments = db_session.query(Comment).filter(and_(
-                    Comment.post_id == post.id,
-                    Comment.comment_id == None
-                )).all()
-                comments_cnt = len(comments) if comments else 0
-                likes = db_session.query(PostLike).filter(
-                    PostLike.post_id == post.id
-                ).all()
-                likes_cnt = len(likes) if likes else 0
-                is_liked_by_user = False
-                if currusr_id:
-                    post_dits = db_session.query(PostLike).filter(and_(
-                        PostLike.post_id == post.id,
-                        PostLike.user_id == currusr_id
-                    )).first()
-                    if post_dits:
-                        is_liked_by_user = True
-                post_info = {
-                    'id': post.id,
-                    'user': {
-                        'id': user.id,
-                        'name': user.name,
-                        'profilePictureId': user.profile_picture_id
-                    },
-                    'title': post.title,
-                    'publishedOn': post.created_on.isoformat(),
-                    'qoutes': json.JSONDecoder().decode(post.content),
-                    'commentsCount': comments_cnt,
-                    'likesCount': likes_cnt,
-                    'isLiked': is_liked_by_user
-                }
+                post_info = post_fields(
+                    db_session, post, fieldset, currusr_id, user)
                 post_data.append(post_info)
         post_data.sort(
             key=lambda x: datetime.fromisoformat(x['publishedOn']),
@@ -337,14 +452,14 @@ async def get_users_posts(userId, token='', span='', after='', before=''):
         )
         api_response = {
             'success': True,
-            'data': paginate_list(
+            'data': select_fields(paginate_list(
                 post_data,
                 span,
                 after,
                 before,
                 True,
                 lambda x: x['id']
-            )
+            ), fieldset)
         }
     finally:
         db_session.close()
@@ -352,7 +467,8 @@ async def get_users_posts(userId, token='', span='', after='', before=''):
 
 
 @endpoint.get('/posts-user-likes')
-async def get_liked_posts(userId, token='', span='', after='', before=''):
+async def get_liked_posts(userId, token='', span='', after='', before='',
+                          fields='', view=''):
     """Gets and returns posts liked by a user"""
     api_response = {
         'success': False,
@@ -373,64 +489,41 @@ async def get_liked_posts(userId, token='', span='', after='', before=''):
             db_session.close()
             return api_response
         span = int(span if span else '12')
-        likes = db_session.query(PostLike).filter(
+        fieldset = parse_fields(fields, view)
+        if fieldset is None:
+            api_response = {
+                'success': False,
+                'message': 'Invalid fields.'
+            }
+            return api_response
+        likes = db_session.query(*post_columns(fieldset)).join(
+            PostLike, PostLike.post_id == Post.id
+        ).filter(
             PostLike.user_id == userId
-        ).all()
+        ).order_by(PostLike.created_on).all()
         liked_posts = []
-        for post_like in likes:
-            post = db_session.query(Post).filter(
-                Post.id == post_like.post_id
-            ).first()
-            user = db_session.query(User).filter(
-                User.id == post.user_id
-            ).first()
-            comments = db_session.query(Comment).filter(and_(
-                Comment.post_id == post.id,
-                Comment.comment_id == None
-            )).all()
-            comments_cnt = len(comments) if comments else 0
-            likes = db_session.query(PostLike).filter(
-                PostLike.post_id == post.id
-            ).all()
-            likes_cnt = len(likes) if likes else 0
-            is_liked_by_user = False
-            if user_id != userId:
-                post_dits = db_session.query(PostLike).filter(and_(
-                    PostLike.post_id == post.id,
-                    PostLike.user_id == user_id
-                )).first()
-                if post_dits:
-                    is_liked_by_user = True
-            else:
-                is_liked_by_user = True
-            likes_info = {
-                'id': post.id,
-                'user': {
-                    'id': user.id,
-                    'name': user.name,
-                    'profilePictureId': user.profile_picture_id
-                },
-                'title': post.title,
-                'publishedOn': post.created_on.isoformat(),
-                'quotes': json.JSONDecoder().decode(post.content),
-                'commentsCount': comments_cnt,
-                'likesCount': likes_cnt,
-                'isLiked': is_liked_by_user
-            }
+        for post in likes:
+            is_liked_by_user = True if user_id == userId else None
+            likes_info = post_fields(
+                db_session, post, fieldset, user_id,
+                is_liked=is_liked_by_user
+            )
+            if likes_info is None:
+                continue
             liked_posts.append(likes_info)
         liked_posts.sort(
             key=lambda x: datetime.fromisoformat(x['publishedOn'])
         )
         api_response = {
             'success': True,
-            'data': paginate_list(
+            'data': select_fields(paginate_list(
                 liked_posts,
                 span,
                 after,
                 before,
                 True,
                 lambda x: x['id']
-            )
+            ), fieldset)
         }
     finally:
         db_session.close()
@@ -438,7 +531,8 @@ async def get_liked_posts(userId, token='', span='', after='', before=''):
 
 
 @endpoint.get('/posts-feed')
-async def get_feed_posts(token, span='', after='', before=''):
+async def get_feed_posts(token, span='', after='', before='', fields='',
+                         view=''):
     """Gets and returns posts for a user's feed"""
     api_response = {
         'success': False,
@@ -460,6 +554,13 @@ async def get_feed_posts(token, span='', after='', before=''):
             db_session.close()
             return api_response
         span = int(span if span else '12')
+        fieldset = parse_fields(fields, view)
+        if fieldset is None:
+            api_response = {
+                'success': False,
+                'message': 'Invalid fields.'
+            }
+            return api_response
         usrflwngs = db_session.query(UserFollowing).filter(
             UserFollowing.follower_id == user_id
         ).all()
@@ -472,44 +573,17 @@ async def get_feed_posts(token, span='', after='', before=''):
                 map(lambda x: x.following_id, usrflwngs)))
         posts_data = []
         for id in posts_users_ids:
-            posts = db_session.query(Post).filter(
+            posts = db_session.query(*post_columns(fieldset)).filter(
                 Post.user_id == id
             ).limit(posts_per_flwngs).all()
-            user = db_session.query(User).filter(
-                User.id == id
-            ).first()
+            user = None
+            if posts and 'user' in fieldset:
+                user = fetch_user(db_session, id)
             for post in posts:
-                comments = db_session.query(Comment).filter(and_(
-                    Comment.post_id == post.id,
-                    Comment.comment_id == None
-                )).all()
-                comments_cnt = len(comments) if comments else 0
-                likes = db_session.query(PostLike).filter(
-                    PostLike.post_id == post.id
-                ).all()
-                likes_cnt = len(likes) if likes else 0
-                is_liked_by_user = False
-                if user_id:
-                    post_dits = db_session.query(PostLike).filter(and_(
-                        PostLike.post_id == post.id,
-                        PostLike.user_id == user_id
-                    )).first()
-                    if post_dits:
-                        is_liked_by_user = True
-                post_info = {
-                    'id': post.id,
-                    'user': {
-                        'id': user.id,
-                        'name': user.name,
-                        'profilePictureId': user.profile_picture_id
-                    },
-                    'title': post.title,
-                    'publishedOn': post.created_on.isoformat(),
-                    'quotes': json.JSONDecoder().decode(post.content),
-                    'commentsCount': comments_cnt,
-                    'likesCount': likes_cnt,
-                    'isLiked': is_liked_by_user
-                }
+                post_info = post_fields(
+                    db_session, post, fieldset, user_id, user)
+                if post_info is None:
+                    continue
                 posts_data.append(post_info)
         posts_data.sort(
             key=lambda x: datetime.fromisoformat(x['publishedOn']),
@@ -517,14 +591,14 @@ async def get_feed_posts(token, span='', after='', before=''):
         )
         api_response = {
             'success': True,
-            'data': paginate_list(
+            'data': select_fields(paginate_list(
                 posts_data,
                 span,
                 after,
                 before,
                 True,
                 lambda x: x['id']
-            )
+            ), fieldset)
         }
     finally:
         db_session.close()
@@ -532,7 +606,8 @@ async def get_feed_posts(token, span='', after='', before=''):
 
 
 @endpoint.get('/posts-explore')
-async def get_exploratory_posts(token, span='', after='', before=''):
+async def get_exploratory_posts(token, span='', after='', before='',
+                                fields='', view=''):
     """Gets and returns posts for the explore section"""
     api_response = {
         'success': False,
@@ -554,6 +629,13 @@ async def get_exploratory_posts(token, span='', after='', before=''):
             db_session.close()
             return api_response
         span = int(span if span else '12')
+        fieldset = parse_fields(fields, view)
+        if fieldset is None:
+            api_response = {
+                'success': False,
+                'message': 'Invalid fields.'
+            }
+            return api_response
         usrflwngs = db_session.query(UserFollowing).filter(
             UserFollowing.follower_id == user_id
         ).all()
@@ -564,44 +646,14 @@ async def get_exploratory_posts(token, span='', after='', before=''):
                 list(map(lambda x: x.following_id, usrflwngs))
             )
         explore_posts = []
-        posts = db_session.query(Post).filter(
+        posts = db_session.query(*post_columns(fieldset)).filter(
             Post.user_id.notin_(post_users_ids)
         ).limit(max_posts_cnt).all()
         for post in posts:
-            user = db_session.query(User).filter(
-                User.id == post.user_id
-            ).first()
-            comments = db_session.query(Comment).filter(and_(
-                Comment.post_id == post.id,
-                Comment.comment_id == None
-            )).all()
-            comments_cnt = len(comments) if comments else 0
-            likes = db_session.query(PostLike).filter(
-                PostLike.post_id == post.id
-            ).all()
-            likes_cnt = len(likes) if likes else 0
-            is_liked_by_user = False
-            if user_id:
-                post_dits = db_session.query(PostLike).filter(and_(
-                    PostLike.post_id == post.id,
-                    PostLike.user_id == user_id
-                )).first()
-                if post_dits:
-                    is_liked_by_user = True
-            post_info = {
-                'id': post.id,
-                'user': {
-                    'id': user.id,
-                    'name': user.name,
-                    'profilePictureId': user.profile_picture_id
-                },
-                'title': post.title,
-                'publishedOn': post.created_on.isoformat(),
-                'quotes': json.JSONDecoder().decode(post.content),
-                'commentsCount': comments_cnt,
-                'likesCount': likes_cnt,
-                'isLiked': is_liked_by_user
-            }
+            post_info = post_fields(
+                db_session, post, fieldset | {'likesCount'}, user_id)
+            if post_info is None:
+                continue
             explore_posts.append(post_info)
         explore_posts.sort(
             key=lambda x: x['likesCount'],
@@ -609,14 +661,14 @@ async def get_exploratory_posts(token, span='', after='', before=''):
         )
         api_response = {
             'success': True,
-            'data': paginate_list(
+            'data': select_fields(paginate_list(
                 explore_posts,
                 span,
                 after,
                 before,
                 True,
                 lambda x: x['id']
-            )
+            ), fieldset)
         }
     finally:
         db_session.close()
@@ -1,63 +1,32 @@
 #!/usr/bin/python3
 """Module for search endpoints, handling posts and user queries"""
-import json
 import re
 from fastapi import APIRouter
 from typing import List
-from sqlalchemy import and_
 from sqlalchemy.exc import SQLAlchemyError
 
-from ..database import (
-    get_session, User, Comment, Post, PostLike, UserFollowing)
+from ..database import get_session, User, Post
 from ..utils.token_mgt import AuthTokenMngr
 from ..utils.pagination import paginate_list
+from ..utils.fieldsets import (
+    parse_fields, post_columns, post_fields, select_fields)
+from ..utils.relationships import relationships
 
 
 endpoint = APIRouter(prefix='/api/v1')
 
 
-def unique_posts(
-        posts: List[Post], posts_seen: List[str], db_session, user_id):
-    """Gets and returns a list of uniques posts with user data"""
+def unique_posts(posts: list, posts_seen: List[str], db_session, user_id,
+                 fieldset: set):
+    """Gets and returns a list of uniques posts with the selected fields"""
     results = []
     for post in posts:
         if post.id in posts_seen:
             continue
         posts_seen.append(post.id)
-        user = db_session.query(User).filter(User.id == post.user_id).first()
-        if not user:
+        post_info = post_fields(db_session, post, fieldset, user_id)
+        if post_info is None:
             continue
-        comments = db_session.query(Comment).filter(and_(
-            Comment.post_id == post.id,
-            Comment.comment_id == None
-        )).all()
-        comments_cnt = len(comments) if comments else 0
-        likes = db_session.query(PostLike).filter(
-            PostLike.post_id == post.id
-        ).all()
-        likes_cnt = len(likes) if likes else 0
-        is_liked_by_user = False
-        if user_id:
-            post_dits = db_session.query(PostLike).filter(and_(
-                PostLike.post_id == post.id,
-                PostLike.user_id == user_id
-            )).first()
-            if post_dits:
-                is_liked_by_user = True
-        post_info = {
-            'user': {
-                'id': user.id,
-                'name': user.name,
-                'profilePictureId': user.profile_picture_id
-            },
-            'id': post.id,
-            'title': post.title,
-            'publishedOn': post.created_on.isoformat(),
-            'quotes': json.JSONDecoder().decode(post.content),
-            'commentsCount': comments_cnt,
-            'likesCount': likes_cnt,
-            'isLiked': is_liked_by_user
-        }
         results.append(post_info)
     return results
 
@@ -70,26 +39,20 @@ def unique_users(
         if user.id in users_seen:
             continue
         users_seen.append(user.id)
-        is_following = False
-        if user_id:
-            user_ctn = db_session.query(UserFollowing).filter(and_(
-                UserFollowing.follower_id == user_id,
-                UserFollowing.following_id == user.id
-            )).first()
-            if user_ctn:
-                is_following = True
+        user_ctn = relationships.is_following(db_session, user_id, user.id)
         user_info = {
             'id': user.id,
             'name': user.name,
             'profilePictureId': user.profile_picture_id,
-            'isFollowing': is_following
+            'isFollowing': user_ctn
         }
         results.append(user_info)
     return results
 
 
 @endpoint.get('/search-posts')
-async def search_posts(q='', token='', span='', after='', before=''):
+async def search_posts(q='', token='', span='', after='', before='',
+                       fields='', view=''):
     """Search and find posts based on query string and filters"""
     api_response = {
         'success': False,
@@ -107,15 +70,23 @@ async def search_posts(q='', token='', span='', after='', before=''):
             }
             return api_response
         span = int(span if span else '12')
+        fieldset = parse_fields(fields, view)
+        if fieldset is None:
+            api_response = {
+                'success': False,
+                'message': 'Invalid fields.'
+            }
+            return api_response
         query = q.replace('"', '')
         query = query.replace('\'', '').strip()
         if not query:
             return api_response
         query = re.sub(r'\s+', '&', query)
-        content_search_res = db_session.query(Post).filter(
+        columns = post_columns(fieldset)
+        content_search_res = db_session.query(*columns).filter(
             Post.__ts_content__.match(query, postgresql_regconfig='english')
         ).all()
-        title_search_res = db_session.query(Post).filter(
+        title_search_res = db_session.query(*columns).filter(
             Post.__ts_title__.match(query, postgresql_regconfig='english')
         ).all()
         posts_found = []
@@ -126,7 +97,8 @@ async def search_posts(q='', token='', span='', after='', before=''):
                     content_search_res,
                     posts_seen_ids,
                     db_session,
-                    user_id
+                    user_id,
+                    fieldset
                 )
             )
         if title_search_res:
@@ -135,19 +107,20 @@ async def search_posts(q='', token='', span='', after='', before=''):
                     title_search_res,
                     posts_seen_ids,
                     db_session,
-                    user_id
+                    user_id,
+                    fieldset
                 )
             )
         api_response = {
             'success': True,
-            'data': paginate_list(
+            'data': select_fields(paginate_list(
                 posts_found,
                 span,
                 after,
                 before,
                 True,
                 lambda x: x['id']
-            )
+            ), fieldset)
         }
     except SQLAlchemyError:
         api_response = {
@@ -1,11 +1,9 @@
 #!/usr/bin/python3
 """Module for handling user related endpoints"""
-import os
 import email_validator
-from fastapi import APIRouter
-from sqlalchemy import and_, or_
-from imagekitio import ImageKit
-from datetime import datetime
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, select, union
 
 from ..form_types import UserUpdateSchema, UserDeleteSchema
 from ..database import (
@@ -17,13 +15,99 @@ from ..database import (
     Comment
 )
 from ..utils.token_mgt import AuthTokenMngr
+from ..utils.image_cdn import get_imagekit
+from ..utils.etag import version_etag, etag_matches, not_modified
+from ..utils.statements import fetch_user, PENDING_USERS, PENDING_POSTS
+from ..utils.multi_get import (
+    MAX_IDS, parse_ids, in_request_order, grouped_counts)
+from ..utils.user_export import stream_export
+from ..utils.relationships import relationships
+from ..utils.cache import cache
 
 
 endpoint = APIRouter(prefix='/api/v1')
 
 
+def user_version(db_session, id):
+    """Gets the update time and counters that version a user profile"""
+    def count_of(column, reference, *conditions):
+        """Builds a correlated count subquery over a user reference"""
+        return select(func.count(column)).where(
+            reference == User.id, *conditions
+        ).scalar_subquery()
+
+    def last_of(column, reference, *conditions):
+        """Builds a correlated latest-timestamp subquery"""
+        return select(func.max(column)).where(
+            reference == User.id, *conditions
+        ).scalar_subquery()
+
+    live_follower = UserFollowing.follower_id.notin_(PENDING_USERS)
+    live_following = UserFollowing.following_id.notin_(PENDING_USERS)
+    live_like = PostLike.post_id.notin_(PENDING_POSTS)
+    live_comment = Comment.post_id.notin_(PENDING_POSTS)
+
+    version = db_session.query(
+        User.updated_on.label('updated_on'),
+        count_of(
+            UserFollowing.id, UserFollowing.following_id, live_follower
+        ).label('followers_count'),
+        last_of(
+            UserFollowing.created_on, UserFollowing.following_id,
+            live_follower
+        ).label('last_follower'),
+        count_of(
+            UserFollowing.id, UserFollowing.follower_id, live_following
+        ).label('followings_count'),
+        last_of(
+            UserFollowing.created_on, UserFollowing.follower_id,
+            live_following
+        ).label('last_following'),
+        count_of(Post.id, Post.user_id).label('posts_count'),
+        last_of(Post.updated_on, Post.user_id).label('last_post'),
+        count_of(PostLike.id, PostLike.user_id, live_like).label(
+            'likes_count'),
+        last_of(PostLike.created_on, PostLike.user_id, live_like).label(
+            'last_like'),
+        count_of(Comment.id, Comment.user_id, live_comment).label(
+            'comments_count'),
+        last_of(Comment.created_on, Comment.user_id, live_comment).label(
+            'last_comment')
+    ).filter(User.id == id).first()
+    return version
+
+
+def profile_version(id):
+    """Gets the counters and ETag version parts of a user, cached
+
+    They are loaded from the primary, as a lagging replica would have
+    stale counters cached for their whole lifetime.
+    """
+    def load():
+        """Loads the profile counters of the user"""
+        db_session = get_session(primary=True)
+        try:
+            version = user_version(db_session, id)
+        finally:
+            db_session.close()
+        if not version:
+            return None, ()
+        return {
+            'followersCount': version.followers_count,
+            'followingsCount': version.followings_count,
+            'postsCount': version.posts_count,
+            'likesCount': version.likes_count,
+            'commentsCount': version.comments_count,
+            'version': [
+                part.isoformat() if hasattr(part, 'isoformat') else part
+                for part in version
+            ]
+        }, (f'user:{id}',)
+    return cache.fetch(f'user-version:{id}', load)
+
+
 @endpoint.get('/user')
-async def get_user(id: str, token=''):
+async def get_user(id: str, request: Request, response: Response, token=''):
     """Gets and returns info on a specified user"""
     api_response = {
         'success': False,
@@ -35,32 +119,18 @@ async def get_user(id: str, token=''):
     user_id = auth_token.user_id if auth_token is not None else ''
     db_session = get_session()
     try:
-        user = db_session.query(User).filter(User.id == id).first()
-        if user:
-            followers = db_session.query(UserFollowing).filter(
-                UserFollowing.following_id == user.id
-            ).all()
-            followings = db_session.query(UserFollowing).filter(
-                UserFollowing.follower_id == user.id
-            ).all()
-            posts = db_session.query(Post).filter(
-                Post.user_id == user.id
-            ).all()
-            likes = db_session.query(PostLike).filter(
-                PostLike.user_id == user.id
-            ).all()
-            comments = db_session.query(Comment).filter(
-                Comment.user_id == user.id
-            ).all()
-            currusr_ctn = db_session.query(UserFollowing).filter(and_(
-                UserFollowing.follower_id == user.id,
-                UserFollowing.following_id == user.id
-            )).first()
-            flwrs_cnt = len(followers) if followers else 0
-            flwngs_cnt = len(followings) if followings else 0
-            posts_cnt = len(posts) if posts else 0
-            likes_cnt = len(likes) if likes else 0
-            comments_cnt = len(comments) if comments else 0
+        version = profile_version(id)
+        if version:
+            is_following = relationships.is_following(
+                db_session, user_id, id)
+            etag = version_etag(
+                'user', id, user_id, *version['version'], is_following)
+            if etag_matches(request.headers.get('if-none-match'), etag):
+                return not_modified(etag)
+            user = fetch_user(db_session, id)
+            if not user:
+                return api_response
+            response.headers['ETag'] = etag
             api_response = {
                 'success': True,
                 'data': {
@@ -70,12 +140,12 @@ async def get_user(id: str, token=''):
                     'email': user.email if user.id == user_id else '',
                     'bio': user.bio,
                     'profilePictureId': user.profile_picture_id,
-                    'followersCount': flwrs_cnt,
-                    'followingsCount': flwngs_cnt,
-                    'postsCount': posts_cnt,
-                    'likesCount': likes_cnt,
-                    'commentsCount': comments_cnt,
-                    'isFollowing': currusr_ctn is not None
+                    'followersCount': version['followersCount'],
+                    'followingsCount': version['followingsCount'],
+                    'postsCount': version['postsCount'],
+                    'likesCount': version['likesCount'],
+                    'commentsCount': version['commentsCount'],
+                    'isFollowing': is_following
                 }
             }
     finally:
@@ -83,6 +153,100 @@ async def get_user(id: str, token=''):
     return api_response
 
 
+@endpoint.get('/users')
+async def get_users(ids: str, token=''):
+    """Gets and returns the users of a list of ids in request order"""
+    api_response = {
+        'success': False,
+        'message': f'Up to {MAX_IDS} user ids are allowed.'
+    }
+    user_ids = parse_ids(ids)
+    if user_ids is None:
+        return api_response
+    auth_token = AuthTokenMngr.convert_token(token)
+    user_id = auth_token.user_id if auth_token is not None else ''
+    db_session = get_session()
+    try:
+        found = db_session.query(User).filter(
+            User.id.in_(user_ids)).all() if user_ids else []
+        found_ids = [user.id for user in found]
+        followers_cnts = grouped_counts(
+            db_session, UserFollowing.id, UserFollowing.following_id,
+            found_ids, UserFollowing.follower_id.notin_(PENDING_USERS)
+        )
+        followings_cnts = grouped_counts(
+            db_session, UserFollowing.id, UserFollowing.follower_id,
+            found_ids, UserFollowing.following_id.notin_(PENDING_USERS)
+        )
+        posts_cnts = grouped_counts(
+            db_session, Post.id, Post.user_id, found_ids)
+        likes_cnts = grouped_counts(
+            db_session, PostLike.id, PostLike.user_id, found_ids,
+            PostLike.post_id.notin_(PENDING_POSTS)
+        )
+        comments_cnts = grouped_counts(
+            db_session, Comment.id, Comment.user_id, found_ids,
+            Comment.post_id.notin_(PENDING_POSTS)
+        )
+        followed_ids = set()
+        if user_id and found_ids:
+            followed_ids = set(db_session.scalars(
+                select(UserFollowing.following_id).where(and_(
+                    UserFollowing.follower_id == user_id,
+                    UserFollowing.following_id.in_(found_ids)
+                ))
+            ))
+        users = {}
+        for user in found:
+            users[user.id] = {
+                'id': user.id,
+                'joined': user.created_on.isoformat(),
+                'name': user.name,
+                'email': user.email if user.id == user_id else '',
+                'bio': user.bio,
+                'profilePictureId': user.profile_picture_id,
+                'followersCount': followers_cnts.get(user.id, 0),
+                'followingsCount': followings_cnts.get(user.id, 0),
+                'postsCount': posts_cnts.get(user.id, 0),
+                'likesCount': likes_cnts.get(user.id, 0),
+                'commentsCount': comments_cnts.get(user.id, 0),
+                'isFollowing': user.id in followed_ids
+            }
+        api_response = {
+            'success': True,
+            'data': in_request_order(user_ids, users)
+        }
+    finally:
+        db_session.close()
+    return api_response
+
+
+@endpoint.get('/user/export')
+async def export_user(token: str):
+    """Streams all of the user's data as newline delimited JSON"""
+    api_response = {
+        'success': False,
+        'message': 'Invalid authentication token.'
+    }
+    auth_token = AuthTokenMngr.convert_token(token)
+    if auth_token is None:
+        return api_response
+    db_session = get_session()
+    user = fetch_user(db_session, auth_token.user_id)
+    if not user:
+        db_session.close()
+        api_response['message'] = 'User not found.'
+        return api_response
+    return StreamingResponse(
+        stream_export(db_session, user),
+        media_type='application/x-ndjson',
+        headers={
+            'Content-Disposition':
+                'attachment; filename="verbum-antiqua-export.ndjson"'
+        }
+    )
+
+
 @endpoint.put('/user')
 async def update_user_info(body: UserUpdateSchema):
     """Updates the info of a user's profile"""
@@ -100,13 +264,9 @@ async def update_user_info(body: UserUpdateSchema):
     elif len(body.bio) > 384:
         api_response['message'] = 'Bio is too long.'
     db_session = get_session()
-    imagekit = ImageKit(
-        private_key=os.getenv('IMG_CDN_PRIV_KEY'),
-        public_key=os.getenv('IMG_CDN_PUB_KEY'),
-        url_endpoint=os.getenv('IMG_CDN_URL_ENDPNT')
-    )
     try:
         email_validator.validate_email(body.email)
+        imagekit = get_imagekit()
         profile_pic_file_id = body.profilePictureId.strip()
         if body.removeProfilePicture:
             if profile_pic_file_id:
@@ -115,9 +275,7 @@ async def update_user_info(body: UserUpdateSchema):
         if body.profilePicture and not body.removeProfilePicture:
             if profile_pic_file_id:
                 imagekit.delete_file(profile_pic_file_id)
-            user = db_session.query(User).filter(
-                User.id == body.userId
-            ).first()
+            user = fetch_user(db_session, body.userId)
             if user.profile_picture_id:
                 imagekit.delete_file(user.profile_picture_id)
             upload_res = imagekit.upload_file(
@@ -135,7 +293,7 @@ async def update_user_info(body: UserUpdateSchema):
                 raise ValueError(upload_res['error']['message'])
         db_session.query(User).filter(User.id == body.userId).update(
             {
-                User.updated_on: datetime.utcnow(),
+                User.updated_on: func.now(),
                 User.name: body.name,
                 User.profile_picture_id: profile_pic_file_id,
                 User.email: body.email,
@@ -144,6 +302,7 @@ async def update_user_info(body: UserUpdateSchema):
             synchronize_session=False
         )
         db_session.commit()
+        cache.invalidate(f'user:{body.userId}')
         new_auth_token = AuthTokenMngr(
             user_id=body.userId,
             email=body.email,
@@ -168,7 +327,7 @@ async def update_user_info(body: UserUpdateSchema):
 
 @endpoint.delete('/user')
 async def remove_user(body: UserDeleteSchema):
-    """Permanently deletes user data and account"""
+    """Marks a user account for deletion by the background purge"""
     api_response = {
         'success': False,
         'message': 'Unable to delete user data.'
@@ -179,39 +338,45 @@ async def remove_user(body: UserDeleteSchema):
         return api_response
     db_session = get_session()
     try:
-        db_session.query(UserFollowing).filter(or_(
-            UserFollowing.follower_id == body.userId,
-            UserFollowing.following_id == body.userId
-        )).delete(
+        db_session.query(User).filter(and_(
+            User.id == body.userId,
+            User.deleted_on == None
+        )).update(
+            {
+                User.updated_on: func.now(),
+                User.deleted_on: func.now()
+            },
             synchronize_session=False
         )
-        db_session.query(PostLike).filter(
-            PostLike.user_id == body.userId
-        ).delete(
+        db_session.query(Post).filter(and_(
+            Post.user_id == body.userId,
+            Post.deleted_on == None
+        )).update(
+            {
+                Post.deleted_on: func.now()
+            },
             synchronize_session=False
         )
-        comments = db_session.query(Comment).filter(and_(
-            Comment.user_id == body.userId,
-            Comment.comment_id == None
+        db_session.commit()
+        own_posts = select(Post.__table__.c.id).where(
+            Post.__table__.c.user_id == body.userId)
+        related_users = db_session.scalars(union(
+            select(UserFollowing.following_id).where(
+                UserFollowing.follower_id == body.userId),
+            select(UserFollowing.follower_id).where(
+                UserFollowing.following_id == body.userId),
+            select(PostLike.user_id).where(PostLike.post_id.in_(own_posts)),
+            select(Comment.user_id).where(Comment.post_id.in_(own_posts))
         )).all()
-        comment_ids = map(lambda x: x.id, comments)
-        db_session.query(Comment).filter(or_(
-            Comment.comment_id.in_(comment_ids),
-            Comment.user_id == body.userId
-        )).delete(
-            synchronize_session=False
-        )
-        db_session.query(Post).filter(
-            Post.user_id == body.userId
-        ).delete(
-            synchronize_session=False
-        )
-        db_session.query(User).filter(
-            User.id == body.userId
-        ).delete(
-            synchronize_session=False
+        related_posts = db_session.scalars(union(
+            select(PostLike.post_id).where(PostLike.user_id == body.userId),
+            select(Comment.post_id).where(Comment.user_id == body.userId)
+        )).all()
+        cache.invalidate(
+            f'user:{body.userId}',
+            *(f'user:{user_id}' for user_id in related_users),
+            *(f'post:{post_id}' for post_id in related_posts)
         )
-        db_session.commit()
         api_response = {
             'success': True,
             'data': {}
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """Module containing data models for various API requests"""
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 
 class SignInSchema(BaseModel):
@@ -99,3 +99,22 @@ class CommentDeleteSchema(BaseModel):
     authToken: str
     userId: str
     commentId: str
+
+
+class NotificationReadSchema(BaseModel):
+    """Schema for marking notifications as read"""
+    authToken: str
+    userId: str
+    notificationIds: List[str] = []
+
+
+class BatchItemSchema(BaseModel):
+    """Schema for a single GET sub-request of a batch"""
+    path: str
+    params: Dict[str, str] = {}
+
+
+class BatchSchema(BaseModel):
+    """Schema for running several GET requests in one round trip"""
+    token: str = ''
+    requests: List[BatchItemSchema]
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+"""Module for registering tasks run when a server worker starts or stops"""
+import inspect
+
+
+startup_tasks = []
+"""Tasks run before the worker starts accepting connections"""
+
+shutdown_tasks = []
+"""Tasks run after the worker has drained its connections"""
+
+
+def on_startup(task):
+    """Registers a task to run at worker startup"""
+    startup_tasks.append(task)
+    return task
+
+
+def on_shutdown(task):
+    """Registers a task to run at worker shutdown"""
+    shutdown_tasks.append(task)
+    return task
+
+
+async def run_tasks(tasks, *args):
+    """Runs registered tasks in order, awaiting coroutine tasks"""
+    for task in tasks:
+        result = task(*args)
+        if inspect.isawaitable(result):
+            await result
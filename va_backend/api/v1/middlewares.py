@@ -1,8 +1,214 @@
 #!/usr/bin/python3
 """Module for adding middlewares to the FastAPI app"""
+import os
+import time
 from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
-from starlette.middleware.gzip import GZipMiddleware
+
+from .utils.compression import (
+    negotiate_encoding,
+    compress_bytes,
+    body_etag,
+    StreamCompressor,
+    CompressedBytesCache
+)
+from .utils.metrics import (
+    RequestStats, request_stats, route_template, observe_request)
+from .database import read_from_replica
+
+
+COMPRESSION_LEVELS = {
+    'default': {'br': 4, 'zstd': 3, 'gzip': 6},
+    '/api/v1/posts-feed': {'br': 3, 'zstd': 2, 'gzip': 5},
+    '/api/v1/posts-explore': {'br': 3, 'zstd': 2, 'gzip': 5},
+    '/api/v1/search-posts': {'br': 3, 'zstd': 2, 'gzip': 5},
+    '/api/v1/search-people': {'br': 3, 'zstd': 2, 'gzip': 5},
+    '/api/v1/post': {'br': 9, 'zstd': 12, 'gzip': 9},
+    '/': {'br': 11, 'zstd': 19, 'gzip': 9},
+    '/api': {'br': 11, 'zstd': 19, 'gzip': 9},
+    '/api/v1': {'br': 11, 'zstd': 19, 'gzip': 9}
+}
+"""Compression level per route template and encoding"""
+
+CACHEABLE_ROUTES = {'/', '/api', '/api/v1', '/api/v1/post'}
+"""Route templates whose compressed bodies are cached by ETag"""
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'text/',
+    'image/svg+xml'
+)
+"""Content types worth compressing"""
+
+
+class CompressionMiddleware:
+    """Compresses responses with the best encoding the client accepts"""
+    def __init__(self, app, minimum_size=1024, levels=None,
+                 cacheable_routes=(), cache_size=32 * 1024 * 1024):
+        """Initialize the CompressionMiddleware class"""
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels if levels else {}
+        self.cacheable_routes = set(cacheable_routes)
+        self.cache = CompressedBytesCache(cache_size)
+
+    async def __call__(self, scope, receive, send):
+        """Handles an ASGI request and compresses its response body"""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    """Per-request state for compressing a single response"""
+    def __init__(self, middleware, scope, send, encoding):
+        """Initialize the CompressionResponder class"""
+        self.middleware = middleware
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    def route_path(self):
+        """Gets the route template that handled the request"""
+        route = self.scope.get('route')
+        return getattr(route, 'path', self.scope['path'])
+
+    def level(self):
+        """Gets the compression level configured for the route"""
+        levels = self.middleware.levels
+        route_levels = levels.get(self.route_path(), levels.get('default', {}))
+        return route_levels.get(self.encoding, 6)
+
+    async def send(self, message):
+        """Intercepts response messages and compresses the body"""
+        if message['type'] == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            self.passthrough = any([
+                message['status'] != 200,
+                'content-encoding' in headers,
+                not content_type.startswith(COMPRESSIBLE_TYPES)
+            ])
+            if self.passthrough:
+                await self.downstream(message)
+            else:
+                self.start_message = message
+            return
+        if self.passthrough or message['type'] != 'http.response.body':
+            await self.downstream(message)
+            return
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        headers = MutableHeaders(raw=self.start_message['headers'])
+        if self.compressor is None and not more_body:
+            await self.send_complete(headers, body)
+            return
+        if self.compressor is None:
+            self.compressor = StreamCompressor(self.encoding, self.level())
+            del headers['content-length']
+            headers['content-encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            await self.downstream(self.start_message)
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self.downstream({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': more_body
+            })
+
+    async def send_complete(self, headers, body):
+        """Compresses a single-message body, reusing cached bytes"""
+        headers.add_vary_header('Accept-Encoding')
+        if len(body) < self.middleware.minimum_size:
+            await self.downstream(self.start_message)
+            await self.downstream({'type': 'http.response.body', 'body': body})
+            return
+        level = self.level()
+        payload = None
+        etag = None
+        if self.route_path() in self.middleware.cacheable_routes:
+            etag = headers.get('etag')
+            if etag is None:
+                etag = body_etag(body)
+                headers['etag'] = etag
+            payload = self.middleware.cache.get(etag, self.encoding, level)
+        if payload is None:
+            payload = compress_bytes(body, self.encoding, level)
+            if etag is not None:
+                self.middleware.cache.put(etag, self.encoding, level, payload)
+        headers['content-encoding'] = self.encoding
+        headers['content-length'] = str(len(payload))
+        await self.downstream(self.start_message)
+        await self.downstream({'type': 'http.response.body', 'body': payload})
+
+
+class MetricsMiddleware:
+    """Records latency and SQL statement counts of each HTTP request"""
+    def __init__(self, app):
+        """Initialize the MetricsMiddleware class"""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        """Handles an ASGI request and observes its metrics"""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        stats_token = request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            """Captures the response status code"""
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            observe_request(
+                scope['method'],
+                route_template(scope),
+                status,
+                time.perf_counter() - started,
+                stats
+            )
+            request_stats.reset(stats_token)
+
+
+class ReadRoutingMiddleware:
+    """Lets the database sessions of GET requests read from a replica"""
+    def __init__(self, app):
+        """Initialize the ReadRoutingMiddleware class"""
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        """Handles an ASGI request, marking safe methods as replica reads"""
+        if scope['type'] != 'http' or scope['method'] not in ('GET', 'HEAD'):
+            await self.app(scope, receive, send)
+            return
+        routing_token = read_from_replica.set(True)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            read_from_replica.reset(routing_token)
 
 
 def config_middlewares(app: FastAPI):
@@ -14,4 +220,12 @@ def config_middlewares(app: FastAPI):
         allow_methods=['*'],
         allow_headers=['*']
     )
-    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    app.add_middleware(ReadRoutingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=1024,
+        levels=COMPRESSION_LEVELS,
+        cacheable_routes=CACHEABLE_ROUTES,
+        cache_size=int(os.getenv('APP_COMPRESSION_CACHE_MB', '32')) << 20
+    )
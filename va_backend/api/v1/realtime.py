@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Module for pushing activity events to clients over Socket.IO"""
+import os
+from fastapi import FastAPI
+
+
+MAX_ROOMS = 200
+"""Maximum number of rooms a single socket can subscribe to"""
+
+ROOM_KINDS = {'posts': 'post', 'users': 'user'}
+"""Subscription payload keys mapped to their room name prefix"""
+
+sio = None
+"""The Socket.IO server mounted on the app"""
+
+
+def room_names(data) -> list:
+    """Builds room names from a {'posts': [...], 'users': [...]} payload"""
+    if not isinstance(data, dict):
+        return []
+    rooms = []
+    for key, prefix in ROOM_KINDS.items():
+        ids = data.get(key)
+        if not isinstance(ids, list):
+            continue
+        rooms.extend(
+            f'{prefix}:{id}' for id in ids if isinstance(id, str) and id)
+    return rooms
+
+
+async def subscribe(sid, data):
+    """Joins the rooms of the given posts and users"""
+    rooms = room_names(data)
+    joined = [room for room in sio.rooms(sid) if room != sid]
+    if len(joined) + len(rooms) > MAX_ROOMS:
+        return {'success': False, 'message': 'Too many subscriptions.'}
+    for room in rooms:
+        await sio.enter_room(sid, room)
+    return {'success': True, 'data': {'rooms': rooms}}
+
+
+async def unsubscribe(sid, data):
+    """Leaves the rooms of the given posts and users"""
+    rooms = room_names(data)
+    for room in rooms:
+        await sio.leave_room(sid, room)
+    return {'success': True, 'data': {'rooms': rooms}}
+
+
+async def publish(room: str, event: str, data: dict):
+    """Emits an event to a room without failing the calling request"""
+    if sio is None:
+        return
+    try:
+        await sio.emit(event, data, room=room)
+    except Exception as ex:
+        print(f'Event publishing failed: {ex}')
+
+
+def config_realtime(app: FastAPI):
+    """Mounts the Socket.IO server on the app at /ws
+
+    Runs as a startup task: socketio eagerly imports its optional client
+    and Redis dependencies, which would otherwise weigh on every worker's
+    import time.
+    """
+    global sio
+    from fastapi_socketio import SocketManager
+    options = {}
+    redis_url = os.getenv('REDIS_URL')
+    if redis_url:
+        import socketio
+        options['client_manager'] = socketio.AsyncRedisManager(redis_url)
+    if os.getenv('APP_MODE', '') == 'production':
+        options['transports'] = ['websocket']
+    # Starlette keeps the mount prefix in scope['path'], so engine.io has
+    # to match the full path rather than the path below the mount
+    SocketManager(
+        app,
+        mount_location='/ws',
+        socketio_path='ws/socket.io',
+        cors_allowed_origins='*',
+        **options
+    )
+    sio = app.sio
+    sio.on('subscribe', subscribe)
+    sio.on('unsubscribe', unsubscribe)
@@ -1,6 +1,14 @@
 #!/usr/bin/python3
 """Module for API server setup and execution"""
 import os
+import sys
+import signal
+import socket
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
@@ -10,11 +18,28 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from .endpoint import config_endpoints
 from .middlewares import config_middlewares
+from .realtime import config_realtime
+from .lifecycle import (
+    on_startup, on_shutdown, run_tasks, startup_tasks, shutdown_tasks)
+from .database import warm_pool
+from .utils.purge import PurgeWorker
+from .utils.follow_graph import follow_graph
+from .utils.cache import cache
+from .utils.raw_json import RawJSONResponse
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warms the worker up before it accepts traffic"""
+    await run_tasks(startup_tasks, app)
+    yield
+    await run_tasks(shutdown_tasks, app)
+
+
+app = FastAPI(default_response_class=RawJSONResponse, lifespan=lifespan)
 config_middlewares(app)
 config_endpoints(app)
+on_startup(config_realtime)
 
 
 async def handle_exceptions(request, exc):
@@ -32,10 +57,169 @@ app.add_exception_handler(RequestValidationError, handle_exceptions)
 app.add_exception_handler(Exception, handle_exceptions)
 
 
+@on_startup
+def warm_database_pool(app: FastAPI):
+    """Opens the database connection pool of the worker"""
+    warm_pool()
+
+
+purge_worker = PurgeWorker()
+"""Background purge of the users and posts marked for deletion"""
+
+
+@on_startup
+def start_purge_worker(app: FastAPI):
+    """Starts purging pending deletions in the background"""
+    purge_worker.start()
+
+
+@on_shutdown
+async def stop_purge_worker(app: FastAPI):
+    """Lets the purge commit its current batch before exiting"""
+    await purge_worker.stop()
+
+
+@on_startup
+def start_follow_graph(app: FastAPI):
+    """Builds the follow graph in the background and keeps it fresh"""
+    follow_graph.start()
+
+
+@on_shutdown
+async def stop_follow_graph(app: FastAPI):
+    """Stops rebuilding the follow graph"""
+    await follow_graph.stop()
+
+
+@on_startup
+def start_cache_invalidations(app: FastAPI):
+    """Applies the cache invalidations made by the other workers"""
+    cache.start()
+
+
+@on_shutdown
+def stop_cache_invalidations(app: FastAPI):
+    """Stops listening to the cache invalidations"""
+    cache.stop()
+
+
+SHARED_TABLE_FILES = (
+    ('APP_SIGNIN_LIMITER_FILE', 'va-signin-'),
+    ('DB_REPLICA_STICKY_FILE', 'va-writers-')
+)
+"""Memory mapped tables shared by the workers, by env var and file prefix"""
+
+
+def create_socket(host: str, port: int) -> socket.socket:
+    """Binds a SO_REUSEPORT socket the worker listens on after warmup"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, 'SO_REUSEPORT'):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def run_worker(host: str, port: int, grace_period: int):
+    """Runs one production worker with its own listening socket"""
+    sock = create_socket(host, port)
+    config = uvicorn.Config(
+        app,
+        loop='uvloop',
+        http='httptools',
+        lifespan='on',
+        log_level='info',
+        timeout_graceful_shutdown=grace_period
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def run_production(host: str, port: int, workers: int, grace_period: int):
+    """Supervises the worker processes until SIGTERM or SIGINT"""
+    metrics_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if not metrics_dir:
+        metrics_dir = tempfile.mkdtemp(prefix='va-metrics-')
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = metrics_dir
+    else:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+    shared_tables = []
+    shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+    for env_var, prefix in SHARED_TABLE_FILES:
+        if os.getenv(env_var):
+            continue
+        table_fd, table_file = tempfile.mkstemp(prefix=prefix, dir=shm_dir)
+        os.close(table_fd)
+        os.environ[env_var] = table_file
+        shared_tables.append(table_file)
+    os.environ['APP_MODE'] = 'production'
+    os.environ['APP_WORKERS'] = str(workers)
+    context = multiprocessing.get_context('spawn')
+    worker_args = (host, port, grace_period)
+    processes = []
+    stopping = False
+
+    def start_worker():
+        """Spawns and tracks a new worker process"""
+        process = context.Process(target=run_worker, args=worker_args)
+        process.start()
+        processes.append(process)
+
+    def stop_workers(signum, frame):
+        """Forwards the shutdown signal so each worker drains gracefully"""
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+    for _ in range(workers):
+        start_worker()
+    while processes:
+        for process in list(processes):
+            process.join(timeout=1)
+            if process.exitcode is None:
+                continue
+            processes.remove(process)
+            if not stopping:
+                print(f'Worker {process.pid} exited, restarting it.')
+                start_worker()
+    for table_file in shared_tables:
+        os.remove(table_file)
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Verbum Antiqua API server')
+    parser.add_argument(
+        '--production',
+        action='store_true',
+        default=os.getenv('APP_MODE', '') == 'production',
+        help='run the multi-worker production server'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('APP_WORKERS', os.cpu_count() or 1)),
+        help='number of worker processes in production mode'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=int(os.getenv('APP_PORT', '5000')),
+        help='port to listen on'
+    )
+    cli_args = parser.parse_args()
+    host = os.getenv('HOST', '0.0.0.0')
+    if cli_args.production:
+        grace_period = int(os.getenv('APP_GRACE_PERIOD', '30'))
+        run_production(host, cli_args.port, cli_args.workers, grace_period)
+        sys.exit(0)
     uvicorn.run(
         'api.v1.server:app',
-        host=os.getenv('HOST', '0.0.0.0'),
-        port=5000,
+        host=host,
+        port=cli_args.port,
         log_level='info'
     )
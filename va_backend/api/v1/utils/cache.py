@@ -0,0 +1,338 @@
+#!/usr/bin/python3
+"""Module for the two-tier cache of hot read models, invalidated by tags
+
+Values are JSON encodable and tagged with the resources they were built
+from, such as post:<id> or user:<id>; writes invalidate those tags. The
+first tier is an in-process LRU bounded in bytes. The optional second
+tier is a Redis server shared by the workers, which also relays the
+invalidations so each worker drops its local copies. Without it, a
+server running several workers has no way to tell them about the
+invalidations, so the local tier is turned off.
+"""
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+from .metrics import CACHE_REQUESTS, CACHE_INVALIDATIONS
+from .raw_json import encode_json
+
+
+LOCAL_CACHE_MB = float(os.getenv('APP_CACHE_MB', '32'))
+"""Size in megabytes of the in-process tier"""
+
+LOCAL_TTL_SECONDS = float(os.getenv('APP_CACHE_LOCAL_SECONDS', '30'))
+"""Seconds an entry lives in the in-process tier"""
+
+SHARED_TTL_SECONDS = int(os.getenv('APP_CACHE_SECONDS', '300'))
+"""Seconds an entry lives in the shared tier"""
+
+KEY_PREFIX = 'va:cache:'
+"""Prefix of the shared tier entry keys"""
+
+TAG_PREFIX = 'va:tag:'
+"""Prefix of the shared tier sets listing the keys of a tag"""
+
+INVALIDATION_CHANNEL = 'va:cache:invalidations'
+"""Channel relaying invalidated tags between the workers"""
+
+RETRY_SECONDS = 5
+"""Seconds the shared tier is skipped after it failed"""
+
+
+class LocalTier:
+    """Least recently used entries kept in the worker, bounded in bytes"""
+    def __init__(self, max_bytes: int, ttl: float):
+        """Initialize the LocalTier class"""
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.entries = OrderedDict()
+        self.tags = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        """Gets the payload of a live entry"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            payload, _, expires = entry
+            if expires < time.monotonic():
+                self.remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: bytes, tags: tuple):
+        """Stores a payload, evicting the least recently used entries"""
+        if len(payload) > self.max_bytes:
+            return
+        with self.lock:
+            self.remove(key)
+            self.entries[key] = (payload, tags, time.monotonic() + self.ttl)
+            self.size += len(payload)
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+            while self.size > self.max_bytes:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, key: str):
+        """Removes an entry and its tag references, holding the lock"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        payload, tags, _ = entry
+        self.size -= len(payload)
+        for tag in tags:
+            keys = self.tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[tag]
+
+    def invalidate(self, tags):
+        """Removes the entries of the tags"""
+        with self.lock:
+            for tag in tags:
+                for key in list(self.tags.get(tag, ())):
+                    self.remove(key)
+
+
+class SharedTier:
+    """Entries kept in a Redis server shared by the workers
+
+    Each tag is a set of the keys tagged with it. Failures are reported
+    and the tier is skipped for RETRY_SECONDS, reads then going to the
+    database. Invalidations that failed are retried before the tier is
+    used again, so its entries never outlive a write.
+    """
+    def __init__(self, url: str, ttl: int):
+        """Initialize the SharedTier class"""
+        import redis
+        self.ttl = ttl
+        self.errors = redis.RedisError
+        self.client = redis.Redis.from_url(
+            url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self.retry_on = 0.0
+        self.pending = set()
+        self.listener = None
+
+    def available(self) -> bool:
+        """Checks if the tier is not backing off after a failure"""
+        return time.monotonic() >= self.retry_on
+
+    def failed(self, ex: Exception):
+        """Reports a failure and backs off"""
+        print(f'Shared cache failed: {ex}')
+        self.retry_on = time.monotonic() + RETRY_SECONDS
+
+    def flush(self) -> bool:
+        """Retries the failed invalidations, telling if none are left"""
+        if self.pending:
+            self.invalidate(())
+        return not self.pending
+
+    def get(self, key: str):
+        """Gets the stored entry of a key"""
+        if not self.available() or not self.flush():
+            return None
+        try:
+            return self.client.get(KEY_PREFIX + key)
+        except self.errors as ex:
+            self.failed(ex)
+            return None
+
+    def set(self, key: str, entry: bytes, tags: tuple):
+        """Stores an entry and adds its key to the sets of its tags"""
+        if not self.available() or not self.flush():
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(KEY_PREFIX + key, entry, ex=self.ttl)
+            for tag in tags:
+                pipe.sadd(TAG_PREFIX + tag, key)
+                pipe.expire(TAG_PREFIX + tag, self.ttl)
+            pipe.execute()
+        except self.errors as ex:
+            self.failed(ex)
+
+    def invalidate(self, tags):
+        """Deletes the entries of the tags and tells the other workers
+
+        Tags that could not be invalidated are kept to be retried.
+        """
+        tags = self.pending.union(tags)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(TAG_PREFIX + tag)
+            keys = set()
+            for members in pipe.execute():
+                keys.update(members)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(
+                *(KEY_PREFIX.encode('utf-8') + key for key in keys),
+                *(TAG_PREFIX + tag for tag in tags)
+            )
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(list(tags)))
+            pipe.execute()
+            self.pending = set()
+        except self.errors as ex:
+            self.pending = tags
+            self.failed(ex)
+
+    def listen(self, on_invalidation):
+        """Passes the tags invalidated by any worker to a callback"""
+        def handle(message):
+            """Decodes an invalidation message"""
+            on_invalidation(json.loads(message['data']))
+
+        def report(ex, pubsub, thread):
+            """Reports a listener failure, the thread reconnecting"""
+            print(f'Shared cache listener failed: {ex}')
+            time.sleep(RETRY_SECONDS)
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATION_CHANNEL: handle})
+        self.listener = pubsub.run_in_thread(
+            sleep_time=1, daemon=True, exception_handler=report)
+
+    def stop(self):
+        """Stops listening to invalidations"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+class Cache:
+    """Cache reading through the local tier, then the shared one"""
+    def __init__(self, local: LocalTier, shared: SharedTier = None):
+        """Initialize the Cache class"""
+        self.local = local
+        self.shared = shared
+        self.listeners = []
+        self.generation = 0
+        self.invalidated = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        """Gets a cached value, or None"""
+        payload = self.local.get(key)
+        if payload is not None:
+            CACHE_REQUESTS.labels('local', 'hit').inc()
+            return json.loads(payload)
+        CACHE_REQUESTS.labels('local', 'miss').inc()
+        if self.shared is None:
+            return None
+        entry = self.shared.get(key)
+        if entry is None:
+            CACHE_REQUESTS.labels('shared', 'miss').inc()
+            return None
+        CACHE_REQUESTS.labels('shared', 'hit').inc()
+        tags, value = json.loads(entry)
+        self.local.set(key, encode_json(value).encode('utf-8'), tuple(tags))
+        return value
+
+    def set(self, key: str, value, tags, since: int = None):
+        """Caches a value under the tags it was built from
+
+        With since, a value whose tags were invalidated after that
+        generation is stale and not cached. Returns the generation the
+        value was cached at, or None.
+        """
+        tags = tuple(tags)
+        with self.lock:
+            if since is not None and any(
+                    self.invalidated.get(tag, 0) > since for tag in tags):
+                return None
+            self.local.set(key, encode_json(value).encode('utf-8'), tags)
+            generation = self.generation
+        if self.shared is not None:
+            self.shared.set(
+                key, encode_json([tags, value]).encode('utf-8'), tags)
+        return generation
+
+    def fetch(self, key: str, load):
+        """Gets a cached value, loading and caching it on a miss
+
+        load returns the value and its tags; a None value is not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value, tags = load()
+        if value is not None:
+            self.set(key, value, tags)
+        return value
+
+    def invalidate(self, *tags):
+        """Drops the values built from any of the tags, in every worker"""
+        CACHE_INVALIDATIONS.inc(len(tags))
+        self.advance(tags)
+        self.local.invalidate(tags)
+        if self.shared is not None:
+            self.shared.invalidate(tags)
+
+    def advance(self, tags):
+        """Starts a generation, recording it as the tags' last invalidation"""
+        with self.lock:
+            self.generation += 1
+            for tag in tags:
+                self.invalidated[tag] = self.generation
+
+    def forget(self, generation: int):
+        """Forgets the invalidations up to a generation"""
+        with self.lock:
+            self.invalidated = {
+                tag: last for tag, last in self.invalidated.items()
+                if last > generation
+            }
+
+    def on_invalidation(self, callback):
+        """Passes the tags relayed by the shared tier to a callback too
+
+        The callback runs in the listener thread, for the invalidations
+        of every worker including this one.
+        """
+        self.listeners.append(callback)
+
+    def apply_invalidation(self, tags):
+        """Drops the local values of relayed tags and tells the listeners"""
+        self.advance(tags)
+        self.local.invalidate(tags)
+        for callback in self.listeners:
+            callback(tags)
+
+    def start(self):
+        """Starts applying the invalidations of the other workers"""
+        if self.shared is not None:
+            self.shared.listen(self.apply_invalidation)
+
+    def stop(self):
+        """Stops applying the invalidations of the other workers"""
+        if self.shared is not None:
+            self.shared.stop()
+
+
+def create_cache() -> Cache:
+    """Creates the cache configured by the environment
+
+    The local tier is left empty when several production workers run
+    without the shared tier, as they could not relay invalidations.
+    """
+    local_bytes = int(LOCAL_CACHE_MB * 1024 * 1024)
+    redis_url = os.getenv('APP_CACHE_REDIS_URL')
+    shared = SharedTier(redis_url, SHARED_TTL_SECONDS) if redis_url else None
+    workers = 1
+    if os.getenv('APP_MODE', '') == 'production':
+        workers = int(os.getenv('APP_WORKERS', '1'))
+    if shared is None and workers > 1:
+        print('Cache disabled: several workers need APP_CACHE_REDIS_URL.')
+        local_bytes = 0
+    return Cache(LocalTier(local_bytes, LOCAL_TTL_SECONDS), shared)
+
+
+cache = create_cache()
+"""Cache of the worker"""
@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""Module for the cached read models shared by the list endpoints
+
+Each card is tagged with the resource it is built from, so the writes
+to that resource invalidate it. Cards are loaded from the primary, as a
+lagging replica would have a stale card cached for its whole lifetime.
+"""
+from ..database import get_session
+from .statements import fetch_user, count_post_likes, count_top_comments
+from .cache import cache
+
+
+def user_card(user_id):
+    """Gets the id, name and picture of a user, through the cache"""
+    def load():
+        """Loads the card of the user"""
+        db_session = get_session(primary=True)
+        try:
+            user = fetch_user(db_session, user_id)
+            if not user:
+                return None, ()
+            return {
+                'id': user.id,
+                'name': user.name,
+                'profilePictureId': user.profile_picture_id
+            }, (f'user:{user_id}',)
+        finally:
+            db_session.close()
+    return cache.fetch(f'user-card:{user_id}', load)
+
+
+def post_counters(post_id) -> dict:
+    """Gets the comment and like counts of a post, through the cache"""
+    def load():
+        """Counts the top level comments and likes of the post"""
+        db_session = get_session(primary=True)
+        try:
+            return {
+                'commentsCount': count_top_comments(db_session, post_id),
+                'likesCount': count_post_likes(db_session, post_id)
+            }, (f'post:{post_id}',)
+        finally:
+            db_session.close()
+    return cache.fetch(f'post-counters:{post_id}', load)
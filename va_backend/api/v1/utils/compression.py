@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""Module for negotiating, performing and caching response compression"""
+import hashlib
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+ENCODINGS_PREFERENCE = tuple(
+    name for name, module in (
+        ('br', brotli),
+        ('zstd', zstandard),
+        ('gzip', zlib)
+    ) if module is not None
+)
+"""Supported content encodings in order of server preference"""
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Picks the best supported encoding from an Accept-Encoding header"""
+    qualities = {}
+    for token in accept_encoding.split(','):
+        name, _, params = token.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+    best_encoding = None
+    best_quality = 0.0
+    for name in ENCODINGS_PREFERENCE:
+        quality = qualities.get(name, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best_encoding = name
+            best_quality = quality
+    return best_encoding
+
+
+def compress_bytes(data: bytes, encoding: str, level: int) -> bytes:
+    """Compresses a complete payload with the given encoding and level"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class StreamCompressor:
+    """Incremental compressor for streamed response bodies"""
+    def __init__(self, encoding: str, level: int):
+        """Initialize the StreamCompressor class"""
+        self.encoding = encoding
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=level)
+        elif encoding == 'zstd':
+            self.compressor = zstandard.ZstdCompressor(
+                level=level).compressobj()
+        else:
+            self.compressor = zlib.compressobj(
+                level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compresses a chunk and flushes it so clients see it promptly"""
+        if self.encoding == 'br':
+            return self.compressor.process(chunk) + self.compressor.flush()
+        if self.encoding == 'zstd':
+            return self.compressor.compress(chunk) + self.compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self.compressor.compress(chunk) + self.compressor.flush(
+            zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """Returns the trailing bytes that end the compressed stream"""
+        if self.encoding == 'br':
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def body_etag(body: bytes) -> str:
+    """Generates a weak ETag from the content of a response body"""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class CompressedBytesCache:
+    """Size bounded LRU cache of compressed payloads keyed by ETag"""
+    def __init__(self, max_bytes: int):
+        """Initialize the CompressedBytesCache class"""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def get(self, etag: str, encoding: str, level: int):
+        """Gets a cached payload and marks it as recently used"""
+        key = (etag, encoding, level)
+        payload = self.entries.get(key)
+        if payload is not None:
+            self.entries.move_to_end(key)
+        return payload
+
+    def put(self, etag: str, encoding: str, level: int, payload: bytes):
+        """Stores a payload, evicting the least recently used ones"""
+        if len(payload) > self.max_bytes:
+            return
+        key = (etag, encoding, level)
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self.entries[key] = payload
+        self.size += len(payload)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
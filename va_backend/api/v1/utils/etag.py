@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+"""Module for generating and matching version based ETags"""
+import hashlib
+from starlette.responses import Response
+
+
+def version_etag(*parts) -> str:
+    """Generates a weak ETag from the parts that version a resource"""
+    version_txt = '|'.join(
+        part.isoformat() if hasattr(part, 'isoformat') else str(part)
+        for part in parts
+    )
+    digest = hashlib.blake2b(
+        version_txt.encode('utf-8'), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """Checks if an If-None-Match header matches an ETag (weak compare)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque_tag = etag.removeprefix('W/')
+    for candidate in if_none_match.split(','):
+        if candidate.strip().removeprefix('W/') == opaque_tag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Creates a 304 Not Modified response carrying the ETag"""
+    return Response(status_code=304, headers={'ETag': etag})
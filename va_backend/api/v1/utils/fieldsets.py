@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+"""Module for the sparse fieldsets and summary view of post lists"""
+from sqlalchemy import func
+
+from ..database import Post
+from .relationships import relationships
+from .cards import user_card, post_counters
+
+
+POST_FIELDS = (
+    'id',
+    'user',
+    'title',
+    'publishedOn',
+    'quotes',
+    'preview',
+    'commentsCount',
+    'likesCount',
+    'isLiked'
+)
+"""Fields a post list can return, in response order"""
+
+VIEWS = {
+    'full': (
+        'id',
+        'user',
+        'title',
+        'publishedOn',
+        'quotes',
+        'commentsCount',
+        'likesCount',
+        'isLiked'
+    ),
+    'summary': ('id', 'title', 'publishedOn', 'preview')
+}
+"""Fields of each named view, the full view being the default"""
+
+PREVIEW_LENGTH = 140
+"""Characters of the first quote returned as a post's preview"""
+
+
+def parse_fields(fields: str = '', view: str = ''):
+    """Resolves the fields and view parameters into a set of post fields
+
+    Explicit fields win over the view and the id is always included.
+    Returns None for an unknown view or field.
+    """
+    if fields.strip():
+        selected = {field.strip() for field in fields.split(',')}
+        selected.discard('')
+        if not selected.issubset(POST_FIELDS):
+            return None
+        return selected | {'id'}
+    view = view.strip() or 'full'
+    if view not in VIEWS:
+        return None
+    return set(VIEWS[view])
+
+
+def post_columns(fields: set) -> list:
+    """Lists the post columns a fieldset needs to be selected
+
+    The id, author and creation time are always selected, as the lists
+    are sorted and paginated on them.
+    """
+    columns = [Post.id, Post.user_id, Post.created_on]
+    if 'title' in fields:
+        columns.append(Post.title)
+    if 'quotes' in fields:
+        columns.append(Post.content)
+    if 'preview' in fields:
+        columns.append(func.left(
+            Post.content.op('->>')(0), PREVIEW_LENGTH).label('preview'))
+    return columns
+
+
+def post_fields(db_session, post, fields: set, user_id, user=None,
+                is_liked=None) -> dict:
+    """Builds the information of a post row, computing only its fields
+
+    The author's card is read from the cache unless the author is given,
+    and the like status of user_id is looked up unless given. The
+    publication time is always included for sorting; select_fields drops
+    it when it was not asked for.
+    """
+    post_info = {'id': post.id}
+    if 'user' in fields:
+        if user is None:
+            card = user_card(post.user_id)
+        else:
+            card = {
+                'id': user.id,
+                'name': user.name,
+                'profilePictureId': user.profile_picture_id
+            }
+        if card is None:
+            return None
+        post_info['user'] = card
+    if 'title' in fields:
+        post_info['title'] = post.title
+    post_info['publishedOn'] = post.created_on.isoformat()
+    if 'quotes' in fields:
+        post_info['quotes'] = post.content
+    if 'preview' in fields:
+        post_info['preview'] = post.preview or ''
+    if 'commentsCount' in fields or 'likesCount' in fields:
+        counters = post_counters(post.id)
+        if 'commentsCount' in fields:
+            post_info['commentsCount'] = counters['commentsCount']
+        if 'likesCount' in fields:
+            post_info['likesCount'] = counters['likesCount']
+    if 'isLiked' in fields:
+        if is_liked is None:
+            is_liked = relationships.is_post_liked(
+                db_session, post.id, user_id)
+        post_info['isLiked'] = is_liked
+    return post_info
+
+
+def select_fields(posts: list, fields: set) -> list:
+    """Drops the keys that were only computed for sorting"""
+    return [
+        {key: val for key, val in post_info.items() if key in fields}
+        for post_info in posts
+    ]
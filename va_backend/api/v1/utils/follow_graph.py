@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+"""Module for the in-memory follow graph behind the follow suggestions"""
+import os
+import uuid
+import asyncio
+from array import array
+from collections import Counter
+from sqlalchemy import select
+
+from ..database import get_session, UserFollowing
+
+
+REFRESH_SECONDS = float(os.getenv('APP_FOLLOW_GRAPH_REFRESH_SECONDS', '600'))
+"""Interval between rebuilds of the graph from the database"""
+
+LOAD_BATCH_SIZE = 10000
+"""Follow rows fetched per round trip while building the graph"""
+
+
+class Adjacency:
+    """Compressed sparse rows of one direction of the follow graph
+
+    The neighbours of the user numbered n are
+    targets[offsets[n]:offsets[n + 1]]. Links changed since the arrays
+    were built are kept in per-user added and removed sets.
+    """
+    def __init__(self, offsets: array, targets: array):
+        """Initialize the Adjacency class"""
+        self.offsets = offsets
+        self.targets = targets
+        self.added = {}
+        self.removed = {}
+
+    @classmethod
+    def from_edges(cls, sources: array, targets: array, count: int):
+        """Builds the rows of count users from parallel edge arrays"""
+        offsets = array('I', [0]) * (count + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for number in range(count):
+            offsets[number + 1] += offsets[number]
+        positions = offsets[:-1]
+        row_targets = array('I', [0]) * len(targets)
+        for source, target in zip(sources, targets):
+            row_targets[positions[source]] = target
+            positions[source] += 1
+        return cls(offsets, row_targets)
+
+    def base(self, number: int) -> array:
+        """Gets the neighbours of a user as of the last build"""
+        if number + 1 >= len(self.offsets):
+            return array('I')
+        return self.targets[self.offsets[number]:self.offsets[number + 1]]
+
+    def neighbours(self, number: int):
+        """Gets the current neighbours of a user"""
+        base = self.base(number)
+        added = self.added.get(number)
+        removed = self.removed.get(number)
+        if not added and not removed:
+            return base
+        current = set(base)
+        if removed:
+            current -= removed
+        if added:
+            current |= added
+        return current
+
+    def link(self, source: int, target: int):
+        """Records a link made since the last build"""
+        self.removed.get(source, set()).discard(target)
+        if target not in self.base(source):
+            self.added.setdefault(source, set()).add(target)
+
+    def unlink(self, source: int, target: int):
+        """Records a link removed since the last build"""
+        self.added.get(source, set()).discard(target)
+        if target in self.base(source):
+            self.removed.setdefault(source, set()).add(target)
+
+
+class FollowGraphState:
+    """Interned user ids with the followings and followers rows"""
+    def __init__(self, ids=None, numbers=None, followings=None,
+                 followers=None):
+        """Initialize the FollowGraphState class"""
+        self.ids = ids if ids is not None else []
+        self.numbers = numbers if numbers is not None else {}
+        empty = (array('I', [0]), array('I'))
+        self.followings = followings if followings else Adjacency(*empty)
+        self.followers = followers if followers else Adjacency(*empty)
+
+    def intern(self, user_id: str) -> int:
+        """Gets the number of a user id, numbering new ids"""
+        number = self.numbers.get(user_id)
+        if number is None:
+            number = len(self.ids)
+            self.numbers[user_id] = number
+            self.ids.append(user_id)
+        return number
+
+    def apply(self, follower_id: str, following_id: str, following: bool):
+        """Applies a follow or an unfollow"""
+        follower = self.intern(follower_id)
+        followed = self.intern(following_id)
+        if following:
+            self.followings.link(follower, followed)
+            self.followers.link(followed, follower)
+        else:
+            self.followings.unlink(follower, followed)
+            self.followers.unlink(followed, follower)
+
+
+def load_state() -> FollowGraphState:
+    """Builds the graph state from the follows stored in the database"""
+    state = FollowGraphState()
+    sources = array('I')
+    targets = array('I')
+    db_session = get_session()
+    try:
+        rows = db_session.execute(
+            select(
+                UserFollowing.follower_id, UserFollowing.following_id
+            ).execution_options(
+                stream_results=True, yield_per=LOAD_BATCH_SIZE)
+        )
+        for follower_id, following_id in rows:
+            sources.append(state.intern(follower_id))
+            targets.append(state.intern(following_id))
+    finally:
+        db_session.close()
+    count = len(state.ids)
+    state.followings = Adjacency.from_edges(sources, targets, count)
+    state.followers = Adjacency.from_edges(targets, sources, count)
+    return state
+
+
+class FollowGraph:
+    """Follow graph of the worker, rebuilt in the background
+
+    Follows made through this worker are applied right away; those made
+    through other workers show up at the next rebuild.
+    """
+    def __init__(self, refresh_seconds=REFRESH_SECONDS):
+        """Initialize the FollowGraph class"""
+        self.refresh_seconds = refresh_seconds
+        self.state = FollowGraphState()
+        self.loaded = False
+        self.events = []
+        self.refreshing = asyncio.Lock()
+        self.stopping = asyncio.Event()
+        self.task = None
+
+    def apply(self, follower_id: str, following_id: str, following: bool):
+        """Applies a follow or an unfollow made through this worker
+
+        The ids are interned in the canonical form the database returns,
+        so any spelling of a uuid the request used maps to the same user.
+        """
+        try:
+            follower_id = str(uuid.UUID(follower_id))
+            following_id = str(uuid.UUID(following_id))
+        except ValueError:
+            return
+        self.state.apply(follower_id, following_id, following)
+        self.events.append((follower_id, following_id, following))
+
+    async def refresh(self, only_once=False):
+        """Rebuilds the graph, replaying the changes made meanwhile"""
+        async with self.refreshing:
+            if only_once and self.loaded:
+                return
+            self.events = []
+            state = await asyncio.to_thread(load_state)
+            for event in self.events:
+                state.apply(*event)
+            self.state = state
+            self.events = []
+            self.loaded = True
+
+    async def ensure_loaded(self):
+        """Builds the graph if it was never built"""
+        if not self.loaded:
+            await self.refresh(only_once=True)
+
+    def suggest(self, user_id: str, limit: int, skip=()) -> list:
+        """Suggests the users followed by the most of a user's followings
+
+        Followers not followed back count as one more overlap; the user
+        ids in skip are never suggested. Returns (user id, overlap count)
+        pairs, highest count first.
+        """
+        state = self.state
+        number = state.numbers.get(user_id)
+        if number is None:
+            return []
+        followed = state.followings.neighbours(number)
+        counts = Counter(state.followers.neighbours(number))
+        for followed_number in followed:
+            counts.update(state.followings.neighbours(followed_number))
+        counts.pop(number, None)
+        for followed_number in followed:
+            counts.pop(followed_number, None)
+        for skipped_id in skip:
+            counts.pop(state.numbers.get(skipped_id), None)
+        return [
+            (state.ids[candidate], overlap)
+            for candidate, overlap in counts.most_common(limit)
+        ]
+
+    async def run(self):
+        """Rebuilds the graph every refresh_seconds until stopped"""
+        while not self.stopping.is_set():
+            try:
+                await self.refresh()
+            except Exception as ex:
+                print(f'Follow graph refresh failed: {ex}')
+            try:
+                await asyncio.wait_for(
+                    self.stopping.wait(), self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Starts the rebuilds on the running event loop"""
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Stops the rebuilds"""
+        self.stopping.set()
+        if self.task is not None:
+            await self.task
+
+
+follow_graph = FollowGraph()
+"""Follow graph of the worker"""
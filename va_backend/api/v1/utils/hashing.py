@@ -0,0 +1,29 @@
+#!/usr/bin/python3
+"""Module for hashing and verifying passwords with argon2 on first use"""
+
+
+password_hasher = None
+"""The argon2 password hasher, created when a password is first hashed"""
+
+
+def get_password_hasher():
+    """Imports, creates (once) and returns the argon2 password hasher"""
+    global password_hasher
+    if password_hasher is None:
+        import argon2
+        password_hasher = argon2.PasswordHasher()
+    return password_hasher
+
+
+def hash_password(password: str) -> str:
+    """Hashes a password for storage"""
+    return get_password_hasher().hash(password)
+
+
+def verify_password(hashed_password: str, password: str) -> bool:
+    """Checks a password against its stored hash"""
+    from argon2.exceptions import VerificationError, InvalidHashError
+    try:
+        return get_password_hasher().verify(hashed_password, password)
+    except (VerificationError, InvalidHashError):
+        return False
@@ -0,0 +1,20 @@
+#!/usr/bin/python3
+"""Module for accessing the ImageKit CDN client on first use"""
+import os
+
+
+imagekit_client = None
+"""The ImageKit client, created when an endpoint first needs it"""
+
+
+def get_imagekit():
+    """Imports, creates (once) and returns the ImageKit client"""
+    global imagekit_client
+    if imagekit_client is None:
+        from imagekitio import ImageKit
+        imagekit_client = ImageKit(
+            private_key=os.getenv('IMG_CDN_PRIV_KEY'),
+            public_key=os.getenv('IMG_CDN_PUB_KEY'),
+            url_endpoint=os.getenv('IMG_CDN_URL_ENDPNT')
+        )
+    return imagekit_client
@@ -4,18 +4,15 @@ import os
 import base64
 from email.mime.text import MIMEText
 
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.errors import HttpError
-from googleapiclient.discovery import build
-
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 """Scopes required for sending emails"""
 
 
 def get_gmail_credentials():
     """Gets and returns credentials for Gmail API"""
+    from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
     api_creds = None
     if os.path.exists('token.json'):
         api_creds = Credentials.from_authorized_user_file('token.json', SCOPES)
@@ -49,6 +46,8 @@ def create_email_message(recipient, subject, body_html):
 
 def send_email(service, message):
     """Sends an email message using Gmail API"""
+    from googleapiclient.errors import HttpError
+    from googleapiclient.discovery import build
     try:
         gmail_creds = get_gmail_credentials()
         service = build('gmail', 'v1', credentials=gmail_creds)
@@ -62,6 +61,8 @@ def send_email(service, message):
 
 def deliver_message(dest, subject, body_html):
     """Deliver message to destination user"""
+    from googleapiclient.errors import HttpError
+    from googleapiclient.discovery import build
     try:
         api_creds = get_gmail_credentials()
         service = build('gmail', 'v1', credentials=api_creds)
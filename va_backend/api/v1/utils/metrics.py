@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""Module for collecting request latency and SQL statement metrics"""
+import os
+import time
+from contextvars import ContextVar
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    REGISTRY
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+REQUEST_LATENCY = Histogram(
+    'va_http_request_duration_seconds',
+    'Latency of HTTP requests by route template and status',
+    ['method', 'route', 'status']
+)
+REQUEST_QUERIES = Histogram(
+    'va_http_request_db_statements',
+    'Number of SQL statements issued per HTTP request',
+    ['method', 'route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377)
+)
+REQUEST_DB_TIME = Histogram(
+    'va_http_request_db_seconds',
+    'Time spent executing SQL statements per HTTP request',
+    ['method', 'route']
+)
+DB_STATEMENTS = Counter(
+    'va_db_statements_total',
+    'SQL statements executed by route template',
+    ['route']
+)
+CACHE_REQUESTS = Counter(
+    'va_cache_requests_total',
+    'Cache lookups by tier and result',
+    ['tier', 'result']
+)
+CACHE_INVALIDATIONS = Counter(
+    'va_cache_invalidations_total',
+    'Cache tags invalidated by writes'
+)
+
+
+class RequestStats:
+    """Per-request counters filled in by the SQLAlchemy cursor hooks"""
+    __slots__ = ('scope', 'statements', 'db_time')
+
+    def __init__(self, scope=None):
+        """Initialize the RequestStats class"""
+        self.scope = scope if scope is not None else {}
+        self.statements = 0
+        self.db_time = 0.0
+
+
+request_stats = ContextVar('request_stats', default=None)
+"""Stats of the HTTP request being handled in the current context"""
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_statement_timer(conn, cursor, statement, parameters, context,
+                          executemany):
+    """Records when a SQL statement starts executing"""
+    conn.info.setdefault('statement_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_statement(conn, cursor, statement, parameters, context,
+                     executemany):
+    """Adds an executed SQL statement to the current request's stats"""
+    elapsed = time.perf_counter() - conn.info['statement_start'].pop()
+    stats = request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += elapsed
+
+
+@event.listens_for(Engine, 'handle_error')
+def discard_statement_timer(exception_context):
+    """Drops the start time of a statement that failed"""
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('statement_start'):
+        conn.info['statement_start'].pop()
+
+
+def route_template(scope) -> str:
+    """Gets the route template of a request, bounding label cardinality"""
+    route = scope.get('route')
+    return getattr(route, 'path', 'unmatched')
+
+
+def current_route() -> str:
+    """Gets the route template of the request running in this context"""
+    stats = request_stats.get()
+    if stats is None:
+        return ''
+    return route_template(stats.scope)
+
+
+def observe_request(method: str, route: str, status: int,
+                    duration: float, stats: RequestStats):
+    """Records the metrics of a completed HTTP request"""
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(duration)
+    REQUEST_QUERIES.labels(method, route).observe(stats.statements)
+    REQUEST_DB_TIME.labels(method, route).observe(stats.db_time)
+    if stats.statements:
+        DB_STATEMENTS.labels(route).inc(stats.statements)
+
+
+def render_metrics() -> bytes:
+    """Renders the metrics in Prometheus text format for all workers"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+"""Module for parsing id lists and ordering multi-get results"""
+from sqlalchemy import func, select
+
+
+MAX_IDS = 100
+"""Maximum number of ids a multi-get request can ask for"""
+
+
+def parse_ids(ids: str):
+    """Splits a comma separated id list, dropping blanks and duplicates
+
+    Returns None when the list is longer than MAX_IDS.
+    """
+    id_list = list(dict.fromkeys(
+        id.strip() for id in ids.split(',') if id.strip()))
+    if len(id_list) > MAX_IDS:
+        return None
+    return id_list
+
+
+def in_request_order(ids: list, items: dict) -> list:
+    """Lists the found items in request order, marking the missing ids"""
+    return [
+        items[id] if id in items else {'id': id, 'missing': True}
+        for id in ids
+    ]
+
+
+def grouped_counts(db_session, column, reference, ids: list, *conditions):
+    """Counts the rows of column per referenced id in one grouped query"""
+    if not ids:
+        return {}
+    rows = db_session.execute(
+        select(reference, func.count(column)).where(
+            reference.in_(ids), *conditions
+        ).group_by(reference)
+    ).all()
+    return dict(rows)
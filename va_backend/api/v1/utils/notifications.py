@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+"""Module for recording coalesced notifications and unread counters"""
+from sqlalchemy import (
+    and_, case, delete, func, literal, literal_column, select, update)
+from sqlalchemy.dialects.postgresql import array, insert
+
+from ..database import Notification, NotificationCounter, sql_uuid7
+
+
+def notify(db_session, kind: str, subject_id: str, actor_id: str,
+           recipients):
+    """Coalesces an activity into the unread notifications of recipients
+
+    recipients is a select of recipient user ids, so looking the
+    recipients up, grouping with their unread notification of the same
+    kind and subject, and bumping their unread counter for a new group all
+    happen in one statement; each new notification gets its own id.
+    Actions of a user on their own content are skipped. The actor joins
+    the distinct actors of the group as the latest one.
+    """
+    recipient = recipients.subquery('recipient')
+    user_id = recipient.c[0]
+    actor = literal(actor_id, Notification.actor_id.type)
+    upsert = insert(Notification).from_select(
+        [
+            'id',
+            'created_on',
+            'updated_on',
+            'user_id',
+            'kind',
+            'subject_id',
+            'actor_id',
+            'actor_ids'
+        ],
+        select(
+            sql_uuid7(),
+            func.now(),
+            func.now(),
+            user_id,
+            literal(kind),
+            literal(subject_id),
+            actor,
+            array([actor])
+        ).where(user_id != actor_id)
+    )
+    upsert = upsert.on_conflict_do_update(
+        index_elements=['user_id', 'kind', 'subject_id'],
+        index_where=Notification.read_on.is_(None),
+        set_={
+            'updated_on': upsert.excluded.updated_on,
+            'actor_id': upsert.excluded.actor_id,
+            'actor_ids': func.array_append(
+                func.array_remove(
+                    Notification.actor_ids, upsert.excluded.actor_id),
+                upsert.excluded.actor_id
+            )
+        },
+        where=Notification.actor_id != upsert.excluded.actor_id
+    ).returning(
+        Notification.user_id,
+        literal_column('xmax = 0').label('inserted')
+    ).cte('upserted')
+    counter = insert(NotificationCounter).from_select(
+        ['user_id', 'unread'],
+        select(upsert.c.user_id, literal(1)).where(upsert.c.inserted)
+    )
+    counter = counter.on_conflict_do_update(
+        index_elements=['user_id'],
+        set_={'unread': NotificationCounter.unread + 1}
+    )
+    db_session.execute(counter)
+
+
+def retract(db_session, kind: str, subject_id: str, actor_id: str,
+            recipients):
+    """Takes an undone activity out of the notifications of recipients
+
+    The actor leaves the groups of the kind and subject, the previous
+    actor becoming the latest one. Groups left without actors are
+    deleted and the unread counters of their recipients recounted.
+    """
+    remove_actor(db_session, actor_id, and_(
+        Notification.user_id.in_(recipients),
+        Notification.kind == kind,
+        Notification.subject_id == subject_id
+    ))
+
+
+def remove_actor(db_session, actor_id: str, condition):
+    """Takes an actor out of the notification groups matching a condition
+
+    Returns the recipients whose unread counters were recounted.
+    """
+    actor = literal(actor_id, Notification.actor_id.type)
+    condition = and_(condition, actor == func.any(Notification.actor_ids))
+    emptied = db_session.execute(
+        delete(Notification).where(
+            condition,
+            func.cardinality(Notification.actor_ids) == 1
+        ).returning(Notification.user_id)
+    ).scalars().all()
+    last = func.cardinality(Notification.actor_ids)
+    db_session.execute(
+        update(Notification).where(condition).values(
+            actor_ids=func.array_remove(Notification.actor_ids, actor),
+            actor_id=case(
+                (Notification.actor_id == actor,
+                 Notification.actor_ids[last - 1]),
+                else_=Notification.actor_id
+            )
+        ).execution_options(synchronize_session=False)
+    )
+    recount_unread(db_session, emptied)
+    return emptied
+
+
+def discard(db_session, kind: str, subject_id: str):
+    """Deletes the notifications about a deleted subject"""
+    removed = db_session.execute(
+        delete(Notification).where(and_(
+            Notification.kind == kind,
+            Notification.subject_id == subject_id
+        )).returning(Notification.user_id)
+    ).scalars().all()
+    recount_unread(db_session, removed)
+
+
+def recount_unread(db_session, user_ids):
+    """Rebuilds the unread counters of users from their notifications"""
+    if not user_ids:
+        return
+    unread = select(func.count(Notification.id)).where(and_(
+        Notification.user_id == NotificationCounter.user_id,
+        Notification.read_on == None
+    )).scalar_subquery()
+    db_session.execute(
+        update(NotificationCounter).where(
+            NotificationCounter.user_id.in_(user_ids)
+        ).values(
+            unread=unread
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def mark_read(db_session, user_id: str, notification_ids=None) -> int:
+    """Marks unread notifications as read and lowers the unread counter"""
+    condition = and_(
+        Notification.user_id == user_id,
+        Notification.read_on == None
+    )
+    if notification_ids:
+        condition = and_(condition, Notification.id.in_(notification_ids))
+    marked = db_session.query(Notification).filter(condition).update(
+        {Notification.read_on: func.now()},
+        synchronize_session=False
+    )
+    if marked:
+        db_session.query(NotificationCounter).filter(
+            NotificationCounter.user_id == user_id
+        ).update(
+            {
+                NotificationCounter.unread: func.greatest(
+                    NotificationCounter.unread - marked, 0)
+            },
+            synchronize_session=False
+        )
+    return marked
+
+
+def unread_count(db_session, user_id: str) -> int:
+    """Gets the unread notifications count of a user"""
+    unread = db_session.query(NotificationCounter.unread).filter(
+        NotificationCounter.user_id == user_id
+    ).scalar()
+    return unread if unread else 0
@@ -0,0 +1,226 @@
+#!/usr/bin/python3
+"""Module for purging deleted users and posts in bounded batches"""
+import os
+import asyncio
+from sqlalchemy import (
+    String, and_, or_, cast, delete, exists, func, select, tuple_,
+    update)
+
+from ..database import (
+    get_session,
+    User,
+    Post,
+    PostLike,
+    Comment,
+    UserFollowing,
+    Notification,
+    NotificationCounter
+)
+from .notifications import remove_actor, recount_unread
+
+
+BATCH_SIZE = int(os.getenv('APP_PURGE_BATCH_SIZE', '1000'))
+"""Maximum rows deleted per purge transaction"""
+
+IDLE_SECONDS = float(os.getenv('APP_PURGE_IDLE_SECONDS', '5'))
+"""Pause before polling again once nothing is pending"""
+
+
+def claim_pending(db_session, model):
+    """Locks the oldest pending row of a model no other worker purges"""
+    return db_session.execute(
+        select(model.id).where(
+            model.deleted_on.isnot(None)
+        ).order_by(
+            model.deleted_on
+        ).limit(1).with_for_update(
+            skip_locked=True
+        ).execution_options(include_pending_deletes=True)
+    ).scalar()
+
+
+def delete_batch(db_session, model, condition, batch_size: int) -> int:
+    """Deletes at most batch_size rows matching a condition"""
+    batch_ids = select(model.id).where(condition).limit(
+        batch_size).correlate(None)
+    result = db_session.execute(
+        delete(model).where(
+            model.id.in_(batch_ids.scalar_subquery())
+        ).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def purge_reply_notifications(db_session, post_id, batch_size: int) -> bool:
+    """Deletes a batch of the reply notifications about a post's comments
+
+    Their recipients are the authors of the comments, whose unread
+    counters are recounted.
+    """
+    comments = select(Comment.user_id, cast(Comment.id, String)).where(
+        Comment.post_id == post_id)
+    batch_ids = select(Notification.id).where(and_(
+        Notification.kind == 'reply',
+        tuple_(Notification.user_id, Notification.subject_id).in_(comments)
+    )).limit(batch_size)
+    recipients = db_session.execute(
+        delete(Notification).where(
+            Notification.id.in_(batch_ids.scalar_subquery())
+        ).returning(Notification.user_id)
+    ).scalars().all()
+    recount_unread(db_session, recipients)
+    return len(recipients) > 0
+
+
+def remove_actor_batch(db_session, user_id, batch_size: int) -> bool:
+    """Takes a purged user out of a batch of the groups they acted in
+
+    Groups left without actors are deleted and their recipients' unread
+    counters recounted.
+    """
+    batch_ids = db_session.scalars(
+        select(Notification.id).where(
+            Notification.actor_ids.contains([user_id])
+        ).limit(batch_size)
+    ).all()
+    if not batch_ids:
+        return False
+    remove_actor(db_session, user_id, Notification.id.in_(batch_ids))
+    return True
+
+
+def purge_post_batch(db_session, batch_size: int) -> bool:
+    """Purges one batch of the oldest pending post, then the post itself"""
+    post_id = claim_pending(db_session, Post)
+    if post_id is None:
+        return False
+    owner_id = select(Post.user_id).where(
+        Post.id == post_id).scalar_subquery()
+    if purge_reply_notifications(db_session, post_id, batch_size):
+        return True
+    dependents = (
+        (PostLike, PostLike.post_id == post_id),
+        (Comment, Comment.post_id == post_id),
+        (Notification, and_(
+            Notification.user_id == owner_id,
+            Notification.kind.in_(('like', 'comment')),
+            Notification.subject_id == post_id
+        ))
+    )
+    for model, condition in dependents:
+        if delete_batch(db_session, model, condition, batch_size):
+            return True
+    unread = select(func.count(Notification.id)).where(and_(
+        Notification.user_id == owner_id,
+        Notification.read_on == None
+    )).scalar_subquery()
+    db_session.execute(
+        update(NotificationCounter).where(
+            NotificationCounter.user_id == owner_id
+        ).values(
+            unread=unread
+        ).execution_options(synchronize_session=False)
+    )
+    db_session.execute(
+        delete(Post).where(Post.id == post_id).execution_options(
+            synchronize_session=False)
+    )
+    return True
+
+
+def purge_user_batch(db_session, batch_size: int) -> bool:
+    """Purges one batch of the oldest pending user, then the user itself"""
+    user_id = claim_pending(db_session, User)
+    if user_id is None:
+        return False
+    parents = Comment.__table__.alias('parents')
+    top_level_ids = select(parents.c.id).where(and_(
+        parents.c.user_id == user_id,
+        parents.c.comment_id == None
+    ))
+    dependents = (
+        (UserFollowing, or_(
+            UserFollowing.follower_id == user_id,
+            UserFollowing.following_id == user_id
+        )),
+        (PostLike, PostLike.user_id == user_id),
+        (Comment, Comment.comment_id.in_(top_level_ids)),
+        (Comment, Comment.user_id == user_id),
+        (Notification, Notification.user_id == user_id)
+    )
+    for model, condition in dependents:
+        if delete_batch(db_session, model, condition, batch_size):
+            return True
+    if remove_actor_batch(db_session, user_id, batch_size):
+        return True
+    marked = db_session.execute(
+        update(Post).where(and_(
+            Post.user_id == user_id,
+            Post.deleted_on == None
+        )).values(
+            deleted_on=func.now()
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    posts_left = db_session.execute(
+        select(exists().where(Post.user_id == user_id)).execution_options(
+            include_pending_deletes=True)
+    ).scalar()
+    if posts_left:
+        return marked > 0
+    db_session.execute(
+        delete(NotificationCounter).where(
+            NotificationCounter.user_id == user_id
+        ).execution_options(synchronize_session=False)
+    )
+    db_session.execute(
+        delete(User).where(User.id == user_id).execution_options(
+            synchronize_session=False)
+    )
+    return True
+
+
+def purge_step(batch_size: int = BATCH_SIZE) -> bool:
+    """Runs one purge transaction and tells whether work was done"""
+    db_session = get_session()
+    try:
+        purged = purge_post_batch(db_session, batch_size)
+        if not purged:
+            purged = purge_user_batch(db_session, batch_size)
+        db_session.commit()
+        return purged
+    except Exception as ex:
+        print(f'Purge failed: {ex}')
+        db_session.rollback()
+        return False
+    finally:
+        db_session.close()
+
+
+class PurgeWorker:
+    """Background task purging pending deletions between requests"""
+    def __init__(self, batch_size=BATCH_SIZE, idle_seconds=IDLE_SECONDS):
+        """Initialize the PurgeWorker class"""
+        self.batch_size = batch_size
+        self.idle_seconds = idle_seconds
+        self.stopping = asyncio.Event()
+        self.task = None
+
+    async def run(self):
+        """Purges batch after batch, idling when nothing is pending"""
+        while not self.stopping.is_set():
+            purged = await asyncio.to_thread(purge_step, self.batch_size)
+            timeout = 0 if purged else self.idle_seconds
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Starts the worker on the running event loop"""
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Stops the worker once its current batch is committed"""
+        self.stopping.set()
+        if self.task is not None:
+            await self.task
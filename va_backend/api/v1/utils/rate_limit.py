@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""Module for sliding window rate limiting shared across server workers"""
+import os
+import mmap
+import time
+import fcntl
+import struct
+import hashlib
+import threading
+from functools import lru_cache
+
+
+SLOT = struct.Struct('<QdII')
+"""Slot layout: key hash, window start, previous and current counts"""
+
+PROBES = 8
+"""Slots inspected for a key before evicting the stalest one"""
+
+
+class SlidingWindowLimiter:
+    """Counts hits per key over a sliding window in a shared memory table
+
+    The table is an open addressed hash table of fixed size kept in a
+    memory map. When backed by a file (e.g. under /dev/shm) every worker
+    maps the same table and updates are serialized with flock; without a
+    file the table is private to the process. Each key keeps the counts of
+    the current and previous fixed windows, and the sliding count weighs
+    the previous one by how much of it still overlaps the window.
+    """
+    def __init__(self, window: float, slots: int = 65536, path: str = None):
+        """Initialize the SlidingWindowLimiter class"""
+        self.window = window
+        self.slots = slots
+        self.lock = threading.Lock()
+        size = SLOT.size * slots
+        if path:
+            self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+            self.table = mmap.mmap(self.fd, size)
+        else:
+            self.fd = None
+            self.table = mmap.mmap(-1, size)
+
+    def lock_table(self):
+        """Acquires the process and cross-process table locks"""
+        self.lock.acquire()
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def unlock_table(self):
+        """Releases the table locks"""
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.lock.release()
+
+    @staticmethod
+    def key_hash(key: str) -> int:
+        """Hashes a key into a non-zero 64 bit integer"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') or 1
+
+    def find_slot(self, hashed: int, now: float, create: bool):
+        """Finds the slot of a key, claiming a free or stale one if asked"""
+        first = hashed % self.slots
+        free_slot = None
+        stalest_slot = None
+        stalest_start = None
+        for probe in range(PROBES):
+            slot = (first + probe) % self.slots
+            slot_key, start, _, _ = SLOT.unpack_from(
+                self.table, slot * SLOT.size)
+            if slot_key == hashed:
+                return slot
+            expired = now - start >= 2 * self.window
+            if free_slot is None and (slot_key == 0 or expired):
+                free_slot = slot
+            if stalest_start is None or start < stalest_start:
+                stalest_slot = slot
+                stalest_start = start
+        if not create:
+            return None
+        slot = free_slot if free_slot is not None else stalest_slot
+        SLOT.pack_into(self.table, slot * SLOT.size, hashed, 0.0, 0, 0)
+        return slot
+
+    def read_slot(self, slot: int, now: float):
+        """Gets the counts of a slot rolled forward to the current window"""
+        _, start, previous, current = SLOT.unpack_from(
+            self.table, slot * SLOT.size)
+        window_start = now - now % self.window
+        if start != window_start:
+            previous = current if start == window_start - self.window else 0
+            current = 0
+        return window_start, previous, current
+
+    def sliding_count(self, window_start, previous, current, now) -> float:
+        """Weighs the previous window by its overlap with the sliding one"""
+        overlap = 1 - (now - window_start) / self.window
+        return previous * overlap + current
+
+    def count(self, key: str) -> float:
+        """Gets the number of hits of a key within the sliding window"""
+        now = time.time()
+        self.lock_table()
+        try:
+            slot = self.find_slot(self.key_hash(key), now, False)
+            if slot is None:
+                return 0.0
+            return self.sliding_count(*self.read_slot(slot, now), now)
+        finally:
+            self.unlock_table()
+
+    def hit(self, key: str):
+        """Records a hit and returns the sliding count before and after it"""
+        now = time.time()
+        hashed = self.key_hash(key)
+        self.lock_table()
+        try:
+            slot = self.find_slot(hashed, now, True)
+            window_start, previous, current = self.read_slot(slot, now)
+            before = self.sliding_count(window_start, previous, current, now)
+            SLOT.pack_into(
+                self.table, slot * SLOT.size,
+                hashed, window_start, previous, current + 1
+            )
+            return before, before + 1
+        finally:
+            self.unlock_table()
+
+    def reset(self, key: str):
+        """Forgets the hits of a key"""
+        now = time.time()
+        self.lock_table()
+        try:
+            slot = self.find_slot(self.key_hash(key), now, False)
+            if slot is not None:
+                SLOT.pack_into(self.table, slot * SLOT.size, 0, 0.0, 0, 0)
+        finally:
+            self.unlock_table()
+
+
+@lru_cache(maxsize=None)
+def get_signin_limiter() -> SlidingWindowLimiter:
+    """Gets the sign in limiter, shared by workers in production mode"""
+    return SlidingWindowLimiter(
+        window=float(os.getenv('APP_SIGNIN_WINDOW', '900')),
+        path=os.getenv('APP_SIGNIN_LIMITER_FILE')
+    )
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""Module for splicing pre-encoded JSON fragments into API responses"""
+import json
+import re
+import secrets
+from starlette.responses import JSONResponse
+
+
+class RawJSON(str):
+    """String holding an already encoded JSON document"""
+    __slots__ = ()
+
+
+def mark_fragments(content, fragments: list, nonce: str):
+    """Replaces RawJSON values with placeholders and collects them"""
+    if type(content) is RawJSON:
+        fragments.append(content)
+        return f'{nonce}{len(fragments) - 1}'
+    if type(content) is dict:
+        return {
+            key: mark_fragments(val, fragments, nonce)
+            for key, val in content.items()
+        }
+    if type(content) in (list, tuple):
+        return [mark_fragments(val, fragments, nonce) for val in content]
+    return content
+
+
+def encode_json(content) -> str:
+    """Encodes content compactly, splicing in the raw JSON fragments"""
+    fragments = []
+    nonce = f'@raw:{secrets.token_hex(8)}:'
+    marked = mark_fragments(content, fragments, nonce)
+    encoded = json.dumps(
+        marked,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(',', ':')
+    )
+    if fragments:
+        encoded = re.sub(
+            f'"{re.escape(nonce)}(\\d+)"',
+            lambda match: fragments[int(match.group(1))],
+            encoded
+        )
+    return encoded
+
+
+class RawJSONResponse(JSONResponse):
+    """JSON response that embeds RawJSON values without re-encoding them"""
+
+    def render(self, content) -> bytes:
+        """Encodes the content and splices in the raw JSON fragments"""
+        return encode_json(content).encode('utf-8')
@@ -0,0 +1,198 @@
+#!/usr/bin/python3
+"""Module for the per-viewer cache of followed users and liked posts"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from sqlalchemy import literal, select, union_all
+
+from ..database import PostLike, UserFollowing, get_write_tracker
+from .statements import is_following, is_post_liked
+from .cache import cache
+
+
+MAX_VIEWERS = int(os.getenv('APP_RELATIONSHIP_CACHE_VIEWERS', '10000'))
+"""Viewers whose relationships are kept, least recently used dropped"""
+
+TTL_SECONDS = float(os.getenv('APP_RELATIONSHIP_CACHE_SECONDS', '60'))
+"""Seconds a viewer's relationships are trusted before being reloaded"""
+
+MAX_IDS = 1000
+"""Followed user ids, and most recently liked post ids, kept per viewer"""
+
+
+class BoundedIds:
+    """Most recent ids of a relationship, oldest first
+
+    When the viewer has more than limit ids only the newest are kept and
+    an id not found is unknown rather than absent.
+    """
+    def __init__(self, ids: list, complete: bool, limit: int = MAX_IDS):
+        """Initialize the BoundedIds class"""
+        self.ids = dict.fromkeys(ids)
+        self.complete = complete
+        self.limit = limit
+
+    def lookup(self, id):
+        """Checks for an id, returning None when it is unknown"""
+        if id in self.ids:
+            return True
+        return False if self.complete else None
+
+    def add(self, id):
+        """Adds an id as the newest, dropping the oldest when full"""
+        self.ids.pop(id, None)
+        self.ids[id] = None
+        if len(self.ids) > self.limit:
+            del self.ids[next(iter(self.ids))]
+            self.complete = False
+
+    def discard(self, id):
+        """Removes an id"""
+        self.ids.pop(id, None)
+
+
+class ViewerRelations:
+    """Followed user ids and liked post ids of a viewer"""
+    def __init__(self, followed: BoundedIds, liked: BoundedIds):
+        """Initialize the ViewerRelations class"""
+        self.followed = followed
+        self.liked = liked
+        self.loaded_on = time.monotonic()
+        self.writes = 0.0
+
+
+def load_relations(db_session, user_id: str) -> ViewerRelations:
+    """Loads the followed users and latest likes of a viewer in one query
+
+    One more row than kept is read from each side to tell whether the
+    ids kept are all of them.
+    """
+    followed = select(
+        literal('f').label('kind'),
+        UserFollowing.following_id.label('id'),
+        UserFollowing.created_on
+    ).where(
+        UserFollowing.follower_id == user_id
+    ).order_by(UserFollowing.created_on.desc()).limit(MAX_IDS + 1)
+    liked = select(
+        literal('l').label('kind'),
+        PostLike.post_id.label('id'),
+        PostLike.created_on
+    ).where(
+        PostLike.user_id == user_id
+    ).order_by(PostLike.created_on.desc()).limit(MAX_IDS + 1)
+    rows = db_session.execute(
+        union_all(followed.subquery().select(), liked.subquery().select()),
+        execution_options={'include_pending_deletes': True}
+    ).all()
+    ids = {'f': [], 'l': []}
+    for row in rows:
+        ids[row.kind].append(row.id)
+    relations = []
+    for kind in ('f', 'l'):
+        newest = ids[kind][:MAX_IDS]
+        newest.reverse()
+        relations.append(BoundedIds(newest, len(ids[kind]) <= MAX_IDS))
+    return ViewerRelations(*relations)
+
+
+class RelationshipCache:
+    """Least recently used cache of the relationships of each viewer
+
+    Follows and likes made through this worker update the cached sets in
+    place. Those made through other workers drop the viewer's entry when
+    the shared cache relays the invalidation of the viewer's user tag,
+    and an entry loaded before the viewer's latest write is reloaded, so
+    the viewer sees their own changes on any worker. Entries are
+    otherwise reloaded once older than the ttl. Ids past the kept ones
+    fall back to a query.
+    """
+    def __init__(self, max_viewers=MAX_VIEWERS, ttl=TTL_SECONDS):
+        """Initialize the RelationshipCache class"""
+        self.max_viewers = max_viewers
+        self.ttl = ttl
+        self.viewers = OrderedDict()
+        self.lock = threading.Lock()
+
+    def viewer(self, db_session, user_id: str) -> ViewerRelations:
+        """Gets the relationships of a viewer, loading them if needed
+
+        The sliding write count of the viewer only decays between writes,
+        so a count above the one seen at load time, or any count for an
+        entry older than the write window, means the entry may miss one.
+        """
+        tracker = get_write_tracker()
+        writes = tracker.count(user_id)
+        with self.lock:
+            relations = self.viewers.get(user_id)
+            if relations is not None:
+                age = time.monotonic() - relations.loaded_on
+                outdated = writes > relations.writes or (
+                    writes > 0 and age >= tracker.window)
+                if age < self.ttl and not outdated:
+                    self.viewers.move_to_end(user_id)
+                    return relations
+        relations = load_relations(db_session, user_id)
+        relations.writes = writes
+        with self.lock:
+            self.viewers[user_id] = relations
+            self.viewers.move_to_end(user_id)
+            while len(self.viewers) > self.max_viewers:
+                self.viewers.popitem(last=False)
+        return relations
+
+    def forget(self, tags):
+        """Drops the entries of the viewers of invalidated user tags"""
+        with self.lock:
+            for tag in tags:
+                if tag.startswith('user:'):
+                    self.viewers.pop(tag[len('user:'):], None)
+
+    def is_following(self, db_session, follower_id, following_id) -> bool:
+        """Checks if a user follows another"""
+        if not follower_id:
+            return False
+        relations = self.viewer(db_session, follower_id)
+        found = relations.followed.lookup(following_id)
+        if found is None:
+            return is_following(db_session, follower_id, following_id)
+        return found
+
+    def is_post_liked(self, db_session, post_id, user_id) -> bool:
+        """Checks if a user likes a post"""
+        if not user_id:
+            return False
+        relations = self.viewer(db_session, user_id)
+        found = relations.liked.lookup(post_id)
+        if found is None:
+            return is_post_liked(db_session, post_id, user_id)
+        return found
+
+    def follow(self, follower_id: str, following_id: str, following: bool):
+        """Records a follow or an unfollow made through this worker"""
+        with self.lock:
+            relations = self.viewers.get(follower_id)
+        if relations is None:
+            return
+        if following:
+            relations.followed.add(following_id)
+        else:
+            relations.followed.discard(following_id)
+
+    def like(self, user_id: str, post_id: str, liked: bool):
+        """Records a like or an unlike made through this worker"""
+        with self.lock:
+            relations = self.viewers.get(user_id)
+        if relations is None:
+            return
+        if liked:
+            relations.liked.add(post_id)
+        else:
+            relations.liked.discard(post_id)
+
+
+relationships = RelationshipCache()
+"""Relationship cache of the worker"""
+
+cache.on_invalidation(relationships.forget)
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""Module for coalescing concurrent loads of hot read models
+
+A burst of requests for the same resource shares one load in flight
+instead of each running it. Cached values older than the fresh period
+are still served while one background load refreshes them, so readers
+neither wait on the database nor fail while it stalls.
+"""
+import os
+import time
+import asyncio
+import contextvars
+from functools import partial
+from starlette.concurrency import run_in_threadpool
+
+from .cache import cache
+
+
+FRESH_SECONDS = float(os.getenv('APP_CACHE_FRESH_SECONDS', '5'))
+"""Seconds a read through value is served before being revalidated"""
+
+
+class SingleFlight:
+    """Loads in flight, at most one per key"""
+    def __init__(self):
+        """Initialize the SingleFlight class"""
+        self.flights = {}
+
+    def start(self, key: str, load) -> asyncio.Task:
+        """Runs load in the threadpool unless a load of the key is running
+
+        load is passed the cache generation the flight started at. The
+        load is shared by requests, so it runs in an empty context
+        rather than inheriting the batch session, read routing and user
+        of the request that started it.
+        """
+        flight = self.flights.get(key)
+        if flight is None:
+            started = cache.generation
+            task = contextvars.Context().run(
+                asyncio.get_running_loop().create_task,
+                run_in_threadpool(load, started)
+            )
+            flight = self.flights[key] = (task, started)
+            task.add_done_callback(lambda done: self.land(key, done))
+        return flight[0]
+
+    def land(self, key: str, task: asyncio.Task):
+        """Forgets a finished load, its failure being left to the waiters
+
+        The invalidations older than every load still running are no
+        longer needed to tell whether a load is stale.
+        """
+        if self.flights.get(key, (None,))[0] is task:
+            del self.flights[key]
+        cache.forget(min(
+            (started for _, started in self.flights.values()),
+            default=cache.generation
+        ))
+        if not task.cancelled():
+            task.exception()
+
+    async def wait(self, key: str, load):
+        """Gets the value of the load of a key, joining a running one
+
+        load returns the value and the cache generation it is current
+        at, or None when its tags were invalidated while it ran. A
+        waiter whose arrival follows that generation may have been
+        sent by a write the value predates, so it starts a new load.
+        A waiter going away does not cancel the load of the others.
+        """
+        arrived = cache.generation
+        task = self.start(key, load)
+        value, current = await asyncio.shield(task)
+        if current is None or current < arrived:
+            if self.flights.get(key, (None,))[0] is task:
+                del self.flights[key]
+            value, _ = await asyncio.shield(self.start(key, load))
+        return value
+
+
+single_flight = SingleFlight()
+"""Loads in flight in the worker"""
+
+
+def store(key: str, load, started: int):
+    """Runs a read model load and caches the value with its load time
+
+    load returns the value and its tags; a None value is not cached,
+    nor is one whose tags were invalidated since the generation the
+    load started at. Returns the value and the generation it is
+    current at, or None for a stale one.
+    """
+    value, tags = load()
+    if value is None:
+        return value, started
+    current = cache.set(
+        key, {'value': value, 'loadedOn': time.time()}, tags, since=started)
+    return value, current
+
+
+def report_failure(key: str, task: asyncio.Task):
+    """Reports a background refresh that failed"""
+    if not task.cancelled() and task.exception() is not None:
+        print(f'Refreshing {key} failed: {task.exception()}')
+
+
+async def read_through(key: str, load, fresh_seconds=FRESH_SECONDS):
+    """Gets a read model through the cache, loading it once per key
+
+    load runs in the threadpool and returns the value and its tags. A
+    value loaded more than fresh_seconds ago is returned as is while one
+    background load replaces it; on a failed refresh the old value keeps
+    being served until the cache expires it.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        stale = time.time() - entry['loadedOn'] >= fresh_seconds
+        if stale and key not in single_flight.flights:
+            refresh = single_flight.start(key, partial(store, key, load))
+            refresh.add_done_callback(
+                lambda done: report_failure(key, done))
+        return entry['value']
+    return await single_flight.wait(key, partial(store, key, load))
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""Module for capturing slow SQL statements and sampling their plans"""
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import current_route
+
+
+SLOW_QUERY_MS = os.getenv('APP_SLOW_QUERY_MS')
+"""Threshold in milliseconds above which statements are recorded"""
+
+EXPLAIN_RATE = float(os.getenv('APP_SLOW_QUERY_EXPLAIN_RATE', '0.1'))
+"""Fraction of the recorded statements whose plan is sampled"""
+
+slow_queries = deque(maxlen=int(os.getenv('APP_SLOW_QUERY_BUFFER', '100')))
+"""Ring buffer of the most recent slow statements"""
+
+slow_queries_lock = threading.Lock()
+"""Guards the ring buffer against the explain thread"""
+
+explain_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix='explain')
+"""Single background thread running the sampled EXPLAIN statements"""
+
+
+def loggable(value):
+    """Converts a bound parameter into a JSON friendly value"""
+    if value is None or type(value) in (bool, int, float, str):
+        return value
+    if type(value) in (list, tuple):
+        return [loggable(val) for val in value]
+    if type(value) is dict:
+        return {str(key): loggable(val) for key, val in value.items()}
+    return str(value)
+
+
+def explain_statement(engine, statement: str, parameters, entry: dict):
+    """Runs EXPLAIN for a recorded statement inside a rolled back copy"""
+    is_select = statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+    options = 'ANALYZE, BUFFERS' if is_select else 'VERBOSE'
+    try:
+        with engine.connect() as conn:
+            conn = conn.execution_options(slow_query_log=False)
+            with conn.begin() as trans:
+                result = conn.exec_driver_sql(
+                    f'EXPLAIN ({options}) {statement}', parameters)
+                plan = '\n'.join(row[0] for row in result)
+                trans.rollback()
+    except Exception as ex:
+        plan = f'EXPLAIN failed: {ex}'
+    with slow_queries_lock:
+        entry['plan'] = plan
+
+
+def start_slow_query_timer(conn, cursor, statement, parameters, context,
+                           executemany):
+    """Records when a SQL statement starts executing"""
+    conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+
+def record_slow_query(conn, cursor, statement, parameters, context,
+                      executemany):
+    """Records statements slower than the threshold in the ring buffer"""
+    started = conn.info['slow_query_start'].pop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms < float(SLOW_QUERY_MS):
+        return
+    if not conn.get_execution_options().get('slow_query_log', True):
+        return
+    entry = {
+        'recordedAt': datetime.now(timezone.utc).isoformat(),
+        'durationMs': round(elapsed_ms, 3),
+        'route': current_route(),
+        'statement': statement,
+        'parameters': loggable(parameters),
+        'plan': None
+    }
+    with slow_queries_lock:
+        slow_queries.append(entry)
+    if not executemany and random.random() < EXPLAIN_RATE:
+        explain_executor.submit(
+            explain_statement, conn.engine, statement, parameters, entry)
+
+
+def discard_slow_query_timer(exception_context):
+    """Drops the start time of a statement that failed"""
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('slow_query_start'):
+        conn.info['slow_query_start'].pop()
+
+
+def recorded_slow_queries() -> list:
+    """Gets the recorded slow statements, most recent first"""
+    with slow_queries_lock:
+        return [dict(entry) for entry in reversed(slow_queries)]
+
+
+if SLOW_QUERY_MS:
+    event.listen(Engine, 'before_cursor_execute', start_slow_query_timer)
+    event.listen(Engine, 'after_cursor_execute', record_slow_query)
+    event.listen(Engine, 'handle_error', discard_slow_query_timer)
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""Module for the hot query shapes, built once as cached lambda statements
+
+Each statement is traced and compiled on first use, then looked up by the
+lambda's code location; later calls only bind the new parameter values.
+Options added to a lambda statement by the session's pending delete hook
+would freeze its parameters, so these statements opt out of the hook and
+filter out pending deletes themselves.
+"""
+from sqlalchemy import and_, exists, func, lambda_stmt, select
+
+from ..database import User, Post, PostLike, Comment, UserFollowing
+
+
+CACHED = {'include_pending_deletes': True}
+"""Execution options of the cached statements"""
+
+PENDING_USERS = select(User.__table__.c.id).where(
+    User.__table__.c.deleted_on.isnot(None))
+"""Ids of the users awaiting the purge, whose rows are left out of counts
+
+Built on the tables rather than the entities, so the pending delete hook
+does not turn them into empty subqueries.
+"""
+
+PENDING_POSTS = select(Post.__table__.c.id).where(
+    Post.__table__.c.deleted_on.isnot(None))
+"""Ids of the posts awaiting the purge"""
+
+
+def fetch_user(db_session, user_id):
+    """Gets a user by id"""
+    return db_session.scalars(lambda_stmt(
+        lambda: select(User).where(and_(
+            User.id == user_id,
+            User.deleted_on == None
+        ))
+    ), execution_options=CACHED).first()
+
+
+def fetch_post(db_session, post_id):
+    """Gets a post by id"""
+    return db_session.scalars(lambda_stmt(
+        lambda: select(Post).where(and_(
+            Post.id == post_id,
+            Post.deleted_on == None
+        ))
+    ), execution_options=CACHED).first()
+
+
+def fetch_comment(db_session, comment_id):
+    """Gets a comment by id"""
+    return db_session.scalars(lambda_stmt(
+        lambda: select(Comment).where(Comment.id == comment_id)
+    ), execution_options=CACHED).first()
+
+
+def count_post_likes(db_session, post_id) -> int:
+    """Counts the likes of a post"""
+    return db_session.scalar(lambda_stmt(
+        lambda: select(func.count(PostLike.id)).where(and_(
+            PostLike.post_id == post_id,
+            PostLike.user_id.notin_(PENDING_USERS)
+        ))
+    ), execution_options=CACHED)
+
+
+def count_top_comments(db_session, post_id) -> int:
+    """Counts the top level comments of a post"""
+    return db_session.scalar(lambda_stmt(
+        lambda: select(func.count(Comment.id)).where(and_(
+            Comment.post_id == post_id,
+            Comment.comment_id == None,
+            Comment.user_id.notin_(PENDING_USERS)
+        ))
+    ), execution_options=CACHED)
+
+
+def count_replies(db_session, comment_id) -> int:
+    """Counts the replies to a comment"""
+    return db_session.scalar(lambda_stmt(
+        lambda: select(func.count(Comment.id)).where(and_(
+            Comment.comment_id == comment_id,
+            Comment.user_id.notin_(PENDING_USERS)
+        ))
+    ), execution_options=CACHED)
+
+
+def is_post_liked(db_session, post_id, user_id) -> bool:
+    """Checks if a user likes a post"""
+    if not user_id:
+        return False
+    return db_session.scalar(lambda_stmt(
+        lambda: select(exists().where(and_(
+            PostLike.post_id == post_id,
+            PostLike.user_id == user_id
+        )))
+    ), execution_options=CACHED)
+
+
+def is_following(db_session, follower_id, following_id) -> bool:
+    """Checks if a user follows another"""
+    if not follower_id:
+        return False
+    return db_session.scalar(lambda_stmt(
+        lambda: select(exists().where(and_(
+            UserFollowing.follower_id == follower_id,
+            UserFollowing.following_id == following_id
+        )))
+    ), execution_options=CACHED)
@@ -1,11 +1,23 @@
 #!/usr/bin/python3
 """Module for managing and validating authentication tokens"""
 import os
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
 from json import JSONDecoder, JSONEncoder
 
-from ..database import get_session, User
+from ..database import get_session, route_reads_for, User
+from .statements import fetch_user
+
+
+verified_tokens = ContextVar('verified_tokens', default=None)
+"""Tokens already converted during a batch request, by token string"""
+
+
+def app_cipher():
+    """Imports cryptography on first use and returns the app's Fernet"""
+    from cryptography.fernet import Fernet
+    app_key = bytes(os.getenv('APP_SECRET_KEY'), 'utf-8')
+    return Fernet(app_key)
 
 
 class AuthTokenMngr:
@@ -88,9 +100,22 @@ class AuthTokenMngr:
     @staticmethod
     def convert_token(token: str):
         """Converts a token string to an AuthTokenMngr object"""
-        app_key = bytes(os.getenv('APP_SECRET_KEY'), 'utf-8')
-        f = Fernet(app_key)
-        db_session = get_session()
+        verified = verified_tokens.get()
+        if verified is not None and token in verified:
+            auth_token = verified[token]
+        else:
+            auth_token = AuthTokenMngr.verify_token(token)
+            if verified is not None:
+                verified[token] = auth_token
+        if auth_token is not None:
+            route_reads_for(auth_token.user_id)
+        return auth_token
+
+    @staticmethod
+    def verify_token(token: str):
+        """Decrypts a token string and checks it against the user record"""
+        f = app_cipher()
+        db_session = get_session(primary=True)
         try:
             decoded_token = JSONDecoder().decode(
                 f.decrypt(bytes(token, 'utf-8')).decode('utf-8')
@@ -115,9 +140,7 @@ class AuthTokenMngr:
             expdt = datetime.fromisoformat(decoded_token['expires'])
             if currdt >= expdt:
                 raise ValueError('Auth token has expired.')
-            user = db_session.query(User).filter(
-                User.id == decoded_token['userId']
-            ).first()
+            user = fetch_user(db_session, decoded_token['userId'])
             valid_conds = (
                 user is not None,
                 user and user.user_active,
@@ -143,8 +166,7 @@ class AuthTokenMngr:
     @staticmethod
     def deconvert_token(auth_token) -> str:
         """Deconvert an AuthTokenMngr object to a token string"""
-        app_key = bytes(os.getenv('APP_SECRET_KEY'), 'utf-8')
-        f = Fernet(app_key)
+        f = app_cipher()
         try:
             currdt = datetime.utcnow()
             timedurr = timedelta(days=30)
@@ -242,8 +264,7 @@ class ResetTokenMngr:
     @staticmethod
     def convert_token(token: str):
         """Converts a reset token string to a ResetTokenMngr object"""
-        app_key = bytes(os.getenv('APP_SECRET_KEY'), 'utf-8')
-        f = Fernet(app_key)
+        f = app_cipher()
         db_session = get_session()
         try:
             decoded_token = JSONDecoder().decode(
@@ -295,8 +316,7 @@ class ResetTokenMngr:
     @staticmethod
     def deconvert_token(reset_token) -> str:
         """Deconverts a ResetTokenMngr object to a reset token string"""
-        app_key = bytes(os.getenv('APP_SECRET_KEY'), 'utf-8')
-        f = Fernet(app_key)
+        f = app_cipher()
         try:
             currdt = datetime.utcnow()
             timedurr = timedelta(days=30)
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""Module for streaming a user's data as newline delimited JSON"""
+from sqlalchemy import or_, select
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from ..database import User, Post, PostLike, Comment, UserFollowing
+from .raw_json import encode_json
+
+
+BATCH_SIZE = 500
+"""Rows fetched from the server side cursor, and encoded, per chunk"""
+
+
+def export_sections(user_id: str):
+    """Lists the record type, statement and row encoder of each section"""
+    return (
+        (
+            'post',
+            select(Post.id, Post.title, Post.created_on, Post.content).where(
+                Post.user_id == user_id).order_by(Post.id),
+            lambda row: {
+                'id': row.id,
+                'title': row.title,
+                'publishedOn': row.created_on.isoformat(),
+                'quotes': row.content
+            }
+        ),
+        (
+            'like',
+            select(PostLike.post_id, PostLike.created_on).where(
+                PostLike.user_id == user_id).order_by(PostLike.created_on),
+            lambda row: {
+                'postId': row.post_id,
+                'likedOn': row.created_on.isoformat()
+            }
+        ),
+        (
+            'comment',
+            select(
+                Comment.id,
+                Comment.post_id,
+                Comment.comment_id,
+                Comment.created_on,
+                Comment.content
+            ).where(Comment.user_id == user_id).order_by(Comment.created_on),
+            lambda row: {
+                'id': row.id,
+                'postId': row.post_id,
+                'replyTo': row.comment_id,
+                'createdOn': row.created_on.isoformat(),
+                'text': row.content
+            }
+        ),
+        (
+            'follow',
+            select(
+                UserFollowing.follower_id,
+                UserFollowing.following_id,
+                UserFollowing.created_on
+            ).where(or_(
+                UserFollowing.follower_id == user_id,
+                UserFollowing.following_id == user_id
+            )).order_by(UserFollowing.created_on),
+            lambda row: {
+                'followerId': row.follower_id,
+                'followingId': row.following_id,
+                'followedOn': row.created_on.isoformat()
+            }
+        )
+    )
+
+
+def encode_lines(records) -> bytes:
+    """Encodes records as newline terminated JSON lines"""
+    return ''.join(
+        encode_json(record) + '\n' for record in records).encode('utf-8')
+
+
+def export_chunks(db_session, user: User):
+    """Yields the user's records in chunks, then closes the session
+
+    Each section is read through a server side cursor BATCH_SIZE rows at
+    a time, so memory use does not grow with the size of the account.
+    """
+    try:
+        yield encode_lines([{
+            'type': 'user',
+            'id': user.id,
+            'joined': user.created_on.isoformat(),
+            'name': user.name,
+            'email': user.email,
+            'bio': user.bio,
+            'profilePictureId': user.profile_picture_id
+        }])
+        for record_type, statement, encode_row in export_sections(user.id):
+            result = db_session.execute(statement.execution_options(
+                stream_results=True, yield_per=BATCH_SIZE))
+            for rows in result.partitions():
+                yield encode_lines(
+                    {'type': record_type, **encode_row(row)} for row in rows)
+    finally:
+        db_session.close()
+
+
+async def stream_export(db_session, user: User):
+    """Streams the export chunks, reading them in the threadpool
+
+    Closing the stream early (the client went away) still closes the
+    cursor and the session.
+    """
+    chunks = export_chunks(db_session, user)
+    try:
+        async for chunk in iterate_in_threadpool(chunks):
+            yield chunk
+    finally:
+        await run_in_threadpool(chunks.close)
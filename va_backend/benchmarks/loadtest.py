@@ -0,0 +1,294 @@
+#!/usr/bin/python3
+"""Drives scripted scenarios against a running server and reports latency
+
+Run from the va_backend directory against a server seeded by
+benchmarks.seed:
+    python3 -m benchmarks.loadtest --manifest seed.json --concurrency 32
+The report (requests per second and p50/p95/p99 latency per scenario) is
+written as JSON so runs can be compared over time.
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+from datetime import datetime, timezone
+import httpx
+
+
+def viewer(rng: random.Random, manifest: dict) -> dict:
+    """Picks a signed-in user"""
+    return rng.choice(manifest['tokens'])
+
+
+def scenario_feed(rng, manifest):
+    """Posts feed of a signed-in user"""
+    return 'GET', '/api/v1/posts-feed', {
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_explore(rng, manifest):
+    """Explore section of a signed-in user"""
+    return 'GET', '/api/v1/posts-explore', {
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_post(rng, manifest):
+    """Single post card"""
+    return 'GET', '/api/v1/post', {
+        'id': rng.choice(manifest['postIds']),
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_profile(rng, manifest):
+    """Profile header of a user"""
+    return 'GET', '/api/v1/user', {
+        'id': rng.choice(manifest['userIds']),
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_user_posts(rng, manifest):
+    """Posts made by a user"""
+    return 'GET', '/api/v1/posts-user-made', {
+        'userId': rng.choice(manifest['userIds']),
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_user_likes(rng, manifest):
+    """Posts liked by a user"""
+    return 'GET', '/api/v1/posts-user-likes', {
+        'userId': rng.choice(manifest['userIds']),
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_followers(rng, manifest):
+    """Followers of a user"""
+    return 'GET', '/api/v1/followers', {
+        'id': rng.choice(manifest['userIds']),
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_followings(rng, manifest):
+    """Users followed by a user"""
+    return 'GET', '/api/v1/followings', {
+        'id': rng.choice(manifest['userIds']),
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_comment(rng, manifest):
+    """Single comment"""
+    return 'GET', '/api/v1/comment', {
+        'id': rng.choice(manifest['commentIds'])}
+
+
+def scenario_post_comments(rng, manifest):
+    """Top-level comments of a post"""
+    return 'GET', '/api/v1/comments-of-post', {
+        'id': rng.choice(manifest['postIds'])}
+
+
+def scenario_comment_replies(rng, manifest):
+    """Replies to a comment"""
+    return 'GET', '/api/v1/comment-replies', {
+        'id': rng.choice(manifest['commentIds'])}
+
+
+def scenario_user_comments(rng, manifest):
+    """Comments made by a user"""
+    return 'GET', '/api/v1/comments-by-user', {
+        'id': rng.choice(manifest['userIds'])}
+
+
+def scenario_search_posts(rng, manifest):
+    """Full-text search over posts"""
+    return 'GET', '/api/v1/search-posts', {
+        'q': rng.choice(manifest['searchTerms']),
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_search_people(rng, manifest):
+    """Full-text search over users"""
+    return 'GET', '/api/v1/search-people', {
+        'q': rng.choice(manifest['searchTerms']),
+        'token': viewer(rng, manifest)['authToken']}
+
+
+def scenario_like_toggle(rng, manifest):
+    """Like or unlike a post"""
+    user = viewer(rng, manifest)
+    return 'PUT', '/api/v1/like-post', {
+        'authToken': user['authToken'],
+        'userId': user['userId'],
+        'postId': rng.choice(manifest['postIds'])}
+
+
+def scenario_follow_toggle(rng, manifest):
+    """Follow or unfollow a user"""
+    user = viewer(rng, manifest)
+    return 'PUT', '/api/v1/follow', {
+        'authToken': user['authToken'],
+        'userId': user['userId'],
+        'followId': rng.choice(manifest['userIds'])}
+
+
+def scenario_sign_in(rng, manifest):
+    """Password sign in"""
+    return 'POST', '/api/v1/sign-in', {
+        'email': viewer(rng, manifest)['email'],
+        'password': manifest['password']}
+
+
+SCENARIOS = {
+    'feed': (scenario_feed, 20),
+    'explore': (scenario_explore, 8),
+    'post': (scenario_post, 15),
+    'profile': (scenario_profile, 10),
+    'user-posts': (scenario_user_posts, 6),
+    'user-likes': (scenario_user_likes, 3),
+    'followers': (scenario_followers, 3),
+    'followings': (scenario_followings, 3),
+    'comment': (scenario_comment, 3),
+    'post-comments': (scenario_post_comments, 8),
+    'comment-replies': (scenario_comment_replies, 3),
+    'user-comments': (scenario_user_comments, 2),
+    'search-posts': (scenario_search_posts, 5),
+    'search-people': (scenario_search_people, 3),
+    'like-toggle': (scenario_like_toggle, 4),
+    'follow-toggle': (scenario_follow_toggle, 2),
+    'sign-in': (scenario_sign_in, 2)
+}
+"""Scenario name mapped to its request builder and weight in the mix"""
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Gets the nearest-rank percentile of sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    """Builds the report entry of a scenario"""
+    latencies.sort()
+    to_ms = 1000
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50Ms': round(percentile(latencies, 0.50) * to_ms, 2),
+        'p95Ms': round(percentile(latencies, 0.95) * to_ms, 2),
+        'p99Ms': round(percentile(latencies, 0.99) * to_ms, 2),
+        'maxMs': round(latencies[-1] * to_ms, 2) if latencies else 0.0
+    }
+
+
+async def run_scenario(client, pick_request, manifest, cli_args, seed):
+    """Runs one scenario at the configured concurrency for the duration"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + cli_args.duration
+
+    async def user_loop(worker_id):
+        """Issues requests back to back until the deadline"""
+        nonlocal errors
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            method, path, payload = pick_request(rng, manifest)
+            started = time.perf_counter()
+            try:
+                if method == 'GET':
+                    response = await client.get(path, params=payload)
+                else:
+                    response = await client.request(
+                        method, path, json=payload)
+                failed = response.status_code >= 400
+                failed = failed or not response.json().get('success')
+            except (httpx.HTTPError, ValueError):
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += 1 if failed else 0
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        user_loop(worker_id) for worker_id in range(cli_args.concurrency)
+    ])
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def mixed_scenario(names: list):
+    """Builds a request picker drawing from scenarios by weight"""
+    builders = [SCENARIOS[name][0] for name in names]
+    weights = [SCENARIOS[name][1] for name in names]
+
+    def pick_request(rng, manifest):
+        """Picks a weighted scenario and builds its request"""
+        return rng.choices(builders, weights=weights)[0](rng, manifest)
+    return pick_request
+
+
+async def run_suite(cli_args, manifest: dict) -> dict:
+    """Runs every selected scenario, then the weighted mix"""
+    names = cli_args.scenarios or list(SCENARIOS)
+    limits = httpx.Limits(max_connections=cli_args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(
+            base_url=cli_args.base_url,
+            limits=limits,
+            timeout=cli_args.timeout) as client:
+        for seed, name in enumerate(names):
+            results[name] = await run_scenario(
+                client, SCENARIOS[name][0], manifest, cli_args, seed)
+            print(f'{name}: {json.dumps(results[name])}', file=sys.stderr)
+        if not cli_args.no_mix:
+            results['mix'] = await run_scenario(
+                client, mixed_scenario(names), manifest, cli_args,
+                len(names))
+            print(f'mix: {json.dumps(results["mix"])}', file=sys.stderr)
+    return results
+
+
+def main():
+    """Loads the manifest, runs the scenarios and writes the report"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--manifest', default='seed_manifest.json')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15,
+                        help='seconds to run each scenario')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--scenarios', nargs='*', choices=list(SCENARIOS),
+                        help='scenarios to run (default: all)')
+    parser.add_argument('--no-mix', action='store_true',
+                        help='skip the weighted mixed scenario')
+    parser.add_argument('--label', default='',
+                        help='free text stored in the report')
+    parser.add_argument('--output', default='-',
+                        help='report file path, - for stdout')
+    cli_args = parser.parse_args()
+    with open(cli_args.manifest) as file:
+        manifest = json.load(file)
+    results = asyncio.run(run_suite(cli_args, manifest))
+    report = {
+        'label': cli_args.label,
+        'startedAt': datetime.now(timezone.utc).isoformat(),
+        'baseUrl': cli_args.base_url,
+        'concurrency': cli_args.concurrency,
+        'durationPerScenario': cli_args.duration,
+        'python': platform.python_version(),
+        'dataset': manifest['counts'],
+        'scenarios': results
+    }
+    report_txt = json.dumps(report, indent=2)
+    if cli_args.output == '-':
+        print(report_txt)
+    else:
+        with open(cli_args.output, 'w') as file:
+            file.write(report_txt + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
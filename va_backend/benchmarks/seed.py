@@ -0,0 +1,264 @@
+#!/usr/bin/python3
+"""Seeds the database with a synthetic social graph for benchmarking
+
+Run from the va_backend directory (this DROPS all existing tables):
+    python3 -m benchmarks.seed --reset --users 2000 --manifest seed.json
+"""
+import os
+import sys
+import json
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
+
+from api.v1.database import (
+    init_database, get_session, uuid7, User, Post, PostLike, Comment,
+    UserFollowing
+)
+from api.v1.utils.hashing import hash_password
+from api.v1.utils.token_mgt import AuthTokenMngr
+
+
+WORDS = (
+    'virtue wisdom fortune fate time soul reason nature courage mind '
+    'silence truth patience death glory friendship justice labour hope '
+    'fear anger desire river stone fire memory honour duty law art war '
+    'peace kings gods city sea night light shadow road journey'
+).split()
+"""Word bank used to generate names, titles and quotes"""
+
+BATCH_SIZE = 5000
+"""Rows inserted per executemany batch"""
+
+
+def power_law_weights(count: int, alpha: float) -> list:
+    """Generates cumulative Zipf weights for ranks 1..count"""
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, count + 1):
+        total += 1 / rank ** alpha
+        cum_weights.append(total)
+    return cum_weights
+
+
+def pareto_count(rng: random.Random, mean: float, limit: int) -> int:
+    """Draws a heavy tailed count with roughly the given mean"""
+    shape = 2.0
+    scale = mean * (shape - 1) / shape
+    return min(int(scale * rng.paretovariate(shape)), limit)
+
+
+def phrase(rng: random.Random, low: int, high: int) -> str:
+    """Builds a phrase of random words"""
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def random_time(rng: random.Random, start: datetime, end: datetime):
+    """Picks a random timestamp between start and end"""
+    span = (end - start).total_seconds()
+    return start + timedelta(seconds=rng.uniform(0, span))
+
+
+def insert_rows(db_session, model, rows: list):
+    """Inserts rows in executemany batches"""
+    for idx in range(0, len(rows), BATCH_SIZE):
+        db_session.execute(insert(model), rows[idx: idx + BATCH_SIZE])
+    db_session.commit()
+
+
+def build_dataset(cli_args, rng: random.Random, password_hash: str):
+    """Generates all synthetic rows in memory"""
+    now = datetime.now(timezone.utc)
+    epoch = now - timedelta(days=365)
+    users = []
+    for idx in range(cli_args.users):
+        joined = random_time(rng, epoch, now - timedelta(days=30))
+        users.append({
+            'id': uuid7(joined.timestamp()),
+            'created_on': joined,
+            'updated_on': joined,
+            'email': f'bench{idx}@{cli_args.email_domain}',
+            'name': phrase(rng, 1, 2).title(),
+            'bio': phrase(rng, 0, 12),
+            'profile_picture_id': '',
+            'hashed_password': password_hash,
+            'signin_trials': 0,
+            'user_active': True,
+            'user_reset_token': ''
+        })
+    popularity = power_law_weights(len(users), cli_args.alpha)
+    followings = []
+    for idx, follower in enumerate(users):
+        wanted = pareto_count(rng, cli_args.follows, len(users) - 1)
+        targets = set(rng.choices(
+            range(len(users)), cum_weights=popularity, k=wanted))
+        targets.discard(idx)
+        for target in targets:
+            followed = random_time(rng, follower['created_on'], now)
+            followings.append({
+                'id': uuid7(followed.timestamp()),
+                'created_on': followed,
+                'follower_id': follower['id'],
+                'following_id': users[target]['id']
+            })
+    posts = []
+    for author in users:
+        for _ in range(pareto_count(rng, cli_args.posts, 10000)):
+            created = random_time(rng, author['created_on'], now)
+            posts.append({
+                'id': uuid7(created.timestamp()),
+                'created_on': created,
+                'updated_on': created,
+                'user_id': author['id'],
+                'title': phrase(rng, 2, 6).capitalize(),
+                'content': [
+                    phrase(rng, 4, 20).capitalize() + '.'
+                    for _ in range(rng.randint(1, cli_args.max_quotes))
+                ]
+            })
+    rng.shuffle(posts)
+    post_weights = power_law_weights(len(posts), cli_args.alpha)
+    likes = []
+    comments = []
+    for user in users:
+        wanted = pareto_count(rng, cli_args.likes, len(posts))
+        for post in set(rng.choices(
+                range(len(posts)), cum_weights=post_weights, k=wanted)):
+            liked = random_time(rng, posts[post]['created_on'], now)
+            likes.append({
+                'id': uuid7(liked.timestamp()),
+                'created_on': liked,
+                'post_id': posts[post]['id'],
+                'user_id': user['id']
+            })
+    top_level = []
+    for _ in range(int(len(posts) * cli_args.comments)):
+        post = posts[rng.choices(
+            range(len(posts)), cum_weights=post_weights)[0]]
+        commented = random_time(rng, post['created_on'], now)
+        comment = {
+            'id': uuid7(commented.timestamp()),
+            'created_on': commented,
+            'post_id': post['id'],
+            'user_id': rng.choice(users)['id'],
+            'comment_id': None,
+            'content': phrase(rng, 2, 40)
+        }
+        comments.append(comment)
+        top_level.append(comment)
+    for _ in range(int(len(top_level) * cli_args.replies)):
+        parent = rng.choice(top_level)
+        replied = random_time(rng, parent['created_on'], now)
+        comments.append({
+            'id': uuid7(replied.timestamp()),
+            'created_on': replied,
+            'post_id': parent['post_id'],
+            'user_id': rng.choice(users)['id'],
+            'comment_id': parent['id'],
+            'content': phrase(rng, 2, 40)
+        })
+    return {
+        'users': users,
+        'followings': followings,
+        'posts': posts,
+        'likes': likes,
+        'comments': comments,
+        'top_level': top_level
+    }
+
+
+def build_manifest(cli_args, rng: random.Random, dataset: dict) -> dict:
+    """Samples ids and auth tokens the load test scenarios draw from"""
+    users = dataset['users']
+    sample_users = rng.sample(users, min(cli_args.token_users, len(users)))
+    tokens = []
+    for user in sample_users:
+        auth_token = AuthTokenMngr(
+            user_id=user['id'],
+            email=user['email'],
+            secure_text=user['hashed_password']
+        )
+        tokens.append({
+            'userId': user['id'],
+            'email': user['email'],
+            'authToken': AuthTokenMngr.deconvert_token(auth_token)
+        })
+
+    def sample_ids(rows):
+        """Samples ids from a list of rows"""
+        return [row['id'] for row in rng.sample(rows, min(500, len(rows)))]
+
+    return {
+        'createdAt': datetime.now(timezone.utc).isoformat(),
+        'password': cli_args.password,
+        'counts': {
+            'users': len(users),
+            'followings': len(dataset['followings']),
+            'posts': len(dataset['posts']),
+            'likes': len(dataset['likes']),
+            'comments': len(dataset['comments'])
+        },
+        'tokens': tokens,
+        'userIds': sample_ids(users),
+        'postIds': sample_ids(dataset['posts']),
+        'commentIds': sample_ids(dataset['top_level']),
+        'searchTerms': rng.sample(WORDS, 10)
+    }
+
+
+def main():
+    """Generates the dataset, loads it and writes the manifest"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reset', action='store_true',
+                        help='confirm dropping and recreating all tables')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--follows', type=float, default=40,
+                        help='mean followings per user')
+    parser.add_argument('--posts', type=float, default=8,
+                        help='mean posts per user')
+    parser.add_argument('--max-quotes', type=int, default=5,
+                        help='maximum quotes per post')
+    parser.add_argument('--likes', type=float, default=30,
+                        help='mean likes per user')
+    parser.add_argument('--comments', type=float, default=1.5,
+                        help='top-level comments per post')
+    parser.add_argument('--replies', type=float, default=0.8,
+                        help='replies per top-level comment')
+    parser.add_argument('--alpha', type=float, default=1.1,
+                        help='power-law exponent of popularity')
+    parser.add_argument('--token-users', type=int, default=200,
+                        help='users to issue auth tokens for')
+    parser.add_argument('--password', default='benchmark-password')
+    parser.add_argument('--email-domain', default='example.com',
+                        help='domain of the synthetic email addresses, it '
+                        'must pass email deliverability checks for the '
+                        'sign-in scenario to succeed')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--manifest', default='seed_manifest.json')
+    cli_args = parser.parse_args()
+    if not cli_args.reset:
+        parser.error('--reset is required: seeding drops all tables')
+    if not os.getenv('DATABASE_URL') or not os.getenv('APP_SECRET_KEY'):
+        parser.error('DATABASE_URL and APP_SECRET_KEY must be set')
+    rng = random.Random(cli_args.seed)
+    dataset = build_dataset(cli_args, rng, hash_password(cli_args.password))
+    init_database()
+    db_session = get_session()
+    try:
+        insert_rows(db_session, User, dataset['users'])
+        insert_rows(db_session, UserFollowing, dataset['followings'])
+        insert_rows(db_session, Post, dataset['posts'])
+        insert_rows(db_session, PostLike, dataset['likes'])
+        insert_rows(db_session, Comment, dataset['comments'])
+    finally:
+        db_session.close()
+    manifest = build_manifest(cli_args, rng, dataset)
+    with open(cli_args.manifest, 'w') as file:
+        json.dump(manifest, file, indent=2)
+    print(json.dumps(manifest['counts']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+-- Migrates the posts content column from JSON encoded TEXT to JSONB
+
+BEGIN;
+
+-- Drop the indexes built on the TEXT column
+DROP INDEX IF EXISTS ix_posts_content;
+DROP INDEX IF EXISTS idx_post_text_tsv;
+
+-- Convert the stored quotes to JSONB
+ALTER TABLE posts
+	ALTER COLUMN content TYPE JSONB USING content::JSONB;
+
+-- Rebuild the full-text search index from the JSONB string values
+CREATE INDEX idx_post_text_tsv ON posts
+	USING gin (to_tsvector('english', content));
+
+COMMIT;
@@ -0,0 +1,23 @@
+-- Adds the pending deletion markers and the indexes used to purge in batches
+
+BEGIN;
+
+-- Mark users and posts awaiting the background purge
+ALTER TABLE users ADD COLUMN IF NOT EXISTS deleted_on TIMESTAMP WITH TIME ZONE;
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS deleted_on TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_user_pending_delete ON users (deleted_on)
+	WHERE deleted_on IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_post_pending_delete ON posts (deleted_on)
+	WHERE deleted_on IS NOT NULL;
+
+-- Index the foreign keys the purge batches (and read paths) filter on
+CREATE INDEX IF NOT EXISTS ix_posts_user_id ON posts (user_id);
+CREATE INDEX IF NOT EXISTS ix_posts_likes_user_id ON posts_likes (user_id);
+CREATE INDEX IF NOT EXISTS ix_comments_post_id ON comments (post_id);
+CREATE INDEX IF NOT EXISTS ix_comments_user_id ON comments (user_id);
+CREATE INDEX IF NOT EXISTS ix_comments_comment_id ON comments (comment_id);
+CREATE INDEX IF NOT EXISTS ix_users_followings_following_id
+	ON users_followings (following_id);
+
+COMMIT;
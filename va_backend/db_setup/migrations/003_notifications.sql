@@ -0,0 +1,29 @@
+-- Adds the notifications inbox and the per-user unread counters
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS notifications (
+	id VARCHAR(64) NOT NULL PRIMARY KEY,
+	created_on TIMESTAMP WITH TIME ZONE NOT NULL,
+	updated_on TIMESTAMP WITH TIME ZONE NOT NULL,
+	user_id VARCHAR(64) NOT NULL REFERENCES users (id),
+	kind VARCHAR(16) NOT NULL,
+	subject_id VARCHAR(64) NOT NULL,
+	actor_id VARCHAR(64) NOT NULL,
+	actors_count INTEGER NOT NULL,
+	read_on TIMESTAMP WITH TIME ZONE
+);
+
+-- One unread notification per recipient, kind and subject to coalesce into
+CREATE UNIQUE INDEX IF NOT EXISTS idx_notification_unread_group
+	ON notifications (user_id, kind, subject_id)
+	WHERE read_on IS NULL;
+CREATE INDEX IF NOT EXISTS idx_notification_inbox
+	ON notifications (user_id, updated_on);
+
+CREATE TABLE IF NOT EXISTS notification_counters (
+	user_id VARCHAR(64) NOT NULL PRIMARY KEY,
+	unread INTEGER NOT NULL
+);
+
+COMMIT;
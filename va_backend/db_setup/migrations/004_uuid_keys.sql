@@ -0,0 +1,76 @@
+-- Stores the ids as native 16 byte uuids instead of 36 character strings
+-- and lets the database stamp the creation and update times.
+-- Existing ids keep their values; new rows get time ordered (v7) ids.
+
+BEGIN;
+
+ALTER TABLE posts DROP CONSTRAINT IF EXISTS posts_user_id_fkey;
+ALTER TABLE users_followings
+	DROP CONSTRAINT IF EXISTS users_followings_follower_id_fkey,
+	DROP CONSTRAINT IF EXISTS users_followings_following_id_fkey;
+ALTER TABLE posts_likes
+	DROP CONSTRAINT IF EXISTS posts_likes_post_id_fkey,
+	DROP CONSTRAINT IF EXISTS posts_likes_user_id_fkey;
+ALTER TABLE comments
+	DROP CONSTRAINT IF EXISTS comments_post_id_fkey,
+	DROP CONSTRAINT IF EXISTS comments_user_id_fkey;
+ALTER TABLE notifications DROP CONSTRAINT IF EXISTS notifications_user_id_fkey;
+
+ALTER TABLE users
+	ALTER COLUMN id TYPE uuid USING id::uuid,
+	ALTER COLUMN created_on SET DEFAULT now(),
+	ALTER COLUMN updated_on SET DEFAULT now();
+ALTER TABLE posts
+	ALTER COLUMN id TYPE uuid USING id::uuid,
+	ALTER COLUMN user_id TYPE uuid USING user_id::uuid,
+	ALTER COLUMN created_on SET DEFAULT now(),
+	ALTER COLUMN updated_on SET DEFAULT now();
+ALTER TABLE users_followings
+	ALTER COLUMN id TYPE uuid USING id::uuid,
+	ALTER COLUMN follower_id TYPE uuid USING follower_id::uuid,
+	ALTER COLUMN following_id TYPE uuid USING following_id::uuid,
+	ALTER COLUMN created_on SET DEFAULT now();
+ALTER TABLE posts_likes
+	ALTER COLUMN id TYPE uuid USING id::uuid,
+	ALTER COLUMN post_id TYPE uuid USING post_id::uuid,
+	ALTER COLUMN user_id TYPE uuid USING user_id::uuid,
+	ALTER COLUMN created_on SET DEFAULT now(),
+	ALTER COLUMN updated_on SET DEFAULT now();
+ALTER TABLE comments
+	ALTER COLUMN id TYPE uuid USING id::uuid,
+	ALTER COLUMN post_id TYPE uuid USING post_id::uuid,
+	ALTER COLUMN user_id TYPE uuid USING user_id::uuid,
+	ALTER COLUMN comment_id TYPE uuid USING comment_id::uuid,
+	ALTER COLUMN created_on SET DEFAULT now();
+ALTER TABLE notifications
+	ALTER COLUMN id TYPE uuid USING id::uuid,
+	ALTER COLUMN user_id TYPE uuid USING user_id::uuid,
+	ALTER COLUMN actor_id TYPE uuid USING actor_id::uuid,
+	ALTER COLUMN created_on SET DEFAULT now(),
+	ALTER COLUMN updated_on SET DEFAULT now();
+ALTER TABLE notification_counters
+	ALTER COLUMN user_id TYPE uuid USING user_id::uuid;
+
+ALTER TABLE posts
+	ADD CONSTRAINT posts_user_id_fkey
+	FOREIGN KEY (user_id) REFERENCES users (id);
+ALTER TABLE users_followings
+	ADD CONSTRAINT users_followings_follower_id_fkey
+	FOREIGN KEY (follower_id) REFERENCES users (id),
+	ADD CONSTRAINT users_followings_following_id_fkey
+	FOREIGN KEY (following_id) REFERENCES users (id);
+ALTER TABLE posts_likes
+	ADD CONSTRAINT posts_likes_post_id_fkey
+	FOREIGN KEY (post_id) REFERENCES posts (id),
+	ADD CONSTRAINT posts_likes_user_id_fkey
+	FOREIGN KEY (user_id) REFERENCES users (id);
+ALTER TABLE comments
+	ADD CONSTRAINT comments_post_id_fkey
+	FOREIGN KEY (post_id) REFERENCES posts (id),
+	ADD CONSTRAINT comments_user_id_fkey
+	FOREIGN KEY (user_id) REFERENCES users (id);
+ALTER TABLE notifications
+	ADD CONSTRAINT notifications_user_id_fkey
+	FOREIGN KEY (user_id) REFERENCES users (id);
+
+COMMIT;
@@ -0,0 +1,72 @@
+-- Hash partitions posts_likes and comments on post_id (MODULUS matches
+-- schemas.HASH_PARTITIONS), so lookups by post scan a single partition.
+-- The rows are copied into new partitioned tables that replace the old ones;
+-- their primary keys include post_id, as partitioned tables require.
+
+BEGIN;
+
+CREATE TABLE posts_likes_partitioned (LIKE posts_likes INCLUDING DEFAULTS)
+	PARTITION BY HASH (post_id);
+CREATE TABLE posts_likes_p0 PARTITION OF posts_likes_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 0);
+CREATE TABLE posts_likes_p1 PARTITION OF posts_likes_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 1);
+CREATE TABLE posts_likes_p2 PARTITION OF posts_likes_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 2);
+CREATE TABLE posts_likes_p3 PARTITION OF posts_likes_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 3);
+CREATE TABLE posts_likes_p4 PARTITION OF posts_likes_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 4);
+CREATE TABLE posts_likes_p5 PARTITION OF posts_likes_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 5);
+CREATE TABLE posts_likes_p6 PARTITION OF posts_likes_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 6);
+CREATE TABLE posts_likes_p7 PARTITION OF posts_likes_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 7);
+INSERT INTO posts_likes_partitioned SELECT * FROM posts_likes;
+DROP TABLE posts_likes;
+ALTER TABLE posts_likes_partitioned RENAME TO posts_likes;
+ALTER TABLE posts_likes
+	ADD CONSTRAINT posts_likes_pkey PRIMARY KEY (id, post_id),
+	ADD CONSTRAINT unique_reaction UNIQUE (post_id, user_id),
+	ADD CONSTRAINT posts_likes_post_id_fkey
+	FOREIGN KEY (post_id) REFERENCES posts (id),
+	ADD CONSTRAINT posts_likes_user_id_fkey
+	FOREIGN KEY (user_id) REFERENCES users (id);
+CREATE INDEX ix_posts_likes_user_id ON posts_likes (user_id);
+
+CREATE TABLE comments_partitioned (LIKE comments INCLUDING DEFAULTS)
+	PARTITION BY HASH (post_id);
+CREATE TABLE comments_p0 PARTITION OF comments_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 0);
+CREATE TABLE comments_p1 PARTITION OF comments_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 1);
+CREATE TABLE comments_p2 PARTITION OF comments_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 2);
+CREATE TABLE comments_p3 PARTITION OF comments_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 3);
+CREATE TABLE comments_p4 PARTITION OF comments_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 4);
+CREATE TABLE comments_p5 PARTITION OF comments_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 5);
+CREATE TABLE comments_p6 PARTITION OF comments_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 6);
+CREATE TABLE comments_p7 PARTITION OF comments_partitioned
+	FOR VALUES WITH (MODULUS 8, REMAINDER 7);
+INSERT INTO comments_partitioned SELECT * FROM comments;
+DROP TABLE comments;
+ALTER TABLE comments_partitioned RENAME TO comments;
+ALTER TABLE comments
+	ADD CONSTRAINT comments_pkey PRIMARY KEY (id, post_id),
+	ADD CONSTRAINT comments_post_id_fkey
+	FOREIGN KEY (post_id) REFERENCES posts (id),
+	ADD CONSTRAINT comments_user_id_fkey
+	FOREIGN KEY (user_id) REFERENCES users (id);
+CREATE INDEX ix_comments_post_id ON comments (post_id);
+CREATE INDEX ix_comments_user_id ON comments (user_id);
+CREATE INDEX ix_comments_comment_id ON comments (comment_id);
+
+ANALYZE posts_likes;
+ANALYZE comments;
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- Replaces the actor count of the notification groups with the set of
+-- their distinct actors, ordered by their latest action. Existing groups
+-- only keep their latest actor, as the others were never recorded.
+
+BEGIN;
+
+ALTER TABLE notifications ADD COLUMN IF NOT EXISTS actor_ids uuid[];
+UPDATE notifications SET actor_ids = ARRAY[actor_id] WHERE actor_ids IS NULL;
+ALTER TABLE notifications
+	ALTER COLUMN actor_ids SET NOT NULL,
+	DROP COLUMN IF EXISTS actors_count;
+-- Finds the groups of an actor when the purge takes them out
+CREATE INDEX IF NOT EXISTS idx_notification_actors
+	ON notifications USING gin (actor_ids);
+
+COMMIT;
@@ -4,8 +4,8 @@
 # Load environment variables from the .env.local file
 export $(grep -v '^#' .env.local | xargs)
 
-# Start the backend server
-python3 -m api.v1.server
+# Start the backend server (pass --production for the multi-worker server)
+python3 -m api.v1.server "$@"
 
 # For bash script
 # (!/usr/bin/env bash)
@@ -30,4 +30,4 @@ python3 -m api.v1.server
 #	GMAIL_SENDER="${ENV_VARS['GMAIL_SENDER']}" \
 #	FRONTEND_DOMAIN="${ENV_VARS['FRONTEND_DOMAIN']}" \
 #	APP_SECRET_KEY="${ENV_VARS['APP_SECRET_KEY']}" \
-#	python3 -m api.v1.server
+#	python3 -m api.v1.server "$@"
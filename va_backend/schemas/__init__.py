@@ -1,21 +1,82 @@
 #!/usr/bin/python3
 """Module for base model and utility functions"""
+import os
+import time
+import uuid
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, TIMESTAMP, String
-from datetime import datetime
-from sqlalchemy.sql import func, text
+from sqlalchemy import Column, DDL, TIMESTAMP, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import func, literal_column, text
+from sqlalchemy.types import TypeDecorator
 
 
 Base = declarative_base()
 
+NIL_UUID = '00000000-0000-0000-0000-000000000000'
+"""Id bound in place of malformed ids, which no row can have"""
+
+HASH_PARTITIONS = 8
+"""Partitions of each table hash partitioned on its post id"""
+
+
+def uuid7(timestamp: float = None) -> str:
+    """Generates a time ordered UUID (version 7) string
+
+    The first 48 bits hold the Unix time in milliseconds (now, or the
+    given timestamp), so new ids sort after older ones and land at the
+    right edge of the primary key index; the other 74 bits are random.
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    unix_ms = int(timestamp * 1000) & ((1 << 48) - 1)
+    rand = int.from_bytes(os.urandom(10), 'big')
+    value = (unix_ms << 80) | (0x7 << 76) | ((rand >> 62) & 0xFFF) << 64
+    value |= (0b10 << 62) | (rand & ((1 << 62) - 1))
+    return str(uuid.UUID(int=value))
+
+
+def sql_uuid7():
+    """Builds a SQL expression generating a time ordered UUID per row
+
+    The database side counterpart of uuid7, for rows inserted from a
+    select: the Unix time in milliseconds overwrites the first 48 bits of
+    a random (version 4) UUID, whose version is then changed to 7.
+    """
+    return literal_column(
+        "encode(set_bit(set_bit(overlay(uuid_send(gen_random_uuid()) "
+        "placing substring(int8send(floor(extract(epoch from "
+        "clock_timestamp()) * 1000)::bigint) from 3) from 1 for 6), "
+        "52, 1), 53, 1), 'hex')::uuid",
+        postgresql.UUID(as_uuid=False)
+    )
+
+
+class UUIDKey(TypeDecorator):
+    """Native UUID column exchanging ids with the app as strings
+
+    Malformed ids from requests are bound as the nil UUID, so looking
+    them up finds nothing instead of failing the statement.
+    """
+    impl = postgresql.UUID(as_uuid=False)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        """Normalizes an id string before binding it"""
+        if value is None:
+            return None
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return NIL_UUID
+
 
 class BaseModel:
     """Base model class with common attributes"""
-    id = Column(String(64), unique=True, nullable=False, primary_key=True)
+    id = Column(UUIDKey, primary_key=True, default=uuid7)
     created_on = Column(TIMESTAMP(True), nullable=False,
-                        default=datetime.utcnow())
+                        server_default=func.now())
     updated_on = Column(TIMESTAMP(True), nullable=False,
-                        default=datetime.utcnow(), onupdate=datetime.utcnow())
+                        server_default=func.now(), onupdate=func.now())
 
     def __init__(self, **kwargs):
         """Initialize the base model with given attributes"""
@@ -23,6 +84,19 @@ class BaseModel:
             setattr(self, key, val)
 
 
+def hash_partitions(table, partitions: int = HASH_PARTITIONS):
+    """Creates the hash partitions of a table right after the table
+
+    The table itself is declared with postgresql_partition_by; its
+    partitions are named <table>_p<remainder> and dropped along with it.
+    """
+    for remainder in range(partitions):
+        event.listen(table, 'after_create', DDL(
+            f'CREATE TABLE %(table)s_p{remainder} PARTITION OF %(table)s '
+            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        ))
+
+
 def create_tsvector(*columns):
     """Create a TSVector column for full-text search"""
     tsvector_exp = columns[0]
@@ -1,18 +1,29 @@
 #!/usr/bin/python3
 """Module for Comment Model schema for database representation"""
 from sqlalchemy import Column, ForeignKey, TIMESTAMP, String
-from datetime import datetime
+from sqlalchemy.sql import func
 
-from . import Base
+from . import Base, UUIDKey, uuid7, hash_partitions
 
 
 class Comment(Base):
-    """Comment model class for post comment or reply to a comment"""
+    """Comment model class for post comment or reply to a comment
+
+    The table is hash partitioned on post_id, which its primary key has
+    to include; the ORM still identifies a comment by its id alone.
+    """
     __tablename__ = 'comments'
-    id = Column(String(64), unique=True, nullable=False, primary_key=True)
+    __table_args__ = {'postgresql_partition_by': 'HASH (post_id)'}
+    id = Column(UUIDKey, primary_key=True, default=uuid7)
     created_on = Column(TIMESTAMP(True), nullable=False,
-                        default=datetime.utcnow())
-    post_id = Column(String(64), ForeignKey('posts.id'), nullable=False)
-    user_id = Column(String(64), ForeignKey('users.id'), nullable=False)
-    comment_id = Column(String(64), nullable=True)
+                        server_default=func.now())
+    post_id = Column(UUIDKey, ForeignKey('posts.id'), primary_key=True,
+                     nullable=False, index=True)
+    user_id = Column(UUIDKey, ForeignKey('users.id'), nullable=False,
+                     index=True)
+    comment_id = Column(UUIDKey, nullable=True, index=True)
     content = Column(String(384), nullable=False)
+    __mapper_args__ = {'primary_key': [id]}
+
+
+hash_partitions(Comment.__table__)
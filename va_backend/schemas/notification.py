@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+"""Module for Notification model schemas for database representation"""
+from sqlalchemy import Column, String, Integer, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from . import Base, BaseModel, UUIDKey
+
+
+class Notification(BaseModel, Base):
+    """Notification model class coalescing activity on a user's content
+
+    actor_ids holds the distinct actors of the group, ordered by their
+    latest action, so actor_id is its last element.
+    """
+    __tablename__ = 'notifications'
+    user_id = Column(UUIDKey, ForeignKey('users.id'), nullable=False)
+    kind = Column(String(16), nullable=False)
+    subject_id = Column(String(64), nullable=False, default='')
+    actor_id = Column(UUIDKey, nullable=False)
+    actor_ids = Column(ARRAY(UUIDKey), nullable=False)
+    read_on = Column(TIMESTAMP(True), nullable=True)
+    __table_args__ = (
+        Index('idx_notification_unread_group', user_id, kind, subject_id,
+              unique=True, postgresql_where=read_on.is_(None)),
+        Index('idx_notification_inbox', user_id, 'updated_on'),
+        Index('idx_notification_actors', actor_ids, postgresql_using='gin')
+    )
+
+
+class NotificationCounter(Base):
+    """NotificationCounter model class holding a user's unread count"""
+    __tablename__ = 'notification_counters'
+    user_id = Column(UUIDKey, primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
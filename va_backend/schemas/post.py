@@ -1,28 +1,31 @@
 #!/usr/bin/python3
 """Module for Post Model schema for database representation"""
-from sqlalchemy import Column, String, ForeignKey, TEXT, Index
+from sqlalchemy import Column, String, ForeignKey, Index, TIMESTAMP
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import cast, func
 from sqlalchemy.dialects import postgresql
 
-from . import Base, BaseModel, create_tsvector
+from . import Base, BaseModel, UUIDKey, create_tsvector
 
 
 class Post(BaseModel, Base):
     """Post model class for the database"""
     __tablename__ = 'posts'
-    user_id = Column(String(64), ForeignKey('users.id'), nullable=False)
+    user_id = Column(UUIDKey, ForeignKey('users.id'), nullable=False,
+                     index=True)
     title = Column(String(256), nullable=False, default='', index=True)
-    content = Column(TEXT, nullable=False, index=True)
+    content = Column(postgresql.JSONB, nullable=False)
+    deleted_on = Column(TIMESTAMP(True), nullable=True)
     comments = relationship('Comment', cascade='all, delete, delete-orphan',
                             backref='post')
     likes = relationship('PostLike', cascade='all, delete, delete-orphan',
                          backref='post')
-    __ts_content__ = create_tsvector(
-        cast(func.coalesce(content, ''), postgresql.TEXT))
+    __ts_content__ = create_tsvector(content)
     __ts_title__ = create_tsvector(
         cast(func.coalesce(title, ''), postgresql.TEXT))
     __table_args__ = (
         Index('idx_post_text_tsv', __ts_content__, postgresql_using='gin'),
-        Index('idx_post_title_tsv', __ts_title__, postgresql_using='gin')
+        Index('idx_post_title_tsv', __ts_title__, postgresql_using='gin'),
+        Index('idx_post_pending_delete', deleted_on,
+              postgresql_where=deleted_on.isnot(None))
     )
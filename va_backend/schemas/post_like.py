@@ -1,13 +1,17 @@
 #!/usr/bin/python3
 """Module for PostLike model schema for database representation"""
-from sqlalchemy import UniqueConstraint, Column, String, TIMESTAMP, ForeignKey
-from datetime import datetime
+from sqlalchemy import UniqueConstraint, Column, TIMESTAMP, ForeignKey
+from sqlalchemy.sql import func
 
-from . import Base, BaseModel
+from . import Base, BaseModel, UUIDKey, uuid7, hash_partitions
 
 
 class PostLike(BaseModel, Base):
-    """PostLike model class for like on a post"""
+    """PostLike model class for like on a post
+
+    The table is hash partitioned on post_id, which its primary key has
+    to include; the ORM still identifies a like by its id alone.
+    """
     __tablename__ = 'posts_likes'
     __table_args__ = (
         UniqueConstraint(
@@ -15,9 +19,16 @@ class PostLike(BaseModel, Base):
             'user_id',
             name='unique_reaction'
         ),
+        {'postgresql_partition_by': 'HASH (post_id)'}
     )
-    id = Column(String(64), unique=True, nullable=False, primary_key=True)
+    id = Column(UUIDKey, primary_key=True, default=uuid7)
     created_on = Column(TIMESTAMP(True), nullable=False,
-                        default=datetime.utcnow())
-    post_id = Column(String(64), ForeignKey('posts.id'), nullable=False)
-    user_id = Column(String(64), ForeignKey('users.id'), nullable=False)
+                        server_default=func.now())
+    post_id = Column(UUIDKey, ForeignKey('posts.id'), primary_key=True,
+                     nullable=False)
+    user_id = Column(UUIDKey, ForeignKey('users.id'), nullable=False,
+                     index=True)
+    __mapper_args__ = {'primary_key': [id]}
+
+
+hash_partitions(PostLike.__table__)
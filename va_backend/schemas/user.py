@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Module for User model schema for databse representation"""
-from sqlalchemy import Column, String, TEXT, Integer, Boolean, Index
+from sqlalchemy import (
+    Column, String, TEXT, Integer, Boolean, Index, TIMESTAMP)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func, cast
 from sqlalchemy.dialects import postgresql
@@ -19,6 +20,7 @@ class User(BaseModel, Base):
     signin_trials = Column(Integer, nullable=False, default=0)
     user_active = Column(Boolean, default=True)
     user_reset_token = Column(TEXT, nullable=True, default='')
+    deleted_on = Column(TIMESTAMP(True), nullable=True)
     posts = relationship('Post', cascade='all, delete, delete-orphan',
                          backref='user')
     comments = relationship('Comment', cascade='all, delete, delete-orphan',
@@ -29,5 +31,7 @@ class User(BaseModel, Base):
         cast(func.coalesce(bio, ''), postgresql.TEXT))
     __table_args__ = (
         Index('idx_user_name_tsv', __ts_name__, postgresql_using='gin'),
-        Index('idx_user_bio_tsv', __ts_bio__, postgresql_using='gin')
+        Index('idx_user_bio_tsv', __ts_bio__, postgresql_using='gin'),
+        Index('idx_user_pending_delete', deleted_on,
+              postgresql_where=deleted_on.isnot(None))
     )
@@ -1,9 +1,9 @@
 #!/usr/bin/python3
 """Module for UserFollowing model schema for database representation"""
-from sqlalchemy import UniqueConstraint, Column, String, TIMESTAMP, ForeignKey
-from datetime import datetime
+from sqlalchemy import UniqueConstraint, Column, TIMESTAMP, ForeignKey
+from sqlalchemy.sql import func
 
-from . import Base, BaseModel
+from . import Base, UUIDKey, uuid7
 
 
 class UserFollowing(Base):
@@ -16,8 +16,9 @@ class UserFollowing(Base):
             name='unique_connection'
         ),
     )
-    id = Column(String(64), unique=True, nullable=False, primary_key=True)
+    id = Column(UUIDKey, primary_key=True, default=uuid7)
     created_on = Column(TIMESTAMP(True), nullable=False,
-                        default=datetime.utcnow())
-    follower_id = Column(String(64), ForeignKey('users.id'), nullable=False)
-    following_id = Column(String(64), ForeignKey('users.id'), nullable=False)
+                        server_default=func.now())
+    follower_id = Column(UUIDKey, ForeignKey('users.id'), nullable=False)
+    following_id = Column(UUIDKey, ForeignKey('users.id'), nullable=False,
+                          index=True)
@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+"""Bulk exports and imports the database tables with Postgres COPY
+
+Run from the va_backend directory with the server's environment:
+    python3 -m scripts.bulk_data export --dir dump --format csv
+    python3 -m scripts.bulk_data import --dir dump --truncate
+Each table is streamed to or from <dir>/<table>.<csv|ndjson>[.gz|.zst].
+An import runs in a single transaction: it drops the secondary indexes of
+the loaded tables, COPYs the rows, rebuilds the indexes, then runs the
+after-load tasks (statistics and derived counters).
+"""
+import os
+import sys
+import gzip
+import time
+import argparse
+
+from api.v1.database import get_engine
+
+
+TABLES = (
+    'users',
+    'posts',
+    'users_followings',
+    'posts_likes',
+    'comments',
+    'notifications'
+)
+"""Tables handled by the tool, in foreign key dependency order"""
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+"""File suffix of each supported compression"""
+
+JSON_LINE_OPTIONS = "FORMAT csv, QUOTE e'\\x01', DELIMITER e'\\x02'"
+"""COPY options passing JSON lines through verbatim
+
+JSON escapes control characters, so a csv quote and delimiter that are
+control characters never occur in a line and no escaping is applied.
+"""
+
+after_load_tasks = []
+"""Callables run with the DB-API cursor once the tables are loaded"""
+
+
+def after_load(task):
+    """Registers a task run after an import, before it commits"""
+    after_load_tasks.append(task)
+    return task
+
+
+@after_load
+def recount_unread_notifications(cursor, tables):
+    """Rebuilds the unread notification counters from the notifications"""
+    if 'notifications' not in tables:
+        return
+    cursor.execute('DELETE FROM notification_counters')
+    cursor.execute(
+        'INSERT INTO notification_counters (user_id, unread) '
+        'SELECT user_id, count(*) FROM notifications '
+        'WHERE read_on IS NULL GROUP BY user_id'
+    )
+
+
+@after_load
+def analyze_tables(cursor, tables):
+    """Refreshes the planner statistics of the loaded tables"""
+    for table in tables:
+        cursor.execute(f'ANALYZE {table}')
+    if 'notifications' in tables:
+        cursor.execute('ANALYZE notification_counters')
+
+
+def open_file(path: str, mode: str):
+    """Opens a possibly compressed data file as a binary stream"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, compresslevel=6)
+    if path.endswith('.zst'):
+        import zstandard
+        return zstandard.open(path, mode)
+    return open(path, mode)
+
+
+def find_table_file(directory: str, table: str):
+    """Finds the data file of a table and returns its path and format"""
+    for data_format in ('csv', 'ndjson'):
+        for suffix in COMPRESSION_SUFFIXES.values():
+            path = os.path.join(directory, f'{table}.{data_format}{suffix}')
+            if os.path.exists(path):
+                return path, data_format
+    return None, None
+
+
+def table_columns(cursor, table: str) -> list:
+    """Gets the column names of a table in ordinal order"""
+    cursor.execute(
+        'SELECT attname FROM pg_attribute '
+        'WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped '
+        'ORDER BY attnum',
+        (table,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    """Checks if a table is partitioned, which COPY cannot FREEZE"""
+    cursor.execute(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass",
+        (table,)
+    )
+    return cursor.fetchone()[0]
+
+
+def secondary_indexes(cursor, table: str) -> list:
+    """Gets the name and definition of indexes not backing a constraint"""
+    cursor.execute(
+        'SELECT ic.relname, pg_get_indexdef(i.indexrelid) '
+        'FROM pg_index i JOIN pg_class ic ON ic.oid = i.indexrelid '
+        'WHERE i.indrelid = %s::regclass AND NOT EXISTS ('
+        '  SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)',
+        (table,)
+    )
+    return cursor.fetchall()
+
+
+def export_table(cursor, table: str, path: str, data_format: str) -> int:
+    """Streams a table to a data file and returns the row count"""
+    with open_file(path, 'wb') as file:
+        if data_format == 'csv':
+            cursor.copy_expert(
+                f'COPY (SELECT * FROM {table}) '
+                f'TO STDOUT WITH (FORMAT csv, HEADER true)',
+                file
+            )
+        else:
+            cursor.copy_expert(
+                f'COPY (SELECT row_to_json(t) FROM {table} t) '
+                f'TO STDOUT WITH ({JSON_LINE_OPTIONS})',
+                file
+            )
+    return cursor.rowcount
+
+
+def import_table(cursor, table: str, path: str, data_format: str,
+                 freeze: bool) -> int:
+    """Streams a data file into a table and returns the row count"""
+    with open_file(path, 'rb') as file:
+        if data_format == 'csv':
+            header = file.readline().decode('utf-8').strip()
+            columns = header.split(',')
+            unknown = set(columns) - set(table_columns(cursor, table))
+            if unknown:
+                raise ValueError(
+                    f'{path}: unknown columns {", ".join(sorted(unknown))}')
+            if freeze and is_partitioned(cursor, table):
+                freeze = False
+            options = 'FORMAT csv, FREEZE true' if freeze else 'FORMAT csv'
+            cursor.copy_expert(
+                f'COPY {table} ({header}) FROM STDIN WITH ({options})',
+                file
+            )
+            return cursor.rowcount
+        cursor.execute(
+            'CREATE TEMP TABLE bulk_json_lines (doc jsonb) ON COMMIT DROP')
+        cursor.copy_expert(
+            f'COPY bulk_json_lines FROM STDIN WITH ({JSON_LINE_OPTIONS})',
+            file
+        )
+        cursor.execute(
+            f'INSERT INTO {table} SELECT r.* FROM bulk_json_lines, '
+            f'jsonb_populate_record(NULL::{table}, doc) r'
+        )
+        row_count = cursor.rowcount
+        cursor.execute('DROP TABLE bulk_json_lines')
+        return row_count
+
+
+def run_export(connection, cli_args) -> int:
+    """Exports every selected table"""
+    os.makedirs(cli_args.dir, exist_ok=True)
+    suffix = COMPRESSION_SUFFIXES[cli_args.compression]
+    cursor = connection.cursor()
+    cursor.execute(
+        'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+    for table in cli_args.tables:
+        path = os.path.join(
+            cli_args.dir, f'{table}.{cli_args.format}{suffix}')
+        started = time.perf_counter()
+        row_count = export_table(cursor, table, path, cli_args.format)
+        print(f'{table}: exported {row_count} rows to {path} in '
+              f'{time.perf_counter() - started:.1f}s')
+    connection.commit()
+    return 0
+
+
+def run_import(connection, cli_args) -> int:
+    """Imports every selected table in one transaction"""
+    files = {}
+    for table in cli_args.tables:
+        path, data_format = find_table_file(cli_args.dir, table)
+        if path is None:
+            print(f'{table}: no data file in {cli_args.dir}', file=sys.stderr)
+            return 1
+        files[table] = (path, data_format)
+    cursor = connection.cursor()
+    cursor.execute('SET LOCAL maintenance_work_mem = %s',
+                   (cli_args.maintenance_work_mem,))
+    cursor.execute('SET LOCAL synchronous_commit = off')
+    if cli_args.truncate:
+        cursor.execute(f'TRUNCATE {", ".join(cli_args.tables)}')
+    dropped = []
+    for table in cli_args.tables:
+        for name, definition in secondary_indexes(cursor, table):
+            cursor.execute(f'DROP INDEX {name}')
+            dropped.append(definition)
+    for table in cli_args.tables:
+        path, data_format = files[table]
+        started = time.perf_counter()
+        row_count = import_table(
+            cursor, table, path, data_format, cli_args.truncate)
+        print(f'{table}: imported {row_count} rows from {path} in '
+              f'{time.perf_counter() - started:.1f}s')
+    started = time.perf_counter()
+    for definition in dropped:
+        cursor.execute(definition)
+    print(f'Rebuilt {len(dropped)} indexes in '
+          f'{time.perf_counter() - started:.1f}s')
+    for task in after_load_tasks:
+        task(cursor, cli_args.tables)
+    connection.commit()
+    return 0
+
+
+def main():
+    """Parses the command line and runs the export or import"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export')
+    export_parser.add_argument('--format', choices=('csv', 'ndjson'),
+                               default='csv')
+    export_parser.add_argument('--compression',
+                               choices=tuple(COMPRESSION_SUFFIXES),
+                               default='gzip')
+    import_parser = subparsers.add_parser('import')
+    import_parser.add_argument('--truncate', action='store_true',
+                               help='empty the tables before loading')
+    import_parser.add_argument('--maintenance-work-mem', default='512MB',
+                               help='memory used to rebuild each index')
+    for subparser in (export_parser, import_parser):
+        subparser.add_argument('--dir', required=True,
+                               help='directory holding the data files')
+        subparser.add_argument('--tables', nargs='*', choices=TABLES,
+                               default=list(TABLES))
+    cli_args = parser.parse_args()
+    if not os.getenv('DATABASE_URL'):
+        parser.error('DATABASE_URL must be set')
+    cli_args.tables = [
+        table for table in TABLES if table in cli_args.tables]
+    connection = get_engine().raw_connection()
+    try:
+        if cli_args.command == 'export':
+            return run_export(connection, cli_args)
+        return run_import(connection, cli_args)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
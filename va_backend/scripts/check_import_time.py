@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Checks that importing the API server stays within its startup budget
+
+Run from the va_backend directory:
+    python3 scripts/check_import_time.py [--budget-ms 1500]
+Exits with a non-zero status when a lazily loaded SDK is imported at
+startup or when the cumulative import time exceeds the budget.
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+
+LAZY_MODULES = (
+    'googleapiclient',
+    'google_auth_oauthlib',
+    'imagekitio',
+    'argon2',
+    'cryptography'
+)
+"""Top-level packages that must only be imported on first use
+
+email_validator is left out: fastapi.openapi.models imports it whenever it
+is installed, so the endpoints import it at module level.
+"""
+
+TARGET_MODULE = 'api.v1.server'
+"""The module imported by every server worker at spawn"""
+
+
+def measure_imports(module: str):
+    """Imports a module in a fresh interpreter and parses -X importtime"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    timings = {}
+    line_fmt = re.compile(
+        r'import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \| '
+        r'(?P<indent>\s*)(?P<name>\S+)'
+    )
+    for line in proc.stderr.splitlines():
+        match = line_fmt.match(line)
+        if match:
+            timings[match.group('name')] = int(match.group('cumulative'))
+    return timings
+
+
+def main():
+    """Reports the import time and fails on budget regressions"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--budget-ms',
+        type=float,
+        default=float(os.getenv('IMPORT_BUDGET_MS', '1500')),
+        help='maximum cumulative import time of the server module'
+    )
+    cli_args = parser.parse_args()
+    timings = measure_imports(TARGET_MODULE)
+    total_ms = timings.get(TARGET_MODULE, 0) / 1000
+    failures = []
+    for name in LAZY_MODULES:
+        if name in timings:
+            failures.append(f'{name} is imported at startup')
+    if total_ms > cli_args.budget_ms:
+        failures.append(
+            f'{TARGET_MODULE} took {total_ms:.1f}ms '
+            f'(budget {cli_args.budget_ms:.1f}ms)')
+    slowest = sorted(timings.items(), key=lambda x: x[1], reverse=True)
+    print(f'import {TARGET_MODULE}: {total_ms:.1f}ms')
+    for name, cumulative in slowest[1:11]:
+        print(f'  {cumulative / 1000:8.1f}ms  {name}')
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())